@@ -0,0 +1,180 @@
+# build_cache.py
+
+import hashlib
+import json
+import os
+import shutil
+import tarfile
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from agent.incremental import STATE_FILE
+
+
+# 같은 입력이면 같은 결과가 나오는 Maven 단계만 캐시한다 (install / deploy 등은 제외)
+# test는 결과가 키에 없는 것(시간, 환경, 외부 자원, 비결정적 테스트)에도 좌우되므로 캐시하지 않는다
+CACHEABLE_GOALS = {
+    "clean", "validate", "compile", "test-compile", "package", "verify"
+}
+
+
+def _safe_member(member: tarfile.TarInfo) -> bool:
+    """target/ 아래의 일반 파일/디렉토리만 허용"""
+    parts = Path(member.name).parts
+    return (
+        (member.isfile() or member.isdir())
+        and not Path(member.name).is_absolute()
+        and ".." not in parts
+        and bool(parts) and parts[0] == "target"
+    )
+
+
+def _without_state_file(member: tarfile.TarInfo) -> Optional[tarfile.TarInfo]:
+    return None if member.name == f"target/{STATE_FILE}" else member
+
+
+class BuildCache:
+    """
+    소스 트리 해시 기반 빌드 캐시.
+    - key = sha256(goal + pom.xml + src/ 아래 모든 파일의 경로와 내용)
+    - 저장: <root>/<key>/target.tar + result.json
+    - 전체 크기가 max_bytes를 넘으면 가장 오래 안 쓴 항목부터 삭제 (LRU)
+    """
+
+    def __init__(self, root: Path, max_bytes: int = 1024 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cacheable(goal_parts: list[str]) -> bool:
+        return bool(goal_parts) and all(part in CACHEABLE_GOALS for part in goal_parts)
+
+    # -----------------------------
+    # 키 계산
+    # -----------------------------
+    def key(self, project_dir: Path, goal_parts: list[str]) -> str:
+        digest = hashlib.sha256()
+        digest.update(" ".join(goal_parts).encode("utf-8"))
+
+        pom = project_dir / "pom.xml"
+        if pom.exists():
+            digest.update(b"\0pom.xml\0")
+            digest.update(pom.read_bytes())
+
+        src_dir = project_dir / "src"
+        if src_dir.exists():
+            for path in sorted(p for p in src_dir.rglob("*") if p.is_file()):
+                digest.update(b"\0" + path.relative_to(project_dir).as_posix().encode("utf-8") + b"\0")
+                digest.update(path.read_bytes())
+
+        return digest.hexdigest()
+
+    # -----------------------------
+    # 조회 / 복원
+    # -----------------------------
+    def restore(self, key: str, project_dir: Path) -> Optional[dict]:
+        entry = self.root / key
+        result_path = entry / "result.json"
+
+        if not result_path.exists():
+            self.misses += 1
+            return None
+
+        archive = entry / "target.tar"
+        try:
+            with open(result_path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            self._extract(archive, project_dir)
+        except (tarfile.TarError, EOFError, OSError, ValueError):
+            # 깨졌거나(잘린 tar, 잘못된 result.json) 조작된 항목은 버리고 미스로 처리 → 빌드를 다시 한다
+            shutil.rmtree(entry, ignore_errors=True)
+            self.misses += 1
+            return None
+
+        # LRU 기준 시각 갱신
+        os.utime(entry)
+        self.hits += 1
+        return result
+
+    @staticmethod
+    def _extract(archive: Path, project_dir: Path):
+        target_dir = project_dir / "target"
+
+        if not archive.exists():
+            if target_dir.exists():
+                shutil.rmtree(target_dir)
+            return
+
+        with tarfile.open(archive, "r") as tar:
+            members = tar.getmembers()
+            # target/ 밖 경로, 링크, 장치 파일이 있으면 아무것도 풀지 않는다
+            if not all(_safe_member(member) for member in members):
+                raise tarfile.TarError("Unsafe member in cached archive")
+
+            if target_dir.exists():
+                shutil.rmtree(target_dir)
+
+            if hasattr(tarfile, "data_filter"):
+                tar.extractall(project_dir, members=members, filter="data")
+            else:
+                tar.extractall(project_dir, members=members)
+
+        # 예전 항목에는 증분 컴파일 기록이 들어 있을 수 있다 (현재 소스와 맞지 않음)
+        (target_dir / STATE_FILE).unlink(missing_ok=True)
+
+    # -----------------------------
+    # 저장
+    # -----------------------------
+    def store(self, key: str, project_dir: Path, result: dict):
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        # 임시 디렉토리에 만든 뒤 rename → 중간 상태가 보이지 않게
+        tmp_entry = self.root / f".tmp-{uuid.uuid4().hex}"
+        tmp_entry.mkdir()
+
+        target_dir = project_dir / "target"
+        if target_dir.exists():
+            with tarfile.open(tmp_entry / "target.tar", "w") as tar:
+                # 증분 컴파일 기록은 복원 시점의 소스와 맞지 않으므로 넣지 않는다
+                tar.add(target_dir, arcname="target", filter=_without_state_file)
+
+        with open(tmp_entry / "result.json", "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False)
+
+        entry = self.root / key
+        try:
+            tmp_entry.rename(entry)
+        except OSError:
+            # 같은 키를 다른 워커가 먼저 저장함
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+
+        self._evict()
+
+    def _entry_size(self, entry: Path) -> int:
+        return sum(p.stat().st_size for p in entry.iterdir() if p.is_file())
+
+    def _evict(self):
+        entries = [p for p in self.root.iterdir() if p.is_dir() and not p.name.startswith(".tmp-")]
+        sizes = {entry: self._entry_size(entry) for entry in entries}
+        total = sum(sizes.values())
+
+        for entry in sorted(entries, key=lambda p: p.stat().st_mtime):
+            if total <= self.max_bytes:
+                break
+            total -= sizes[entry]
+            shutil.rmtree(entry, ignore_errors=True)
+
+    def stats(self) -> dict:
+        entries = [
+            p for p in self.root.iterdir() if p.is_dir() and not p.name.startswith(".tmp-")
+        ] if self.root.exists() else []
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(self._entry_size(p) for p in entries),
+            "max_bytes": self.max_bytes
+        }
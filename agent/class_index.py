@@ -0,0 +1,190 @@
+# class_index.py
+
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Optional
+
+
+ACC_PUBLIC = 0x0001
+ACC_STATIC = 0x0008
+MAIN_DESCRIPTOR = "([Ljava/lang/String;)V"
+
+# 컴파일/빌드가 끝날 때마다 target/ 아래에 새로 쓰는 파일 (워커 간 캐시 무효화)
+BUILD_STAMP = ".openviper-build-stamp"
+
+# constant pool tag → 고정 길이 (UTF8(1)은 가변 길이라 따로 처리)
+CONSTANT_SIZES = {
+    3: 4, 4: 4,            # Integer, Float
+    5: 8, 6: 8,            # Long, Double (슬롯 2개 차지)
+    7: 2, 8: 2, 16: 2,     # Class, String, MethodType
+    19: 2, 20: 2,          # Module, Package
+    9: 4, 10: 4, 11: 4,    # Field/Method/InterfaceMethod ref
+    12: 4, 17: 4, 18: 4,   # NameAndType, Dynamic, InvokeDynamic
+    15: 3                  # MethodHandle
+}
+
+
+# -----------------------------
+# 클래스 파일 파싱
+# -----------------------------
+def has_main_method(class_file: Path) -> bool:
+    """
+    클래스 파일에 public static void main(String[])가 있는지 확인한다.
+    constant pool과 method 테이블만 읽고 바이트코드는 건너뛴다.
+    """
+    data = class_file.read_bytes()
+
+    if data[:4] != b"\xca\xfe\xba\xbe":
+        return False
+
+    pos = 8
+    (count,) = struct.unpack_from(">H", data, pos)
+    pos += 2
+
+    utf8: dict[int, str] = {}
+    index = 1
+    while index < count:
+        tag = data[pos]
+        pos += 1
+        if tag == 1:
+            (length,) = struct.unpack_from(">H", data, pos)
+            pos += 2
+            utf8[index] = data[pos:pos + length].decode("utf-8", errors="replace")
+            pos += length
+        elif tag in CONSTANT_SIZES:
+            pos += CONSTANT_SIZES[tag]
+            if tag in (5, 6):
+                index += 1
+        else:
+            return False
+        index += 1
+
+    # access_flags, this_class, super_class
+    pos += 6
+    (interfaces_count,) = struct.unpack_from(">H", data, pos)
+    pos += 2 + interfaces_count * 2
+
+    # fields, methods 구조가 같으므로 같은 방식으로 건너뛴다
+    for is_method in (False, True):
+        (member_count,) = struct.unpack_from(">H", data, pos)
+        pos += 2
+        for _ in range(member_count):
+            access, name_index, descriptor_index, attributes_count = struct.unpack_from(">HHHH", data, pos)
+            pos += 8
+
+            if (
+                is_method
+                and utf8.get(name_index) == "main"
+                and utf8.get(descriptor_index) == MAIN_DESCRIPTOR
+                and access & ACC_PUBLIC
+                and access & ACC_STATIC
+            ):
+                return True
+
+            for _ in range(attributes_count):
+                (length,) = struct.unpack_from(">I", data, pos + 2)
+                pos += 6 + length
+
+    return False
+
+
+# -----------------------------
+# 프로젝트별 인덱스
+# -----------------------------
+class ClassIndex:
+    """
+    target/classes의 main 클래스 인덱스.
+    - (classes 디렉토리 mtime, 빌드 스탬프)가 같으면 캐시된 결과를 그대로 쓴다 (O(1))
+    - 다시 만들 때도 (mtime, size)가 같은 클래스 파일은 다시 파싱하지 않는다
+    - 같은 자리에 덮어쓰거나 하위 패키지에 쓴 클래스 파일은 디렉토리 mtime을 바꾸지 않으므로
+      컴파일/빌드 후에는 invalidate()를 호출한다. invalidate()는 target/BUILD_STAMP도 새로 써서
+      같은 WORKSPACE를 쓰는 다른 워커 프로세스의 캐시도 무효화한다
+    """
+
+    def __init__(self):
+        self.indexes: dict[str, dict] = {}
+
+    @staticmethod
+    def _stamp_path(classes_dir: Path) -> Path:
+        return classes_dir.parent / BUILD_STAMP
+
+    def invalidate(self, classes_dir: Path):
+        index = self.indexes.get(str(classes_dir.resolve()))
+        if index is not None:
+            index["signature"] = None
+
+        stamp = self._stamp_path(classes_dir)
+        try:
+            tmp_path = stamp.with_name(f"{stamp.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(f"{time.time_ns()} {os.getpid()}", encoding="utf-8")
+            os.replace(tmp_path, stamp)
+        except OSError:
+            pass  # target이 없으면 (빌드 실패 등) 다음 조회에서 디렉토리 mtime으로 판단
+
+    def _signature(self, classes_dir: Path) -> tuple:
+        try:
+            stamp = self._stamp_path(classes_dir).read_text(encoding="utf-8")
+        except OSError:
+            stamp = None
+        return classes_dir.stat().st_mtime_ns, stamp
+
+    def main_classes(self, classes_dir: Path) -> list[str]:
+        key = str(classes_dir.resolve())
+        signature = self._signature(classes_dir)
+        index = self.indexes.get(key)
+
+        if index is None or index["signature"] != signature:
+            index = self._rebuild(classes_dir, index["files"] if index else {})
+            index["signature"] = signature
+            self.indexes[key] = index
+
+        return index["mains"]
+
+    def _rebuild(self, classes_dir: Path, previous: dict) -> dict:
+        files = {}
+
+        for root, dirs, names in os.walk(classes_dir):
+            for name in names:
+                # 내부/익명 클래스는 진입점이 될 수 없다
+                if not name.endswith(".class") or "$" in name:
+                    continue
+
+                path = Path(root) / name
+                rel_path = path.relative_to(classes_dir).as_posix()
+
+                try:
+                    stat = path.stat()
+                except OSError:
+                    # 훑는 사이에 빌드가 지운 파일 등
+                    continue
+                signature = (stat.st_mtime, stat.st_size)
+
+                cached = previous.get(rel_path)
+                if cached and cached["signature"] == signature:
+                    files[rel_path] = cached
+                    continue
+
+                try:
+                    is_main = has_main_method(path)
+                except (struct.error, IndexError, OSError):
+                    is_main = False
+
+                files[rel_path] = {"signature": signature, "main": is_main}
+
+        mains = sorted(
+            rel_path[:-len(".class")].replace("/", ".")
+            for rel_path, info in files.items() if info["main"]
+        )
+
+        return {"signature": None, "files": files, "mains": mains}
+
+    def find_main_class(self, classes_dir: Path, preferred: Optional[str] = None) -> Optional[str]:
+        mains = self.main_classes(classes_dir)
+
+        if not mains:
+            return None
+        if preferred in mains:
+            return preferred
+        return mains[0]
@@ -0,0 +1,232 @@
+# incremental.py
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import uuid
+from pathlib import Path
+
+from agent.jobs import run_command
+
+
+PACKAGE_RE = r"^\s*package\s+([\w.]+)\s*;"
+TYPE_DECL_RE = r"\b(?:class|interface|enum|record)\s+([A-Za-z_]\w*)"
+TYPE_REF_RE = r"\b[A-Z]\w*\b"
+
+# 프로젝트별 증분 컴파일 상태 파일 (target 아래라 mvn clean 시 같이 지워진다)
+STATE_FILE = ".openviper-incremental.json"
+
+
+def _file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _parse_source(path: Path) -> dict:
+    text = path.read_text(encoding="utf-8", errors="replace")
+    package = re.search(PACKAGE_RE, text, re.MULTILINE)
+    types = re.findall(TYPE_DECL_RE, text)
+
+    return {
+        "package": package.group(1) if package else "",
+        "types": sorted(set(types)),
+        "refs": sorted(set(re.findall(TYPE_REF_RE, text)) - set(types))
+    }
+
+
+class IncrementalCompiler:
+    """
+    Maven을 거치지 않는 단일 파일 수정용 빠른 컴파일 경로.
+    - src/main/java 아래 .java 파일의 해시를 기록해 두고
+    - 바뀐 파일과 그 파일의 타입을 참조하는 파일(전이적으로)만 javac로 다시 컴파일해
+    - target/classes에 바로 쓴다
+    """
+
+    def __init__(self, project_dir: Path, timeout: float = 60):
+        self.project_dir = project_dir
+        self.source_dir = project_dir / "src" / "main" / "java"
+        self.classes_dir = project_dir / "target" / "classes"
+        self.state_path = project_dir / "target" / STATE_FILE
+        self.timeout = timeout
+
+    # -----------------------------
+    # 상태 저장
+    # -----------------------------
+    def _load_state(self) -> dict:
+        if not self.state_path.exists():
+            return {}
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def invalidate(self):
+        """
+        target/을 다른 경로(Maven 빌드, 빌드 캐시 복원)가 다시 썼으면 기록한 해시가
+        target/classes와 맞지 않는다. 상태를 지워서 다음 compile이 전체를 다시 컴파일하게 한다
+        """
+        self.state_path.unlink(missing_ok=True)
+
+    def _save_state(self, state: dict):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        tmp_path.replace(self.state_path)
+
+    # -----------------------------
+    # 변경 분석
+    # -----------------------------
+    def _scan(self) -> dict[str, str]:
+        if not self.source_dir.exists():
+            return {}
+        return {
+            path.relative_to(self.source_dir).as_posix(): _file_hash(path)
+            for path in self.source_dir.rglob("*.java")
+        }
+
+    def _dependents(self, state: dict, roots: set[str]) -> set[str]:
+        """roots가 선언한 타입을 참조하는 파일을 전이적으로 찾는다"""
+        result = set(roots)
+        pending = list(roots)
+
+        while pending:
+            rel_path = pending.pop()
+            declared = set(state.get(rel_path, {}).get("types", []))
+            if not declared:
+                continue
+
+            for other, info in state.items():
+                if other in result:
+                    continue
+                if declared.intersection(info.get("refs", [])):
+                    result.add(other)
+                    pending.append(other)
+
+        return result
+
+    def _stale_class_files(self, info: dict) -> list[Path]:
+        package_dir = self.classes_dir.joinpath(*info["package"].split(".")) if info["package"] else self.classes_dir
+        found = []
+        for type_name in info.get("types", []):
+            found.extend(package_dir.glob(f"{type_name}.class"))
+            found.extend(package_dir.glob(f"{type_name}$*.class"))
+        return found
+
+    def _set_aside(self, class_files: list[Path]) -> Path:
+        """
+        옛 클래스 파일을 target 아래 임시 디렉토리로 옮긴다.
+        javac가 실패하면 _restore로 되돌리고, 성공하면 디렉토리째 지운다
+        """
+        backup_dir = self.classes_dir.parent / f".openviper-stale-{uuid.uuid4().hex}"
+        for class_file in class_files:
+            dest = backup_dir / class_file.relative_to(self.classes_dir)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(class_file, dest)
+        return backup_dir
+
+    def _restore(self, backup_dir: Path):
+        if not backup_dir.exists():
+            return
+        for path in backup_dir.rglob("*.class"):
+            target = self.classes_dir / path.relative_to(backup_dir)
+            # 실패한 컴파일이 새로 쓴 파일은 그대로 둔다
+            if not target.exists():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(path, target)
+        shutil.rmtree(backup_dir, ignore_errors=True)
+
+    def _analyze(self, full: bool) -> tuple[dict, dict, set[str], list[str], list[Path]]:
+        """해시/의존 분석 (파일을 읽으므로 스레드에서 실행한다)"""
+        old_state = {} if full or not self.classes_dir.exists() else self._load_state()
+        hashes = self._scan()
+
+        changed = {p for p, h in hashes.items() if old_state.get(p, {}).get("hash") != h}
+        deleted = set(old_state) - set(hashes)
+
+        # 새 상태: 바뀐 파일만 다시 파싱
+        new_state = {}
+        for rel_path, digest in hashes.items():
+            if rel_path in changed:
+                info = _parse_source(self.source_dir / rel_path)
+                info["hash"] = digest
+                new_state[rel_path] = info
+            else:
+                new_state[rel_path] = old_state[rel_path]
+
+        # 바뀐/삭제된 파일의 옛 타입을 참조하던 파일 + 새 타입을 참조하는 파일
+        affected = self._dependents(old_state, changed | deleted) | self._dependents(new_state, changed)
+        to_compile = sorted(p for p in affected if p in hashes)
+
+        stale = [
+            class_file
+            for rel_path in (changed | deleted) if rel_path in old_state
+            for class_file in self._stale_class_files(old_state[rel_path])
+        ]
+        return old_state, new_state, deleted, to_compile, stale
+
+    # -----------------------------
+    # 컴파일
+    # -----------------------------
+    async def compile(self, full: bool = False) -> dict:
+        if shutil.which("javac") is None:
+            return {"status": "error", "stderr": "javac not found in PATH"}
+
+        old_state, new_state, deleted, to_compile, stale = await asyncio.to_thread(self._analyze, full)
+
+        if not to_compile:
+            # 삭제만 있는 경우: 컴파일할 것이 없으므로 옛 클래스를 바로 지운다
+            for class_file in stale:
+                class_file.unlink(missing_ok=True)
+            await asyncio.to_thread(self._save_state, new_state)
+            return {"status": "success", "compiled": [], "removed": sorted(deleted), "stdout": "", "stderr": ""}
+
+        self.classes_dir.mkdir(parents=True, exist_ok=True)
+
+        # 옛 클래스(없어진 타입, 익명/내부 클래스 포함)는 javac가 성공한 뒤에만 지운다.
+        # 컴파일 동안은 따로 옮겨 둬서 -cp로 보이지 않게 한다
+        backup_dir = await asyncio.to_thread(self._set_aside, stale)
+
+        try:
+            output = await run_command(
+                [
+                    "javac",
+                    "-encoding", "UTF-8",
+                    "-d", str(self.classes_dir.resolve()),
+                    "-cp", str(self.classes_dir.resolve()),
+                    "-sourcepath", str(self.source_dir.resolve()),
+                    "-implicit:class"
+                ] + [str((self.source_dir / p).resolve()) for p in to_compile],
+                cwd=str(self.project_dir),
+                timeout=self.timeout
+            )
+        except BaseException as e:
+            await asyncio.shield(asyncio.to_thread(self._restore, backup_dir))
+            if isinstance(e, asyncio.TimeoutError):
+                return {"status": "error", "stderr": "javac execution timeout"}
+            raise
+
+        if output["returncode"] == 0:
+            await asyncio.to_thread(shutil.rmtree, backup_dir, True)
+        else:
+            await asyncio.to_thread(self._restore, backup_dir)
+            # 실패한 파일은 다음 호출 때 다시 컴파일되도록 해시를 비운다.
+            # 되돌린 옛 클래스를 다음 성공 때 지울 수 있도록 옛 타입/삭제된 파일 기록도 남긴다
+            for rel_path in to_compile:
+                old_types = old_state.get(rel_path, {}).get("types", [])
+                types = sorted(set(new_state[rel_path]["types"]) | set(old_types))
+                new_state[rel_path] = dict(new_state[rel_path], hash=None, types=types)
+            for rel_path in deleted:
+                new_state[rel_path] = old_state[rel_path]
+        await asyncio.to_thread(self._save_state, new_state)
+
+        return {
+            "status": "success" if output["returncode"] == 0 else "error",
+            "compiled": to_compile,
+            "removed": sorted(deleted),
+            "stdout": output["stdout"],
+            "stderr": output["stderr"]
+        }
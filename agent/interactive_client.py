@@ -2,7 +2,12 @@
 import sys
 import re
 import os
+import queue
+import hashlib
+import tempfile
+import threading
 import requests
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dotenv import load_dotenv
 from groq import Groq
 import json
@@ -11,8 +16,14 @@ import json
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from context.memory import Memory
-
-memory = Memory()
+from context.summarizer import Summarizer
+from context.token_budget import TokenBudget
+from context.context_builder import ContextBuilder
+from context.java_symbols import get_symbol_index
+from agent.llm_cache import LLMCache
+from agent.plan_stream import IncrementalJSONParser
+from agent.stream_upload import end_marker
+from agent.mcp_transport import McpTransport, parse_timeouts
 
 
 
@@ -31,11 +42,45 @@ load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 MCP_SERVER_URL = "http://localhost:8000"
 
+# http(기본): 별도 프로세스의 MCP 서버 호출 / local: 서버 핸들러를 이 프로세스에서 직접 호출
+MCP_TRANSPORT = os.getenv("OPENVIPER_MCP_TRANSPORT", "http")
+
+# keep-alive 세션 재사용. OPENVIPER_MCP_SOCKET을 주면 main.py가 띄운 서버와 Unix 소켓으로 통신
+# OPENVIPER_MCP_TIMEOUTS="compile=120,write_file=10" 형식으로 엔드포인트별 읽기 타임아웃 변경
+mcp = McpTransport(
+    MCP_SERVER_URL,
+    socket_path=os.getenv("OPENVIPER_MCP_SOCKET") or None,
+    timeouts=parse_timeouts(os.getenv("OPENVIPER_MCP_TIMEOUTS", "")),
+    retries=int(os.getenv("OPENVIPER_MCP_RETRIES", "2"))
+)
+
+if MCP_TRANSPORT == "local":
+    from agent.local_transport import LocalTransport
+    local_mcp = LocalTransport()
+else:
+    local_mcp = None
+
+# journal(기본) / json / sqlite, OPENVIPER_MEMORY_FLUSH_INTERVAL(초)를 주면 write-behind
+memory = Memory(
+    storage=os.getenv("OPENVIPER_MEMORY_STORAGE", "journal"),
+    flush_interval=float(os.getenv("OPENVIPER_MEMORY_FLUSH_INTERVAL")) if os.getenv("OPENVIPER_MEMORY_FLUSH_INTERVAL") else None
+)
+
 if not GROQ_API_KEY:
     raise ValueError("GROQ_API_KEY not found in .env")
 
 client = Groq(api_key=GROQ_API_KEY)
 
+LLM_MODEL = "llama-3.3-70b-versatile"
+
+# temperature=0 응답 캐시 (OPENVIPER_LLM_CACHE=0 이면 사용 안 함)
+USE_LLM_CACHE = os.getenv("OPENVIPER_LLM_CACHE", "1") == "1"
+llm_cache = LLMCache(
+    os.getenv("OPENVIPER_LLM_CACHE_PATH", "llm_cache.db"),
+    ttl=float(os.getenv("OPENVIPER_LLM_CACHE_TTL", str(7 * 24 * 3600))),
+    max_bytes=int(os.getenv("OPENVIPER_LLM_CACHE_MAX_MB", "64")) * 1024 * 1024
+)
+
 # ==============================
 # 🧠 시스템 프롬프트
 # ==============================
@@ -67,6 +112,30 @@ Available MCP tools:
        "main_class": string
    }
 
+5. compile
+   parameters: {
+       "project_name": string
+   }
+   Fast incremental compile of changed files only (no Maven).
+   Prefer this over run_maven after editing a few Java files.
+
+6. write_files
+   parameters: {
+       "project_name": string,
+       "files": [ { "file_path": string, "content": string }, ... ]
+   }
+   Writes many files in one call. Prefer this over several write_file calls.
+
+7. patch_file
+   parameters: {
+       "project_name": string,
+       "file_path": string,
+       "edits": [ { "search": string, "replace": string } ]
+   }
+   or with "diff": a unified diff string instead of "edits".
+   Each search string must match exactly once.
+   Prefer this over write_file when changing a few lines of an existing file.
+
 You MUST respond ONLY in valid JSON.
 The current project name must be reused unless user specifies otherwise.
 All Java source files must be placed inside:
@@ -78,6 +147,19 @@ If a tool is needed:
   "parameters": { ... }
 }
 
+If several tools are needed, return all of them in one plan:
+
+{
+  "steps": [
+    { "id": "s1", "action": "create_project", "parameters": { ... } },
+    { "id": "s2", "action": "write_file", "parameters": { ... }, "depends_on": ["s1"] },
+    { "id": "s3", "action": "write_file", "parameters": { ... }, "depends_on": ["s1"] },
+    { "id": "s4", "action": "run_maven", "parameters": { ... }, "depends_on": ["s2", "s3"] }
+  ]
+}
+Steps without depends_on run after all earlier steps,
+except that write_file steps for different files may run in parallel.
+
 If no tool is needed:
 
 {
@@ -96,6 +178,44 @@ conversation_history = [
     {"role": "system", "content": SYSTEM_PROMPT}
 ]
 
+
+def chat_completion(messages, model=LLM_MODEL, temperature=0, use_cache=True):
+    """
+    LLM 호출. temperature=0이면 같은 입력에 같은 응답이므로 캐시를 먼저 본다.
+    use_cache=False로 캐시를 건너뛸 수 있다 (응답은 새로 저장된다).
+    """
+    cacheable = USE_LLM_CACHE and temperature == 0
+    key = LLMCache.make_key(model, messages, {"temperature": temperature}) if cacheable else None
+
+    if cacheable and use_cache:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+    response = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=temperature
+    )
+    content = response.choices[0].message.content.strip()
+
+    if cacheable:
+        llm_cache.put(key, content)
+
+    return content
+
+
+def summarize_llm(prompt):
+    return chat_completion([{"role": "user", "content": prompt}])
+
+
+# 대화 이력 토큰 예산 (넘으면 오래된 턴을 요약으로 접는다)
+token_budget = TokenBudget(
+    Summarizer(llm=summarize_llm),
+    max_tokens=int(os.getenv("OPENVIPER_HISTORY_TOKENS", "6000")),
+    keep_recent=int(os.getenv("OPENVIPER_HISTORY_KEEP_RECENT", "6"))
+)
+
 def extract_json(text):
     match = re.search(r'\{.*\}', text, re.DOTALL)
     if not match:
@@ -112,22 +232,269 @@ def build_context(user_input):
         "recent_errors": memory.get_recent_errors()
     }
     return context
+
+
+# Java 심볼 인덱스 (서버의 WORKSPACE와 같은 폴더). 파일을 통째로 넣지 않고 질문과 관련된 심볼 소스만 붙인다
+WORKSPACE_DIR = os.getenv("OPENVIPER_WORKSPACE", "D:/openviper/workspace")
+context_builder = ContextBuilder(get_symbol_index(WORKSPACE_DIR) if os.path.isdir(WORKSPACE_DIR) else None)
+
+
+def code_context(user_input):
+    """
+    현재 프로젝트(마지막으로 다룬 파일 우선)에서 질문과 관련된 코드를 찾는다. 없으면 None.
+    대화 이력에는 남기지 않고 이번 호출에만 system 메시지로 붙인다 (매 턴 다시 찾으므로)
+    """
+    project = memory.get_project()
+    if context_builder.symbol_index is None or not project:
+        return None
+
+    context = {}
+    last_file = memory.get_last_file()
+    path = os.path.join(WORKSPACE_DIR, project, last_file) if last_file else None
+    if path and last_file.endswith(".java") and os.path.isfile(path):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            context_builder.add_file_context(context, f"{project}/{last_file}", f.read(), query=user_input)
+    if "relevant_symbols" not in context:
+        context_builder.add_code_context(context, project, user_input)
+
+    parts = []
+    if context.get("file_outline"):
+        parts.append(f"Outline of {context['current_file']}:\n" + "\n".join(context["file_outline"]))
+    elif context.get("file_content"):
+        parts.append(f"{context['current_file']}:\n{context['file_content']}")
+    for snippet in context.get("relevant_symbols", []):
+        parts.append(f"// {snippet['file']}:{snippet['start']}-{snippet['end']} ({snippet['symbol']})\n{snippet['source']}")
+
+    if not parts:
+        return None
+    return "Relevant code from the workspace:\n\n" + "\n\n".join(parts)
+
+
+def with_context(history, context):
+    """이번 호출에 보낼 메시지 (context는 마지막 사용자 메시지 바로 앞에 끼우고 이력에는 넣지 않는다)"""
+    if not context:
+        return history
+    return history[:-1] + [{"role": "system", "content": context}] + history[-1:]
     
 # ==============================
 # 🤖 LLM 호출
 # ==============================
 
-def call_llm(user_input):
-
+# LLM 응답을 토큰 단위로 받아 계획을 점진적으로 파싱 (OPENVIPER_LLM_STREAM=0 이면 한 번에)
+USE_LLM_STREAM = os.getenv("OPENVIPER_LLM_STREAM", "1") == "1"
+CONTENT_PATH = ("parameters", "content")
+
+UPLOAD_ABORT = object()
+
+
+class UploadAborted(Exception):
+    pass
+
+
+class StreamingFileUpload:
+    """
+    write_file content를 LLM이 생성하는 대로 /write_file_stream으로 흘려보낸다.
+    """
+
+    def __init__(self, project_name, file_path):
+        self.chunks = queue.Queue()
+        self.result = None
+        self.thread = threading.Thread(
+            target=self._run, args=(project_name, file_path), daemon=True
+        )
+        self.thread.start()
+
+    def _body(self):
+        # 끝 표시(STREAM_TRAILER + sha256)가 있어야 서버가 원래 파일을 교체한다.
+        # abort면 예외로 본문을 끊어서 서버가 임시 파일을 지우게 한다
+        hasher = hashlib.sha256()
+        while True:
+            chunk = self.chunks.get()
+            if chunk is None:
+                yield end_marker(hasher)
+                return
+            if chunk is UPLOAD_ABORT:
+                raise UploadAborted("LLM stream ended before content was complete")
+            data = chunk.encode("utf-8")
+            hasher.update(data)
+            yield data
+
+    def _run(self, project_name, file_path):
+        try:
+            response = mcp.post(
+                "write_file_stream",
+                params={"project_name": project_name, "file_path": file_path},
+                data=self._body(),
+                stream=True
+            )
+            if response.status_code != 200:
+                self.result = {
+                    "status": "error",
+                    "message": f"HTTP {response.status_code}",
+                    "detail": response.text
+                }
+            else:
+                self.result = response.json()
+        except UploadAborted as e:
+            self.result = {"status": "error", "message": "Upload aborted", "detail": str(e)}
+        except requests.exceptions.RequestException as e:
+            self.result = {
+                "status": "error",
+                "message": "MCP server connection failed",
+                "detail": str(e)
+            }
+        except Exception as e:
+            self.result = {"status": "error", "message": "Upload failed", "detail": str(e)}
+
+    def write(self, text):
+        self.chunks.put(text)
+
+    def finish(self):
+        self.chunks.put(None)
+        self.thread.join()
+        return self.result
+
+    def abort(self):
+        """끝 표시 없이 연결을 끊는다 → 서버는 원래 파일을 건드리지 않는다"""
+        self.chunks.put(UPLOAD_ABORT)
+        self.thread.join()
+        return self.result
+
+
+class PlanStreamHandler:
+    """
+    파서 이벤트를 받아 action / project_name / file_path가 확정되는 즉시 반응한다.
+    write_file이면 content를 기다리지 않고 업로드를 시작한다.
+    경로가 content보다 늦게 나오면 그때까지 받은 content는 임시 파일에 모아 둔다.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.upload = None
+        self.spool = None
+        self.content_chars = 0
+
+    def handle(self, kind, path, value):
+        if kind == "value" and path in (("action",), ("parameters", "project_name"), ("parameters", "file_path")):
+            self.values[path[-1]] = value
+            self._maybe_start_upload()
+        elif kind == "chunk" and path == CONTENT_PATH:
+            self.content_chars += len(value)
+            if self.upload is not None:
+                self.upload.write(value)
+            else:
+                if self.spool is None:
+                    self.spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024, mode="w+", encoding="utf-8")
+                self.spool.write(value)
+
+    def _maybe_start_upload(self):
+        if self.upload is not None or self.values.get("action") != "write_file":
+            return
+        # local 모드에서는 올릴 서버가 없다. content를 모아 뒀다가 write_file로 한 번에 쓴다
+        if local_mcp is not None:
+            return
+        if "project_name" not in self.values or "file_path" not in self.values:
+            return
+
+        self.upload = StreamingFileUpload(self.values["project_name"], self.values["file_path"])
+
+        if self.spool is not None:
+            self.spool.seek(0)
+            for chunk in iter(lambda: self.spool.read(64 * 1024), ""):
+                self.upload.write(chunk)
+            self.spool.close()
+            self.spool = None
+
+    def finish(self):
+        """
+        업로드를 마치고 결과를 돌려준다.
+        업로드하지 못했으면 None을 돌려주고, 모아 둔 content는 self.spooled_content에 남긴다.
+        """
+        self.spooled_content = None
+        if self.spool is not None:
+            self.spool.seek(0)
+            self.spooled_content = self.spool.read()
+            self.spool.close()
+            self.spool = None
+        return self.upload.finish() if self.upload is not None else None
+
+    def abort(self):
+        """응답이 잘렸거나 스트림이 실패했으면 업로드를 취소한다"""
+        if self.spool is not None:
+            self.spool.close()
+            self.spool = None
+        if self.upload is not None:
+            self.upload.abort()
+
+
+def call_llm_stream(user_input, use_cache=True, context=None):
     conversation_history.append({"role": "user", "content": user_input})
+    conversation_history[:] = token_budget.compact(conversation_history)
+    messages = with_context(conversation_history, context)
+
+    cacheable = USE_LLM_CACHE
+    key = LLMCache.make_key(LLM_MODEL, messages, {"temperature": 0}) if cacheable else None
+    cached = llm_cache.get(key) if cacheable and use_cache else None
+
+    if cached is not None:
+        pieces = [cached]
+    else:
+        stream = client.chat.completions.create(
+            model=LLM_MODEL,
+            messages=messages,
+            temperature=0,
+            stream=True
+        )
+        pieces = (chunk.choices[0].delta.content or "" for chunk in stream if chunk.choices)
+
+    parser = IncrementalJSONParser(stream_paths={CONTENT_PATH})
+    handler = PlanStreamHandler()
+    # 캐시에 넣을 때만 원문 전체를 모은다
+    raw = [] if cacheable and cached is None else None
 
-    response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=conversation_history,
-        temperature=0
-    )
+    try:
+        for text in pieces:
+            if raw is not None:
+                raw.append(text)
+            for kind, path, value in parser.feed(text):
+                handler.handle(kind, path, value)
+    except BaseException:
+        handler.abort()
+        raise
+
+    # 잘린/잘못된 응답이면 끝 표시를 보내지 않는다 (부분 파일이 원본을 덮지 않도록)
+    if not parser.done:
+        handler.abort()
+        raise ValueError("No JSON object found in LLM response")
 
-    content = response.choices[0].message.content.strip()
+    if raw is not None:
+        llm_cache.put(key, "".join(raw).strip())
+
+    upload_result = handler.finish()
+
+    plan = parser.result
+
+    if upload_result is not None:
+        # content는 이미 디스크에 있으므로 이력에는 요약만 남긴다
+        plan["parameters"]["content"] = f"<{handler.content_chars} chars streamed to {plan['parameters']['file_path']}>"
+        conversation_history.append({"role": "assistant", "content": json.dumps(plan, ensure_ascii=False)})
+        plan["_result"] = upload_result
+    else:
+        if handler.spooled_content is not None:
+            plan["parameters"]["content"] = handler.spooled_content
+        conversation_history.append({"role": "assistant", "content": json.dumps(plan, ensure_ascii=False)})
+
+    return plan
+
+
+def call_llm(user_input, use_cache=True, context=None):
+    if USE_LLM_STREAM:
+        return call_llm_stream(user_input, use_cache, context)
+
+    conversation_history.append({"role": "user", "content": user_input})
+    conversation_history[:] = token_budget.compact(conversation_history)
+
+    content = chat_completion(with_context(conversation_history, context), use_cache=use_cache)
 
     # LLM 응답도 저장
     conversation_history.append({"role": "assistant", "content": content})
@@ -140,10 +507,29 @@ def call_llm(user_input):
 # 🔌 MCP 서버 호출
 # ==============================
 
-def call_mcp(action, params):
+# 출력을 실시간 스트리밍으로 받을 액션 (SSE)
+STREAMING_ACTIONS = {"run_maven", "run_java"}
+
+
+def print_output_line(stream, line):
+    out = sys.stdout if stream == "stdout" else sys.stderr
+    out.write(line)
+    out.flush()
+
+
+def call_mcp(action, params, on_line=print_output_line):
+    """on_line(stream, line): run_maven/run_java 출력 한 줄마다 호출된다"""
+    if local_mcp is not None:
+        if action in STREAMING_ACTIONS:
+            on_line("stdout", f"\n[OUTPUT] {action}\n")
+            return local_mcp.call(action, params, on_line=on_line)
+        return local_mcp.call(action, params)
+
+    if action in STREAMING_ACTIONS:
+        return call_mcp_stream(action, params, on_line)
+
     try:
-        url = f"{MCP_SERVER_URL}/{action}"
-        response = requests.post(url, json=params, timeout=60)
+        response = mcp.post(action, json=params)
 
         if response.status_code != 200:
             return {
@@ -162,6 +548,170 @@ def call_mcp(action, params):
         }
 
 
+def iter_sse_events(response):
+    """SSE 응답을 (event, data) 쌍으로 읽는다"""
+    event, data_lines = "message", []
+
+    for line in response.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+
+        if line == "":
+            if data_lines:
+                yield event, json.loads("\n".join(data_lines))
+            event, data_lines = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:"):].strip())
+
+
+def call_mcp_stream(action, params, on_line=print_output_line):
+    """
+    빌드/실행 출력을 줄 단위로 받아 바로 화면에 출력하고 최종 결과를 반환한다.
+    """
+    try:
+        # 연결 타임아웃만 두고 읽기는 서버 측 타임아웃에 맡긴다
+        response = mcp.post(action, path=f"{action}/stream", json=params, stream=True)
+
+        if response.status_code != 200:
+            return {
+                "status": "error",
+                "message": f"HTTP {response.status_code}",
+                "detail": response.text
+            }
+
+        # 검증 실패 등은 스트림이 아닌 일반 JSON으로 온다
+        if not response.headers.get("content-type", "").startswith("text/event-stream"):
+            return response.json()
+
+        result = {"status": "error", "message": "Stream ended without result"}
+
+        on_line("stdout", f"\n[OUTPUT] {action}\n")
+        for event, data in iter_sse_events(response):
+            if event in ("stdout", "stderr"):
+                on_line(event, data["line"])
+            elif event == "result":
+                result = data
+
+        return result
+
+    except requests.exceptions.RequestException as e:
+        return {
+            "status": "error",
+            "message": "MCP server connection failed",
+            "detail": str(e)
+        }
+
+
+# ==============================
+# 🧩 다단계 계획 실행
+# ==============================
+
+# 서로 독립적으로 실행해도 되는 액션 (다른 파일을 대상으로 할 때)
+PARALLEL_ACTIONS = {"write_file"}
+MAX_PARALLEL_STEPS = int(os.getenv("OPENVIPER_MAX_PARALLEL_STEPS", "8"))
+
+
+output_lock = threading.Lock()
+
+
+def step_output(step_id):
+    """여러 step이 동시에 출력해도 섞이지 않도록 줄 단위로 접두어를 붙여 한 번에 쓴다"""
+    def on_line(stream, text):
+        prefixed = "".join(f"[STEP {step_id}] {line}" for line in text.splitlines(keepends=True))
+        with output_lock:
+            print_output_line(stream, prefixed)
+    return on_line
+
+
+def resolve_dependencies(steps):
+    """
+    각 step의 id와 의존 관계를 정한다.
+    depends_on이 없으면 앞선 모든 step에 의존하되,
+    PARALLEL_ACTIONS끼리(대상 파일이 다르면)는 의존하지 않는다.
+    """
+    for index, step in enumerate(steps):
+        step.setdefault("id", f"s{index + 1}")
+
+    ids = {step["id"] for step in steps}
+    if len(ids) != len(steps):
+        # 같은 id가 하나의 노드로 합쳐지면 step이 조용히 사라지므로 계획 전체를 거부한다
+        seen = set()
+        duplicates = sorted({step["id"] for step in steps if step["id"] in seen or seen.add(step["id"])})
+        raise ValueError(f"Duplicate step ids: {', '.join(duplicates)}")
+
+    for index, step in enumerate(steps):
+        if "depends_on" in step:
+            step["depends_on"] = [d for d in step["depends_on"] if d in ids and d != step["id"]]
+            continue
+
+        deps = []
+        for earlier in steps[:index]:
+            independent = (
+                step.get("action") in PARALLEL_ACTIONS
+                and earlier.get("action") in PARALLEL_ACTIONS
+                and earlier.get("parameters", {}).get("file_path") != step.get("parameters", {}).get("file_path")
+            )
+            if not independent:
+                deps.append(earlier["id"])
+        step["depends_on"] = deps
+
+    return steps
+
+
+def execute_steps(steps):
+    """
+    의존 관계가 풀린 step부터 MCP 서버에 동시에 보낸다.
+    실패한 step에 (전이적으로) 의존하는 step은 실행하지 않는다.
+    결과는 steps 순서대로 돌려준다.
+    동시에 도는 step의 출력은 줄마다 [STEP id]를 붙여 구분한다.
+    """
+    try:
+        steps = resolve_dependencies(steps)
+    except ValueError as e:
+        return [
+            {"id": step.get("id"), "action": step.get("action"), "result": {"status": "error", "message": f"Plan rejected: {e}"}}
+            for step in steps
+        ]
+
+    results = {}
+    remaining = {step["id"]: step for step in steps}
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_STEPS) as executor:
+        while remaining or running:
+            for step_id, step in list(remaining.items()):
+                deps = step["depends_on"]
+
+                if any(results.get(d, {}).get("status") in ("error", "skipped") for d in deps):
+                    results[step_id] = {"status": "skipped", "message": "dependency failed"}
+                    del remaining[step_id]
+                elif all(d in results for d in deps):
+                    print(f"[STEP {step_id}] → {step.get('action')}")
+                    future = executor.submit(
+                        call_mcp, step.get("action"), step.get("parameters", {}), step_output(step_id)
+                    )
+                    running[future] = step_id
+                    del remaining[step_id]
+
+            if not running:
+                # 순환 의존 등으로 더 진행할 수 없음
+                for step_id in remaining:
+                    results[step_id] = {"status": "skipped", "message": "unresolvable dependency"}
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step_id = running.pop(future)
+                try:
+                    results[step_id] = future.result()
+                except Exception as e:
+                    results[step_id] = {"status": "error", "message": str(e)}
+
+    return [{"id": step["id"], "action": step.get("action"), "result": results[step["id"]]} for step in steps]
+
+
 # ==============================
 # 🔁 대화형 루프
 # ==============================
@@ -198,8 +748,13 @@ def interactive_loop():
         if not user_input:
             continue
 
-        # 1️⃣ LLM 계획 생성
-        plan = call_llm(user_input)
+        # 1️⃣ LLM 계획 생성 (현재 프로젝트의 관련 심볼 소스를 함께 보낸다)
+        try:
+            plan = call_llm(user_input, context=code_context(user_input))
+        except ValueError as e:
+            # JSON이 아닌 응답 (스트리밍이면 PlanParseError, 업로드 중이던 파일은 이미 abort됨)
+            print(f"\n[LLM ERROR] {e}\n")
+            continue
         
         context = build_context(user_input)
 
@@ -209,6 +764,23 @@ def interactive_loop():
             {"role": "user", "content": user_input}
         ]
 
+        if isinstance(plan.get("steps"), list):
+            # 2️⃣ 다단계 계획: 독립 step은 동시에, 의존 step은 순서대로
+            print(f"\n[PLAN] → {len(plan['steps'])} steps")
+            step_results = execute_steps(plan["steps"])
+
+            print("\n[RESULT]")
+            print(json.dumps(step_results, indent=2, ensure_ascii=False))
+            print("\n----------------------------------------\n")
+
+            with memory.batch():
+                if plan["steps"]:
+                    memory.set_last_action(plan["steps"][-1].get("action"))
+                for step in plan["steps"]:
+                    remember_target(step.get("parameters", {}))
+                memory.add_history(user_input, plan)
+            continue
+
         action = plan.get("action")
 
         if action == "none":
@@ -219,22 +791,31 @@ def interactive_loop():
         print("[PARAMS]")
         print(json.dumps(plan.get("parameters", {}), indent=2, ensure_ascii=False))
 
-        # 2️⃣ MCP 실행
-        result = call_mcp(action, plan.get("parameters", {}))
+        # 2️⃣ MCP 실행 (스트리밍 중 이미 실행된 경우 그 결과 사용)
+        if "_result" in plan:
+            result = plan.pop("_result")
+        else:
+            result = call_mcp(action, plan.get("parameters", {}))
 
         print("\n[RESULT]")
         print(json.dumps(result, indent=2, ensure_ascii=False))
         print("\n----------------------------------------\n")
         
-        memory.set_last_action(plan.get("action"))
+        # 한 턴의 메모리 변경은 한 번에 기록
+        with memory.batch():
+            memory.set_last_action(plan.get("action"))
+
+            remember_target(plan.get("details") or plan.get("parameters", {}))
 
-        if "project_name" in plan.get("details", {}):
-            memory.set_project(plan["details"]["project_name"])
+            memory.add_history(user_input, plan)
 
-        if "file_path" in plan.get("details", {}):
-            memory.set_last_file(plan["details"]["file_path"])
 
-        memory.add_history(user_input, plan)
+def remember_target(params):
+    # 계획의 인자는 "parameters"에 있다 (관련 코드 검색이 이 값을 쓴다)
+    if "project_name" in params:
+        memory.set_project(params["project_name"])
+    if "file_path" in params:
+        memory.set_last_file(params["file_path"])
 
 
 # ==============================
@@ -242,4 +823,12 @@ def interactive_loop():
 # ==============================
 
 if __name__ == "__main__":
-    interactive_loop()
\ No newline at end of file
+    try:
+        interactive_loop()
+    finally:
+        memory.close()
+        print(f"[LLM CACHE] {json.dumps(llm_cache.stats())}")
+        llm_cache.close()
+        mcp.close()
+        if local_mcp is not None:
+            local_mcp.close()
\ No newline at end of file
@@ -0,0 +1,323 @@
+# jobs.py
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+
+# -----------------------------
+# 비동기 프로세스 실행
+# -----------------------------
+# 출력은 고정 크기로 읽는다
+STREAM_CHUNK_SIZE = 64 * 1024
+# 줄바꿈 없이 이보다 길어진 출력은 잘라서 한 줄로 내보낸다 (긴 Maven 로그 줄, 진행 표시 등)
+STREAM_LINE_LIMIT = 1024 * 1024
+# 구독자 한 명이 밀릴 수 있는 최대 줄 수 (넘으면 실시간 출력에서 뺀다)
+SUBSCRIBER_QUEUE_SIZE = 10000
+
+
+async def _read_lines(stream: asyncio.StreamReader) -> AsyncIterator[bytes]:
+    """
+    readline()은 한 줄이 limit를 넘으면 ValueError를 내므로 고정 크기로 읽어 직접 줄을 나눈다.
+    줄바꿈은 줄 끝에 그대로 남긴다
+    """
+    pending = b""
+    while True:
+        chunk = await stream.read(STREAM_CHUNK_SIZE)
+        if not chunk:
+            if pending:
+                yield pending
+            return
+
+        pending += chunk
+        start = 0
+        while (end := pending.find(b"\n", start)) >= 0:
+            yield pending[start:end + 1]
+            start = end + 1
+        pending = pending[start:]
+
+        while len(pending) >= STREAM_LINE_LIMIT:
+            yield pending[:STREAM_LINE_LIMIT]
+            pending = pending[STREAM_LINE_LIMIT:]
+
+
+async def _pump(
+    stream: asyncio.StreamReader,
+    name: str,
+    retained: deque,
+    on_line: Optional[Callable[[str, str], None]]
+) -> int:
+    """읽은 줄 수를 돌려준다 (retained에 남지 못하고 밀려난 줄 수를 알기 위해)"""
+    count = 0
+    async for line in _read_lines(stream):
+        count += 1
+        text = line.decode("utf-8", errors="replace")
+        retained.append(text)
+        if on_line:
+            on_line(name, text)
+    return count
+
+
+async def run_command(
+    args: list[str],
+    cwd: str,
+    timeout: float,
+    on_line: Optional[Callable[[str, str], None]] = None,
+    retain_lines: Optional[int] = None
+) -> dict:
+    """
+    asyncio subprocess로 명령을 실행한다.
+    이벤트 루프를 막지 않으므로 빌드 중에도 다른 엔드포인트가 응답한다.
+
+    출력은 줄 단위로 읽어 on_line(stream, line)으로 즉시 전달하고,
+    결과에는 스트림별 마지막 retain_lines 줄만 남긴다 (None이면 전부).
+    """
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        limit=STREAM_LINE_LIMIT
+    )
+
+    stdout_lines: deque = deque(maxlen=retain_lines)
+    stderr_lines: deque = deque(maxlen=retain_lines)
+
+    pumps = asyncio.gather(
+        _pump(process.stdout, "stdout", stdout_lines, on_line),
+        _pump(process.stderr, "stderr", stderr_lines, on_line),
+        process.wait()
+    )
+    # 취소로 끝나면 gather의 예외를 아무도 꺼내지 않으므로 경고가 남지 않게 소비한다
+    pumps.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+    try:
+        stdout_count, stderr_count, _ = await asyncio.wait_for(pumps, timeout=timeout)
+    finally:
+        # 타임아웃뿐 아니라 취소/예외로 빠져나갈 때도 자식 프로세스를 남기지 않는다
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+            await asyncio.shield(process.wait())
+
+    # 앞부분이 밀려나 버려진 줄이 있을 때만 truncated
+    truncated = retain_lines is not None and (
+        stdout_count > len(stdout_lines) or stderr_count > len(stderr_lines)
+    )
+
+    return {
+        "returncode": process.returncode,
+        "stdout": "".join(stdout_lines),
+        "stderr": "".join(stderr_lines),
+        "truncated": truncated
+    }
+
+
+# -----------------------------
+# Job
+# -----------------------------
+# 너무 느려서 실시간 출력에서 빠진 구독자에게 보내는 표시
+_DROPPED = object()
+
+
+class Job:
+    def __init__(self, kind: str, project_name: str, params: dict, retain_lines: int = 2000):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.project_name = project_name
+        self.params = params
+        self.status = "queued"
+        self.result: Optional[dict] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+        # 실시간 출력: 최근 retain_lines 줄만 보관, 구독자에게는 즉시 전달
+        self.output: deque = deque(maxlen=retain_lines)
+        self._subscribers: list[asyncio.Queue] = []
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("success", "error", "cancelled")
+
+    def emit(self, stream: str, line: str):
+        item = (stream, line)
+        self.output.append(item)
+        for queue in list(self._subscribers):
+            if queue.full():
+                self._drop(queue)
+            else:
+                queue.put_nowait(item)
+
+    def _drop(self, queue: asyncio.Queue):
+        """
+        못 따라오는 구독자 때문에 메모리가 끝없이 늘지 않도록 실시간 출력에서 뺀다
+        (한 줄을 버려 자리를 만들고 끝 표시를 넣는다)
+        """
+        queue.get_nowait()
+        queue.put_nowait(_DROPPED)
+        self._subscribers.remove(queue)
+
+    def _close_subscribers(self):
+        for queue in list(self._subscribers):
+            if queue.full():
+                self._drop(queue)
+            else:
+                queue.put_nowait(None)
+
+    async def events(self) -> AsyncIterator[tuple[str, str]]:
+        """
+        보관된 출력부터 내보낸 뒤, 작업이 끝날 때까지 새 줄을 실시간으로 내보낸다.
+        SUBSCRIBER_QUEUE_SIZE줄 넘게 밀리면 안내 줄을 내보내고 먼저 끝난다 (결과는 작업이 끝난 뒤 따로 받는다)
+        """
+        backlog = list(self.output)
+
+        if self.done:
+            for item in backlog:
+                yield item
+            return
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.append(queue)
+        try:
+            for item in backlog:
+                yield item
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                if item is _DROPPED:
+                    notice = f"[openviper] live output stopped: client fell more than {queue.maxsize} lines behind\n"
+                    yield ("stderr", notice)
+                    break
+                yield item
+        finally:
+            if queue in self._subscribers:
+                self._subscribers.remove(queue)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "project_name": self.project_name,
+            "params": self.params,
+            "status": self.status,
+            "result": self.result,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class QueueFullError(Exception):
+    pass
+
+
+# -----------------------------
+# JobQueue
+# -----------------------------
+class JobQueue:
+    """
+    빌드/실행 작업 큐.
+    - 전체 동시 실행 수 제한 (max_concurrency)
+    - 프로젝트별 동시 실행 수 제한 (per_project_limit)
+    - 대기 중인 작업 수 제한 (max_pending) → 초과 시 QueueFullError
+    - 완료된 작업은 max_finished 개까지만 보관
+    - 작업별 출력은 retain_lines 줄까지만 메모리에 보관
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        per_project_limit: int = 1,
+        max_pending: int = 64,
+        max_finished: int = 256,
+        retain_lines: int = 2000
+    ):
+        self.max_concurrency = max_concurrency
+        self.per_project_limit = per_project_limit
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self.retain_lines = retain_lines
+
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._global_slots: Optional[asyncio.Semaphore] = None
+        self._project_slots: dict[str, asyncio.Semaphore] = {}
+
+    def _slots(self) -> asyncio.Semaphore:
+        # 세마포어는 이벤트 루프 안에서 생성해야 한다
+        if self._global_slots is None:
+            self._global_slots = asyncio.Semaphore(self.max_concurrency)
+        return self._global_slots
+
+    def _project_slot(self, project_name: str) -> asyncio.Semaphore:
+        if project_name not in self._project_slots:
+            self._project_slots[project_name] = asyncio.Semaphore(self.per_project_limit)
+        return self._project_slots[project_name]
+
+    def pending_count(self) -> int:
+        return sum(1 for job in self.jobs.values() if not job.done)
+
+    def submit(
+        self,
+        kind: str,
+        project_name: str,
+        params: dict,
+        runner: Callable[[Job], Awaitable[dict]]
+    ) -> Job:
+        if self.pending_count() >= self.max_pending:
+            raise QueueFullError(f"Job queue is full ({self.max_pending} pending)")
+
+        job = Job(kind, project_name, params, retain_lines=self.retain_lines)
+        self.jobs[job.id] = job
+        job.task = asyncio.create_task(self._run(job, runner))
+        return job
+
+    async def run(
+        self,
+        kind: str,
+        project_name: str,
+        params: dict,
+        runner: Callable[[Job], Awaitable[dict]]
+    ) -> dict:
+        """submit 후 완료까지 대기하고 결과를 반환한다"""
+        job = self.submit(kind, project_name, params, runner)
+        await job.task
+        return job.result
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def _run(self, job: Job, runner: Callable[[Job], Awaitable[dict]]):
+        # 프로젝트 슬롯을 먼저 잡아야 같은 프로젝트 대기 작업이 전역 슬롯을 점유하지 않는다
+        try:
+            async with self._project_slot(job.project_name):
+                async with self._slots():
+                    job.status = "running"
+                    job.started_at = time.time()
+                    try:
+                        result = await runner(job)
+                    except Exception as e:
+                        result = {"status": "error", "stderr": str(e)}
+
+            job.result = result
+            job.status = "success" if result.get("status") == "success" else "error"
+        except asyncio.CancelledError:
+            # run()을 기다리던 쪽이 취소됐거나 서버 종료 → 대기 수에서 빠지도록 끝난 상태로 둔다
+            job.result = {"status": "error", "stderr": "Job cancelled"}
+            job.status = "cancelled"
+            raise
+        finally:
+            job.finished_at = time.time()
+            job._close_subscribers()
+            self._evict_finished()
+
+    def _evict_finished(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job_id]
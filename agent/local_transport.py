@@ -0,0 +1,104 @@
+# local_transport.py
+
+import asyncio
+import threading
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+
+class LocalTransport:
+    """
+    HTTP 없이 agent/server.py의 핸들러를 같은 프로세스에서 직접 호출한다 (단일 사용자용).
+    - 요청 모델만 만들어 넘기고 JSON 직렬화/소켓 왕복은 없다
+    - async 핸들러와 작업 큐는 전용 이벤트 루프 스레드 하나에서 돌린다
+      (JobQueue의 세마포어와 Maven 데몬 정리 태스크가 한 루프에 묶여 있어야 한다)
+    - 응답 형식은 call_mcp와 같다 (HTTPException → {"status": "error", ...})
+    """
+
+    def __init__(self):
+        # 서버 모듈은 이 모드를 쓸 때만 불러온다 (WORKSPACE 생성, 풀/캐시 초기화 포함)
+        from agent import server
+
+        self.server = server
+        self.handlers: dict[str, tuple[Callable, Optional[type]]] = {
+            "create_project": (server.create_project, server.CreateProjectRequest),
+            "write_file": (server.write_file, server.WriteFileRequest),
+            "write_files": (server.write_files, server.WriteFilesRequest),
+            "patch_file": (server.patch_file, server.PatchFileRequest),
+            "move_file": (server.move_file, server.MoveFileRequest),
+            "run_maven": (server.run_maven, server.RunMavenRequest),
+            "run_java": (server.run_java, server.RunJavaRequest),
+            "compile": (server.compile_incremental, server.CompileRequest),
+            "jobs": (server.submit_job, server.JobRequest),
+            "maven_pool": (server.maven_pool_status, None),
+            "build_cache": (server.build_cache_status, None),
+        }
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="local-mcp", daemon=True)
+        self.thread.start()
+        self._await(server.start_background_tasks())
+
+    def _await(self, coro, timeout: Optional[float] = None) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    @staticmethod
+    def _http_error(e: HTTPException) -> dict:
+        return {"status": "error", "message": f"HTTP {e.status_code}", "detail": e.detail}
+
+    def call(self, action: str, params: dict, on_line: Optional[Callable[[str, str], None]] = None) -> dict:
+        """
+        on_line(stream, line)을 주면 run_maven/run_java 출력을 줄 단위로 받는다
+        (HTTP 모드의 SSE 스트리밍과 같은 역할).
+        """
+        if action not in self.handlers:
+            return {"status": "error", "message": "HTTP 404", "detail": f"Unknown action: {action}"}
+
+        handler, model = self.handlers[action]
+
+        try:
+            if on_line is not None and action in ("run_maven", "run_java"):
+                return self._await(self._run_streaming(action, model(**params), on_line))
+
+            args = (model(**params),) if model is not None else ()
+            if asyncio.iscoroutinefunction(handler):
+                return self._await(handler(*args))
+            return handler(*args)
+
+        except ValidationError as e:
+            return {"status": "error", "message": "HTTP 422", "detail": str(e)}
+        except HTTPException as e:
+            return self._http_error(e)
+        except Exception as e:
+            # HTTP 모드에서는 500 에러 응답이 되는 경우. 대화 루프가 죽지 않도록 같은 형태로 돌려준다
+            return {"status": "error", "message": str(e)}
+
+    async def _run_streaming(self, action: str, req, on_line: Callable[[str, str], None]) -> dict:
+        server = self.server
+        runner, error = server._resolve_runner(
+            action, req.project_name,
+            goal=getattr(req, "goal", "package"),
+            main_class=getattr(req, "main_class", None)
+        )
+        if error:
+            return error
+
+        try:
+            job = server.job_queue.submit(action, req.project_name, req.dict(), runner)
+        except server.QueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e))
+
+        async for stream, line in job.events():
+            on_line(stream, line)
+
+        await job.task
+        return job.result
+
+    def close(self):
+        try:
+            self._await(self.server.stop_background_tasks(), timeout=30)
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=5)
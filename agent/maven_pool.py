@@ -0,0 +1,221 @@
+# maven_pool.py
+
+import asyncio
+import shutil
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from agent.jobs import run_command
+
+
+# 빌드 실패가 아니라 데몬 자체의 문제(연결/기동 실패, 데몬 비정상 종료)를 뜻하는 mvnd 출력
+DAEMON_FAILURE_MARKERS = (
+    "DaemonException",
+    "Could not connect to daemon",
+    "Could not start daemon",
+    "daemon has stopped",
+    "daemon disappeared",
+)
+
+
+# -----------------------------
+# Warm worker
+# -----------------------------
+class MavenWorker:
+    """
+    프로젝트 하나에 대응하는 mvnd 데몬 정보.
+    daemonStorage 디렉토리를 프로젝트별로 분리해서 데몬(JVM)이 프로젝트마다 따로 유지된다.
+    """
+
+    def __init__(self, project_name: str, storage_dir: Path):
+        self.project_name = project_name
+        self.storage_dir = storage_dir
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.last_checked = 0.0
+        self.builds = 0
+        self.failures = 0
+        # 빌드 중인 수 (0보다 크면 정리 대상에서 뺀다)
+        self.in_use = 0
+        # 연속 실패로 cold 경로를 쓰는 기한 (지나면 데몬을 다시 시도한다)
+        self.cold_until = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "project_name": self.project_name,
+            "created_at": self.created_at,
+            "last_used": self.last_used,
+            "builds": self.builds,
+            "failures": self.failures,
+            "in_use": self.in_use,
+            "cold_until": self.cold_until or None
+        }
+
+
+# -----------------------------
+# Daemon pool
+# -----------------------------
+class MavenDaemonPool:
+    """
+    mvnd(Maven Daemon) 기반의 warm 빌드 백엔드.
+    - 프로젝트별 데몬을 재사용해서 JVM 기동 / 플러그인 로딩 / POM 파싱 비용을 없앤다
+    - 일정 시간마다 `mvnd --status`로 상태 확인, 실패 시 데몬 재시작
+    - max_workers 초과 시 가장 오래 안 쓴 데몬부터, idle_timeout 지나면 유휴 데몬 종료 (빌드 중인 데몬은 제외)
+    - mvnd가 없거나 데몬이 max_failures번 연속 실패하면 None을 돌려 기존 cold 경로(mvn)를 쓰게 한다.
+      (연결/기동 실패, 비정상 종료, 타임아웃만 실패로 센다. 컴파일 오류 같은 빌드 실패는 세지 않음)
+      cold 기간은 failure_backoff초부터 실패할 때마다 두 배 (max_backoff까지), 지나면 데몬을 다시 시도하고
+      한 번 성공하면 실패 횟수를 0으로 되돌린다
+    """
+
+    def __init__(
+        self,
+        storage_root: Path,
+        max_workers: int = 4,
+        idle_timeout: float = 1800,
+        health_interval: float = 300,
+        max_failures: int = 3,
+        failure_backoff: float = 60,
+        max_backoff: float = 1800
+    ):
+        self.executable = "mvnd.cmd" if sys.platform.startswith("win") else "mvnd"
+        self.storage_root = storage_root
+        self.max_workers = max_workers
+        self.idle_timeout = idle_timeout
+        self.health_interval = health_interval
+        self.max_failures = max_failures
+        self.failure_backoff = failure_backoff
+        self.max_backoff = max_backoff
+
+        self.workers: "OrderedDict[str, MavenWorker]" = OrderedDict()
+
+    def available(self) -> bool:
+        return shutil.which(self.executable) is not None
+
+    def _daemon_args(self, worker: MavenWorker) -> list[str]:
+        return [self.executable, f"-Dmvnd.daemonStorage={worker.storage_dir}"]
+
+    # -----------------------------
+    # 획득 / 반환
+    # -----------------------------
+    async def acquire(self, project_name: str) -> Optional[MavenWorker]:
+        if not self.available():
+            return None
+
+        worker = self.workers.get(project_name)
+
+        if worker is not None and worker.failures >= self.max_failures and time.time() < worker.cold_until:
+            # 데몬이 계속 실패하면 기한까지 이 프로젝트는 cold 경로로 돌린다
+            return None
+
+        if worker is None:
+            worker = MavenWorker(project_name, self.storage_root / project_name)
+            worker.storage_dir.mkdir(parents=True, exist_ok=True)
+            worker.in_use += 1  # 넘친 데몬을 정리할 때 새 데몬이 대상이 되지 않도록 먼저 표시
+            self.workers[project_name] = worker
+            await self._evict_overflow()
+        else:
+            if worker.in_use == 0 and time.time() - worker.last_checked > self.health_interval:
+                if not await self.health_check(worker):
+                    await self._stop(worker)
+            worker.in_use += 1
+            self.workers.move_to_end(project_name)
+
+        worker.last_used = time.time()
+        return worker
+
+    def command(self, worker: MavenWorker, goal_parts: list[str]) -> list[str]:
+        return self._daemon_args(worker) + goal_parts
+
+    @staticmethod
+    def daemon_failed(output: dict) -> bool:
+        """
+        데몬이 제 역할을 못 했는지 (시그널로 죽음, 연결/기동 실패).
+        컴파일 오류나 테스트 실패로 Maven이 1을 돌려준 것은 데몬 문제가 아니다
+        """
+        if output["returncode"] is not None and output["returncode"] < 0:
+            return True
+        text = output["stderr"] + output["stdout"][-4096:]
+        return any(marker in text for marker in DAEMON_FAILURE_MARKERS)
+
+    def release(self, worker: MavenWorker, ok: Optional[bool]):
+        """
+        ok: 데몬이 정상적으로 빌드를 끝냈는지 (Maven 결과와 무관, daemon_failed 참고).
+        실패가 쌓이면 일정 기간 cold 경로로 돌린다.
+        None이면 결과 없이 (취소 등) 빌드 중 표시만 푼다
+        """
+        worker.in_use = max(0, worker.in_use - 1)
+        worker.last_used = time.time()
+        if ok is None:
+            return
+
+        worker.builds += 1
+        if ok:
+            worker.failures = 0
+            worker.cold_until = 0.0
+            return
+
+        worker.failures += 1
+        if worker.failures >= self.max_failures:
+            delay = min(self.max_backoff, self.failure_backoff * (2 ** (worker.failures - self.max_failures)))
+            worker.cold_until = time.time() + delay
+
+    # -----------------------------
+    # 상태 확인 / 종료
+    # -----------------------------
+    async def health_check(self, worker: MavenWorker) -> bool:
+        worker.last_checked = time.time()
+        try:
+            output = await run_command(
+                self._daemon_args(worker) + ["--status"],
+                cwd=str(worker.storage_dir),
+                timeout=10
+            )
+        except (asyncio.TimeoutError, OSError):
+            return False
+        return output["returncode"] == 0
+
+    async def _stop(self, worker: MavenWorker):
+        try:
+            await run_command(
+                self._daemon_args(worker) + ["--stop"],
+                cwd=str(worker.storage_dir),
+                timeout=30
+            )
+        except (asyncio.TimeoutError, OSError):
+            pass
+
+    async def evict(self, project_name: str):
+        worker = self.workers.pop(project_name, None)
+        if worker is not None:
+            await self._stop(worker)
+
+    async def _evict_overflow(self):
+        # 오래 안 쓴 순서로, 빌드 중인 데몬은 건너뛴다 (모두 빌드 중이면 잠시 max_workers를 넘긴다)
+        while len(self.workers) > self.max_workers:
+            project_name = next((name for name, worker in self.workers.items() if worker.in_use == 0), None)
+            if project_name is None:
+                return
+            await self.evict(project_name)
+
+    async def evict_idle(self):
+        now = time.time()
+        idle = [
+            name for name, worker in self.workers.items()
+            if worker.in_use == 0 and now - worker.last_used > self.idle_timeout
+        ]
+        for project_name in idle:
+            await self.evict(project_name)
+
+    async def shutdown(self):
+        for project_name in list(self.workers):
+            await self.evict(project_name)
+
+    def status(self) -> dict:
+        return {
+            "available": self.available(),
+            "max_workers": self.max_workers,
+            "workers": [worker.to_dict() for worker in self.workers.values()]
+        }
@@ -0,0 +1,182 @@
+# mcp_transport.py
+
+import socket
+import time
+from typing import Any, Optional
+from urllib.parse import quote, unquote, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool
+from urllib3.exceptions import NewConnectionError
+
+
+# 엔드포인트별 (연결, 읽기) 타임아웃. 없는 엔드포인트는 DEFAULT_TIMEOUT
+DEFAULT_TIMEOUT = (5, 60)
+ENDPOINT_TIMEOUTS = {
+    "create_project": (5, 30),
+    "write_file": (5, 30),
+    "write_files": (5, 60),
+    "patch_file": (5, 30),
+    "move_file": (5, 30),
+    "compile": (5, 120),
+    "run_maven": (5, 180),
+    "run_java": (5, 90),
+}
+
+# 같은 요청을 다시 보내도 결과가 같은 액션.
+# 이 액션만 타임아웃/5xx 후에도 재시도한다 (연결 자체가 안 된 경우는 모든 액션 재시도)
+# patch_file은 서버가 이미 적용했을 수 있고(삽입 hunk 중복, 거짓 충돌), compile은 작업이 한 번 더 큐에 들어가므로 제외
+IDEMPOTENT_ACTIONS = {"write_file", "write_files", "maven_pool", "build_cache"}
+RETRY_STATUS = {502, 503, 504}
+
+
+def parse_timeouts(spec: str) -> dict[str, tuple]:
+    """ "compile=120,write_file=10" → {"compile": (5, 120.0), ...} """
+    timeouts = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, seconds = item.partition("=")
+        timeouts[name.strip()] = (DEFAULT_TIMEOUT[0], float(seconds))
+    return timeouts
+
+
+def _never_sent(error: Exception) -> bool:
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+# -----------------------------
+# Unix domain socket 어댑터
+# -----------------------------
+class UnixHTTPConnection(HTTPConnection):
+    def __init__(self, socket_path: str, *args, **kwargs):
+        self.socket_path = socket_path
+        super().__init__("localhost", *args, **kwargs)
+
+    def _new_conn(self):
+        # urllib3의 connect()가 호출한다. TCP 대신 소켓 파일에 연결
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if isinstance(self.timeout, (int, float)):
+            sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            raise NewConnectionError(self, f"Failed to connect to {self.socket_path}: {e}") from e
+        return sock
+
+
+class UnixHTTPConnectionPool(HTTPConnectionPool):
+    def __init__(self, socket_path: str, **kwargs):
+        self.socket_path = socket_path
+        super().__init__("localhost", **kwargs)
+
+    def _new_conn(self):
+        return UnixHTTPConnection(self.socket_path, timeout=self.timeout.connect_timeout)
+
+
+class UnixAdapter(HTTPAdapter):
+    """http+unix://<quote된 소켓 경로>/<path> 요청을 하나의 keep-alive 풀로 보낸다"""
+
+    def __init__(self, pool_maxsize: int = 10, **kwargs):
+        self._pools: dict[str, UnixHTTPConnectionPool] = {}
+        self._pool_maxsize = pool_maxsize
+        super().__init__(**kwargs)
+
+    def _pool_for(self, url: str) -> UnixHTTPConnectionPool:
+        socket_path = unquote(urlparse(url).netloc)
+        pool = self._pools.get(socket_path)
+        if pool is None:
+            pool = UnixHTTPConnectionPool(socket_path, maxsize=self._pool_maxsize)
+            self._pools[socket_path] = pool
+        return pool
+
+    def get_connection(self, url, proxies=None):
+        return self._pool_for(url)
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        return self._pool_for(request.url)
+
+    def request_url(self, request, proxies):
+        return request.path_url
+
+    def close(self):
+        for pool in self._pools.values():
+            pool.close()
+        self._pools.clear()
+        super().close()
+
+
+# -----------------------------
+# Transport
+# -----------------------------
+class McpTransport:
+    """
+    MCP 서버 호출용 HTTP 클라이언트.
+    - requests.Session 하나를 재사용해서 연결을 keep-alive로 유지한다
+    - 엔드포인트별 타임아웃 (ENDPOINT_TIMEOUTS + timeouts 덮어쓰기)
+    - 연결 실패는 모든 액션, 타임아웃/5xx는 IDEMPOTENT_ACTIONS만 지수 백오프로 재시도
+    - socket_path가 있으면 TCP 대신 Unix domain socket으로 보낸다
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        socket_path: Optional[str] = None,
+        timeouts: Optional[dict[str, tuple]] = None,
+        retries: int = 2,
+        backoff: float = 0.3,
+        pool_size: int = 10
+    ):
+        self.socket_path = socket_path
+        self.timeouts = {**ENDPOINT_TIMEOUTS, **(timeouts or {})}
+        self.retries = retries
+        self.backoff = backoff
+
+        self.session = requests.Session()
+        if socket_path:
+            self.base_url = f"http+unix://{quote(socket_path, safe='')}"
+            self.session.mount("http+unix://", UnixAdapter(pool_maxsize=pool_size))
+        else:
+            self.base_url = base_url.rstrip("/")
+            self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def timeout_for(self, action: str) -> tuple:
+        return self.timeouts.get(action, DEFAULT_TIMEOUT)
+
+    def post(self, action: str, path: Optional[str] = None, stream: bool = False, **kwargs: Any) -> requests.Response:
+        """
+        path를 주지 않으면 /<action>으로 보낸다.
+        stream=True면 읽기 타임아웃 없이 연결 타임아웃만 둔다 (서버 측 타임아웃에 맡김).
+        """
+        url = self.url(path or action)
+        timeout = (self.timeout_for(action)[0], None) if stream else self.timeout_for(action)
+        idempotent = action in IDEMPOTENT_ACTIONS and not stream
+
+        # 스트리밍 업로드(제너레이터 body)는 다시 보낼 수 없다
+        replayable = not hasattr(kwargs.get("data"), "__next__")
+
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(url, stream=stream, timeout=timeout, **kwargs)
+                if not (idempotent and response.status_code in RETRY_STATUS and attempt < self.retries):
+                    return response
+                response.close()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                # 요청이 서버에 닿지 않은 경우(연결 거부/연결 타임아웃)만 모든 액션을 재시도한다
+                retry = idempotent or _never_sent(e)
+                if not (retry and replayable) or attempt >= self.retries:
+                    raise
+
+            time.sleep(self.backoff * (2 ** attempt))
+            attempt += 1
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,262 @@
+# plan_stream.py
+
+import re
+from typing import Any, Iterable
+
+WHITESPACE = " \t\r\n"
+NUMBER_CHARS = "0123456789+-.eE"
+NUMBER_RE = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+LITERALS = {"true": True, "false": False, "null": None}
+ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+HEX_DIGITS = "0123456789abcdefABCDEF"
+
+
+class PlanParseError(ValueError):
+    """LLM 출력이 올바른 JSON이 아님 (offset: 지금까지 받은 글자 중 문제 위치)"""
+
+    def __init__(self, message: str, offset: int):
+        super().__init__(f"{message} at offset {offset}")
+        self.offset = offset
+
+
+class IncrementalJSONParser:
+    """
+    토큰 단위로 들어오는 LLM 출력에서 첫 번째 JSON 객체를 점진적으로 파싱한다.
+
+    feed(text)가 돌려주는 이벤트:
+    - ("value", path, value): 스칼라 값 하나가 완성됨 (예: (("action",), "write_file"))
+    - ("chunk", path, text):  stream_paths에 해당하는 문자열 값의 일부
+    - ("done", (), obj):      최상위 객체 완성
+
+    stream_paths에 해당하는 문자열은 객체에 쌓지 않고 chunk 이벤트로만 내보낸다
+    (객체에는 None이 들어간다). 큰 write_file content를 통째로 들고 있지 않기 위함.
+    객체 앞뒤의 잡다한 텍스트는 무시하지만, 객체 안에서 JSON 문법에 맞지 않는 글자
+    (잘못된 literal/숫자/escape, 짝 없는 surrogate, 문자열 안의 제어 문자 등)를 만나면
+    PlanParseError를 낸다. 그 뒤로는 feed를 다시 부르지 않는다.
+    """
+
+    def __init__(self, stream_paths: Iterable[tuple] = ()):
+        self.stream_paths = set(stream_paths)
+        self.stack: list[dict] = []
+        self.state = "seek"
+        self.result: Any = None
+        self.done = False
+
+        self._buf: list[str] = []
+        self._is_key = False
+        self._streaming = False
+        self._escape: str | None = None
+        self._high_surrogate: int | None = None
+        self._offset = 0
+
+    def _error(self, message: str) -> PlanParseError:
+        return PlanParseError(message, self._offset)
+
+    # -----------------------------
+    # 경로 / 값 저장
+    # -----------------------------
+    def path(self) -> tuple:
+        return tuple(frame["key"] if frame["type"] == "object" else frame["index"] for frame in self.stack)
+
+    def _store(self, value: Any):
+        frame = self.stack[-1]
+        if frame["type"] == "object":
+            frame["container"][frame["key"]] = value
+        else:
+            frame["container"].append(value)
+
+    def _push(self, kind: str):
+        container: Any = {} if kind == "object" else []
+        if self.stack:
+            self._store(container)
+        else:
+            self.result = container
+        self.stack.append({"type": kind, "container": container, "key": None, "index": 0})
+        self.state = "key_or_end" if kind == "object" else "value_or_end"
+
+    def _pop(self, kind: str, events: list):
+        if self.stack[-1]["type"] != kind:
+            raise self._error(f"Mismatched closing bracket for {self.stack[-1]['type']}")
+        self.stack.pop()
+        if not self.stack:
+            self.done = True
+            self.state = "done"
+            events.append(("done", (), self.result))
+        else:
+            self.state = "after_value"
+
+    def _finish_value(self, value: Any, events: list):
+        path = self.path()
+        self._store(value)
+        events.append(("value", path, value))
+        self.state = "after_value"
+
+    # -----------------------------
+    # 문자열
+    # -----------------------------
+    def _start_string(self, is_key: bool):
+        self._buf = []
+        self._is_key = is_key
+        self._streaming = not is_key and self.path() in self.stream_paths
+        self._escape = None
+        self._high_surrogate = None
+        self.state = "string"
+
+    def _append_char(self, ch: str):
+        # \uD83D\uDE00 같은 surrogate 쌍은 한 글자로 합친다 (짝이 없으면 UTF-8로 보낼 수 없으므로 오류)
+        code = ord(ch)
+        if self._high_surrogate is not None:
+            if not 0xDC00 <= code < 0xE000:
+                raise self._error("Unpaired high surrogate in string")
+            ch = chr(0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00))
+            self._high_surrogate = None
+        elif 0xD800 <= code < 0xDC00:
+            self._high_surrogate = code
+            return
+        elif 0xDC00 <= code < 0xE000:
+            raise self._error("Unpaired low surrogate in string")
+        self._buf.append(ch)
+
+    def _flush_chunk(self, events: list):
+        if self._streaming and self._buf:
+            events.append(("chunk", self.path(), "".join(self._buf)))
+            self._buf = []
+
+    def _string_char(self, ch: str, events: list):
+        if self._escape is not None:
+            if self._escape == "":
+                if ch == "u":
+                    self._escape = "u"
+                elif ch in ESCAPES:
+                    self._append_char(ESCAPES[ch])
+                    self._escape = None
+                else:
+                    raise self._error(f"Invalid escape \\{ch}")
+            else:
+                if ch not in HEX_DIGITS:
+                    raise self._error(f"Invalid \\u escape digit {ch!r}")
+                self._escape += ch
+                if len(self._escape) == 5:
+                    self._append_char(chr(int(self._escape[1:], 16)))
+                    self._escape = None
+            return
+
+        # 이스케이프 뒤가 아닌 글자가 high surrogate 다음에 오면 짝이 없는 것
+        if self._high_surrogate is not None and ch != "\\":
+            raise self._error("Unpaired high surrogate in string")
+
+        if ch == "\\":
+            self._escape = ""
+        elif ch < " ":
+            raise self._error("Unescaped control character in string")
+        elif ch == '"':
+            self._flush_chunk(events)
+            text = "".join(self._buf)
+            self._buf = []
+            if self._is_key:
+                self.stack[-1]["key"] = text
+                self.state = "colon"
+            elif self._streaming:
+                self._store(None)
+                self.state = "after_value"
+            else:
+                self._finish_value(text, events)
+        else:
+            self._append_char(ch)
+
+    # -----------------------------
+    # 메인 루프
+    # -----------------------------
+    def feed(self, text: str) -> list[tuple]:
+        events: list[tuple] = []
+
+        for ch in text:
+            if self.done:
+                break
+            self._step(ch, events)
+            self._offset += 1
+
+        # 스트리밍 문자열은 받은 만큼 바로 내보낸다
+        if self.state == "string":
+            self._flush_chunk(events)
+
+        return events
+
+    def _step(self, ch: str, events: list):
+        state = self.state
+
+        if state == "string":
+            self._string_char(ch, events)
+            return
+
+        if state in ("number", "literal"):
+            allowed = NUMBER_CHARS if state == "number" else "truefalsn"
+            if ch in allowed:
+                self._buf.append(ch)
+                return
+            token = "".join(self._buf)
+            self._buf = []
+            if state == "number":
+                if not NUMBER_RE.fullmatch(token):
+                    raise self._error(f"Invalid number {token!r}")
+                value = float(token) if any(c in token for c in ".eE") else int(token)
+            else:
+                if token not in LITERALS:
+                    raise self._error(f"Invalid literal {token!r}")
+                value = LITERALS[token]
+            self._finish_value(value, events)
+            state = self.state
+
+        if ch in WHITESPACE:
+            return
+
+        if state == "seek":
+            if ch == "{":
+                self._push("object")
+
+        elif state in ("key", "key_or_end"):
+            if ch == '"':
+                self._start_string(is_key=True)
+            elif state == "key_or_end" and ch == "}":
+                self._pop("object", events)
+            else:
+                raise self._error(f"Expected object key, got {ch!r}")
+
+        elif state == "colon":
+            if ch != ":":
+                raise self._error(f"Expected ':', got {ch!r}")
+            self.state = "value"
+
+        elif state in ("value", "value_or_end"):
+            if state == "value_or_end" and ch == "]":
+                self._pop("array", events)
+            elif ch == '"':
+                self._start_string(is_key=False)
+            elif ch == "{":
+                self._push("object")
+            elif ch == "[":
+                self._push("array")
+            elif ch in "-0123456789":
+                self._buf = [ch]
+                self.state = "number"
+            elif ch in "tfn":
+                self._buf = [ch]
+                self.state = "literal"
+            else:
+                raise self._error(f"Expected a value, got {ch!r}")
+
+        elif state == "after_value":
+            frame = self.stack[-1]
+            if ch == ",":
+                # 끝 쉼표({"a": 1,}) 는 허용하지 않는다
+                if frame["type"] == "object":
+                    self.state = "key"
+                else:
+                    frame["index"] += 1
+                    self.state = "value"
+            elif ch == "}":
+                self._pop("object", events)
+            elif ch == "]":
+                self._pop("array", events)
+            else:
+                raise self._error(f"Expected ',' or a closing bracket, got {ch!r}")
@@ -0,0 +1,88 @@
+# project_lock.py
+
+import asyncio
+import os
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 내부 잠금만 사용 (단일 워커 전용)
+    fcntl = None
+
+
+class ProjectLocks:
+    """
+    프로젝트 단위 잠금. 여러 uvicorn/gunicorn 워커가 같은 WORKSPACE를 쓸 때
+    같은 프로젝트의 파일 쓰기/빌드가 겹치지 않게 한다.
+    - lock_dir/<project>.lock 파일에 flock (프로세스 간, 같은 프로세스의 다른 fd 사이에도 유효)
+    - shared=True는 읽기 잠금 (run_java 등), 기본은 배타 잠금 (쓰기/빌드)
+    - fd를 닫으면 잠금이 풀리므로 프로세스가 죽어도 잠금이 남지 않는다
+    - fcntl이 없으면 프로세스 내부 threading.Lock으로 대체한다 (shared도 배타로 취급)
+    """
+
+    def __init__(self, lock_dir: Path):
+        self.lock_dir = lock_dir
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        self._local_locks: dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _path(self, project_name: str) -> Path:
+        safe_name = project_name.replace(os.sep, "_").replace("/", "_")
+        return self.lock_dir / f"{safe_name}.lock"
+
+    def _local_lock(self, project_name: str) -> threading.Lock:
+        with self._guard:
+            return self._local_locks.setdefault(project_name, threading.Lock())
+
+    # -----------------------------
+    # 획득 / 해제
+    # -----------------------------
+    def _acquire(self, project_name: str, shared: bool):
+        """블로킹 획득. 해제에 필요한 핸들(fd 또는 Lock)을 돌려준다"""
+        if fcntl is None:
+            lock = self._local_lock(project_name)
+            lock.acquire()
+            return lock
+
+        fd = os.open(self._path(project_name), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd
+
+    @staticmethod
+    def _release(handle):
+        if isinstance(handle, int):
+            os.close(handle)  # flock은 fd를 닫으면 풀린다
+        else:
+            handle.release()
+
+    @contextmanager
+    def hold(self, project_name: str, shared: bool = False):
+        handle = self._acquire(project_name, shared)
+        try:
+            yield
+        finally:
+            self._release(handle)
+
+    @asynccontextmanager
+    async def hold_async(self, project_name: str, shared: bool = False):
+        """이벤트 루프를 막지 않도록 스레드에서 기다린다"""
+        acquiring = asyncio.ensure_future(asyncio.to_thread(self._acquire, project_name, shared))
+        try:
+            handle = await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # 기다리던 스레드는 결국 잠금을 얻으므로, 얻는 즉시 풀어 준다
+            acquiring.add_done_callback(
+                lambda done: None if done.cancelled() or done.exception() else self._release(done.result())
+            )
+            raise
+
+        try:
+            yield
+        finally:
+            self._release(handle)
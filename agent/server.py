@@ -1,16 +1,34 @@
 # server.py
 
 import os
-import subprocess
+import re
+import json
+import uuid
+import asyncio
+import functools
 import shutil
+import tarfile
+import tempfile
+import zipfile
 from pathlib import Path
 from fastapi import FastAPI
 from fastapi import HTTPException
-from typing import Optional
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from typing import BinaryIO, Callable, Optional, Literal
 import sys
 
 from pydantic import BaseModel
 
+from agent.jobs import Job, JobQueue, QueueFullError, run_command
+from agent.maven_pool import MavenDaemonPool
+from agent.incremental import IncrementalCompiler
+from agent.build_cache import BuildCache
+from agent.class_index import ClassIndex
+from agent.project_lock import ProjectLocks
+from agent.stream_upload import TrailerVerifier
+from tools.patch_tool import PatchConflict, apply_patch, content_hash
+
 class MoveFileRequest(BaseModel):
     project_name: str
     source_path: str
@@ -22,6 +40,80 @@ app = FastAPI()
 
 WORKSPACE = Path("D:/openviper/workspace")  # 실제 작업 폴더
 
+MAVEN_TIMEOUT = 120
+
+# /write_files_archive 제한 (본문 크기, 파일 수, 풀린 전체 크기)
+ARCHIVE_MAX_BYTES = int(os.getenv("OPENVIPER_ARCHIVE_MAX_MB", "64")) * 1024 * 1024
+ARCHIVE_MAX_FILES = int(os.getenv("OPENVIPER_ARCHIVE_MAX_FILES", "2000"))
+ARCHIVE_MAX_UNPACKED_BYTES = int(os.getenv("OPENVIPER_ARCHIVE_MAX_UNPACKED_MB", "256")) * 1024 * 1024
+
+JAVA_TIMEOUT = 60
+
+# 작업 결과/스트림에 보관할 출력 줄 수 (메모리 상한)
+OUTPUT_RETAIN_LINES = int(os.getenv("OPENVIPER_OUTPUT_RETAIN_LINES", "2000"))
+
+# 빌드/실행 작업 큐 (전체 동시 실행 수, 프로젝트별 동시 실행 수, 대기열 크기)
+job_queue = JobQueue(
+    max_concurrency=int(os.getenv("OPENVIPER_MAX_JOBS", "4")),
+    per_project_limit=int(os.getenv("OPENVIPER_JOBS_PER_PROJECT", "1")),
+    max_pending=int(os.getenv("OPENVIPER_MAX_PENDING_JOBS", "64")),
+    retain_lines=OUTPUT_RETAIN_LINES
+)
+
+# 서버 워커 수 (main.py / gunicorn.conf.py가 같은 값을 쓴다)
+SERVER_WORKERS = int(os.getenv("OPENVIPER_WORKERS", "1"))
+
+# warm Maven 데몬 풀 (mvnd가 PATH에 없으면 자동으로 mvn cold 경로 사용)
+# 워커가 여럿이면 워커마다 데몬 저장소를 나눈다 (다른 워커의 유휴 정리가 빌드 중인 데몬을 멈추지 않도록)
+USE_MAVEN_DAEMON = os.getenv("OPENVIPER_MAVEN_DAEMON", "1") == "1"
+MVND_HOME = Path(os.getenv("OPENVIPER_MVND_HOME", str(Path.home() / ".openviper" / "mvnd")))
+if SERVER_WORKERS > 1:
+    MVND_HOME = MVND_HOME / f"worker-{os.getpid()}"
+
+maven_pool = MavenDaemonPool(
+    storage_root=MVND_HOME,
+    max_workers=int(os.getenv("OPENVIPER_MVND_WORKERS", "4")),
+    idle_timeout=float(os.getenv("OPENVIPER_MVND_IDLE_TIMEOUT", "1800"))
+)
+
+# 소스 트리 해시 기반 빌드 캐시 (같은 입력의 빌드는 target/ 복원으로 대체)
+USE_BUILD_CACHE = os.getenv("OPENVIPER_BUILD_CACHE", "1") == "1"
+build_cache = BuildCache(
+    root=Path(os.getenv("OPENVIPER_BUILD_CACHE_DIR", str(Path.home() / ".openviper" / "build-cache"))),
+    max_bytes=int(os.getenv("OPENVIPER_BUILD_CACHE_MAX_MB", "1024")) * 1024 * 1024
+)
+
+# target/classes의 main 클래스 인덱스 (컴파일/빌드 후 invalidate)
+class_index = ClassIndex()
+
+# 프로젝트별 프로세스 간 잠금 (여러 워커가 같은 WORKSPACE를 쓸 때 쓰기/빌드 직렬화)
+project_locks = ProjectLocks(
+    Path(os.getenv("OPENVIPER_LOCK_DIR", str(Path(tempfile.gettempdir()) / "openviper-locks")))
+)
+
+
+async def _evict_idle_daemons():
+    while True:
+        await asyncio.sleep(60)
+        await maven_pool.evict_idle()
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    app.state.daemon_reaper = asyncio.create_task(_evict_idle_daemons())
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    app.state.daemon_reaper.cancel()
+    await maven_pool.shutdown()
+
+
+@app.get("/health")
+async def health():
+    # main.py 감시 프로세스의 readiness/liveness 확인용
+    return {"status": "ok", "pending_jobs": job_queue.pending_count()}
+
 
 
 # ==============================
@@ -47,11 +139,41 @@ class WriteFileRequest(BaseModel):
     content: str
 
 
+class FileEntry(BaseModel):
+    file_path: str
+    content: str
+
+
+class WriteFilesRequest(BaseModel):
+    project_name: str
+    files: list[FileEntry]
+
+
+class PatchFileRequest(BaseModel):
+    project_name: str
+    file_path: str
+    diff: Optional[str] = None          # unified diff
+    edits: Optional[list[dict]] = None  # [{"search", "replace", "replace_all"}]
+    expected_hash: Optional[str] = None  # 수정 전 내용의 sha256 (충돌 감지용)
+
+
 class RunMavenRequest(BaseModel):
     project_name: str
     goal: str = "package"
 
 
+class CompileRequest(BaseModel):
+    project_name: str
+    full: bool = False  # True면 상태 무시하고 전체 재컴파일
+
+
+class JobRequest(BaseModel):
+    action: Literal["run_maven", "run_java"]
+    project_name: str
+    goal: str = "package"
+    main_class: Optional[str] = None
+
+
 
 # ==============================
 # 📁 1. 프로젝트 생성
@@ -59,6 +181,11 @@ class RunMavenRequest(BaseModel):
 
 @app.post("/create_project")
 def create_project(req: CreateProjectRequest):
+    with project_locks.hold(req.project_name):
+        return _create_project(req)
+
+
+def _create_project(req: CreateProjectRequest):
     project_dir = WORKSPACE / req.project_name
 
     if project_dir.exists():
@@ -113,14 +240,244 @@ def write_file(req: WriteFileRequest):
         return {"status": "error", "message": "Project not found"}
 
     file_path = project_dir / req.file_path
-    file_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(req.content)
+    with project_locks.hold(req.project_name):
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(req.content)
 
     return {"status": "success", "message": f"{req.file_path} written"}
 
 
+@app.post("/write_file_stream")
+async def write_file_stream(project_name: str, file_path: str, request: Request):
+    """
+    본문(raw UTF-8)을 받는 대로 임시 파일에 쓰고, 끝나면 원래 경로로 교체한다.
+    LLM이 content를 생성하는 동안 바로 디스크에 기록하기 위한 엔드포인트.
+    본문 끝에는 STREAM_TRAILER + 내용의 sha256(hex)이 붙어야 한다.
+    끝 표시가 없거나(연결 끊김, 클라이언트 abort) 해시가 다르면 원래 파일은 그대로 둔다.
+    """
+    project_dir = WORKSPACE / project_name
+
+    if not project_dir.exists():
+        return {"status": "error", "message": "Project not found"}
+
+    try:
+        target = _resolve_in_project(project_dir, file_path)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+
+    verifier = TrailerVerifier()
+    try:
+        with open(tmp_path, "wb") as f:
+            async for chunk in request.stream():
+                f.write(verifier.feed(chunk))
+        verifier.verify()
+
+        # 본문을 받는 동안은 잠그지 않고 교체할 때만 잠근다
+        async with project_locks.hold_async(project_name):
+            os.replace(tmp_path, target)
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        return {"status": "error", "message": str(e)}
+
+    return {"status": "success", "message": f"{file_path} written", "bytes": verifier.size}
+
+
+@app.post("/patch_file")
+def patch_file(req: PatchFileRequest):
+    project_dir = WORKSPACE / req.project_name
+
+    if not project_dir.exists():
+        return {"status": "error", "message": "Project not found"}
+
+    try:
+        file_path = _resolve_in_project(project_dir, req.file_path)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    # 읽기 → 패치 → 교체 사이에 다른 워커가 끼어들지 않도록 전체를 잠근다
+    with project_locks.hold(req.project_name):
+        return _patch_file_locked(req, file_path)
+
+
+def _patch_file_locked(req: PatchFileRequest, file_path: Path) -> dict:
+    if not file_path.exists():
+        return {"status": "error", "message": f"{req.file_path} not found"}
+
+    content = file_path.read_text(encoding="utf-8")
+
+    try:
+        new_content = apply_patch(content, diff=req.diff, edits=req.edits, expected_hash=req.expected_hash)
+    except PatchConflict as e:
+        return {
+            "status": "error",
+            "conflict": True,
+            "message": str(e),
+            "sha256": content_hash(content)
+        }
+
+    tmp_path = file_path.with_name(f".{file_path.name}.{uuid.uuid4().hex}.tmp")
+    tmp_path.write_text(new_content, encoding="utf-8")
+    os.replace(tmp_path, file_path)
+
+    return {
+        "status": "success",
+        "message": f"{req.file_path} patched",
+        "sha256": content_hash(new_content)
+    }
+
+
+# -----------------------------
+# 여러 파일 한 번에 쓰기
+# -----------------------------
+def _resolve_in_project(project_dir: Path, rel_path: str) -> Path:
+    target = (project_dir / rel_path).resolve()
+    if not target.is_relative_to(project_dir.resolve()):
+        raise ValueError("Invalid path: access outside project is not allowed")
+    return target
+
+
+def _write_files_atomic(
+    project_dir: Path,
+    files: list[tuple[str, bytes | Callable[[], BinaryIO]]],
+    max_total_bytes: Optional[int] = None
+) -> dict:
+    """
+    1) 모든 경로 검증 → 하나라도 잘못되면 아무것도 쓰지 않는다
+    2) 필요한 디렉토리를 한 번씩만 생성
+    3) 전부 임시 파일에 쓴 뒤 (내용은 bytes 또는 스트림을 여는 함수 → 조금씩 복사)
+    4) 한꺼번에 os.replace로 교체
+    max_total_bytes를 넘으면 임시 파일을 지우고 아무것도 쓰지 않는다
+    """
+    targets = []
+    results = []
+    for rel_path, _ in files:
+        try:
+            targets.append(_resolve_in_project(project_dir, rel_path))
+            results.append({"file_path": rel_path, "status": "success"})
+        except ValueError as e:
+            targets.append(None)
+            results.append({"file_path": rel_path, "status": "error", "message": str(e)})
+
+    if any(target is None for target in targets):
+        for result in results:
+            if result["status"] == "success":
+                result["status"] = "skipped"
+        return {"status": "error", "message": "Invalid paths, nothing written", "results": results}
+
+    for directory in {target.parent for target in targets}:
+        directory.mkdir(parents=True, exist_ok=True)
+
+    staged = []
+    sizes = []
+    total = 0
+    try:
+        for target, (rel_path, data) in zip(targets, files):
+            tmp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+            staged.append(tmp_path)
+            with open(tmp_path, "wb") as f:
+                if isinstance(data, bytes):
+                    f.write(data)
+                    size = len(data)
+                else:
+                    size = 0
+                    with data() as source:
+                        for chunk in iter(lambda: source.read(64 * 1024), b""):
+                            size += len(chunk)
+                            if max_total_bytes is not None and total + size > max_total_bytes:
+                                raise ValueError(f"Total size exceeds {max_total_bytes} bytes (at {rel_path})")
+                            f.write(chunk)
+            total += size
+            sizes.append(size)
+    except Exception as e:
+        for tmp_path in staged:
+            tmp_path.unlink(missing_ok=True)
+        return {"status": "error", "message": str(e), "results": results}
+
+    for tmp_path, target, result, size in zip(staged, targets, results, sizes):
+        os.replace(tmp_path, target)
+        result["bytes"] = size
+
+    return {"status": "success", "message": f"{len(files)} files written", "results": results}
+
+
+@app.post("/write_files")
+def write_files(req: WriteFilesRequest):
+    project_dir = WORKSPACE / req.project_name
+
+    if not project_dir.exists():
+        return {"status": "error", "message": "Project not found"}
+
+    with project_locks.hold(req.project_name):
+        return _write_files_atomic(
+            project_dir,
+            [(entry.file_path, entry.content.encode("utf-8")) for entry in req.files]
+        )
+
+
+@app.post("/write_files_archive")
+async def write_files_archive(project_name: str, request: Request, format: Literal["tar", "zip"] = "tar"):
+    """
+    tar(.tar/.tar.gz) 또는 zip 본문을 받아 그 안의 파일들을 한 번에 쓴다.
+    본문은 임시 파일로 받고, 각 파일도 압축을 풀면서 바로 임시 파일로 복사해서 메모리에 통째로 올리지 않는다.
+    본문 크기, 파일 수, 풀린 전체 크기가 ARCHIVE_MAX_* 를 넘으면 아무것도 쓰지 않는다.
+    """
+    project_dir = WORKSPACE / project_name
+
+    if not project_dir.exists():
+        return {"status": "error", "message": "Project not found"}
+
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as spool:
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > ARCHIVE_MAX_BYTES:
+                return {"status": "error", "message": f"Archive exceeds {ARCHIVE_MAX_BYTES} bytes"}
+            spool.write(chunk)
+        spool.seek(0)
+
+        async with project_locks.hold_async(project_name):
+            try:
+                return await asyncio.to_thread(_write_archive, project_dir, spool, format)
+            except (tarfile.TarError, zipfile.BadZipFile) as e:
+                return {"status": "error", "message": f"Invalid archive: {e}"}
+            except ValueError as e:
+                return {"status": "error", "message": str(e)}
+
+
+def _write_archive(project_dir: Path, fileobj, format: str) -> dict:
+    files = []
+    declared = 0
+
+    def add(name: str, size: int, opener: Callable[[], BinaryIO]):
+        nonlocal declared
+        declared += size
+        if len(files) >= ARCHIVE_MAX_FILES:
+            raise ValueError(f"Archive has more than {ARCHIVE_MAX_FILES} files")
+        if declared > ARCHIVE_MAX_UNPACKED_BYTES:
+            raise ValueError(f"Archive unpacks to more than {ARCHIVE_MAX_UNPACKED_BYTES} bytes")
+        files.append((name, opener))
+
+    if format == "zip":
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    add(info.filename, info.file_size, functools.partial(archive.open, info))
+            # 헤더의 크기는 믿지 않고 실제로 푼 크기로 한 번 더 제한한다
+            return _write_files_atomic(project_dir, files, max_total_bytes=ARCHIVE_MAX_UNPACKED_BYTES)
+
+    with tarfile.open(fileobj=fileobj, mode="r:*") as archive:
+        for member in archive:
+            # 일반 파일만 (링크/장치 파일 무시)
+            if member.isfile():
+                add(member.name, member.size, functools.partial(archive.extractfile, member))
+        return _write_files_atomic(project_dir, files, max_total_bytes=ARCHIVE_MAX_UNPACKED_BYTES)
+
+
 @app.post("/move_file")
 def move_file(req: MoveFileRequest):
     try:
@@ -128,8 +485,9 @@ def move_file(req: MoveFileRequest):
         src = project_dir / req.source_path
         dst = project_dir / req.dest_path
 
-        dst.parent.mkdir(parents=True, exist_ok=True)
-        src.rename(dst)
+        with project_locks.hold(req.project_name):
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            src.rename(dst)
 
         return {"status": "success"}
     except Exception as e:
@@ -138,54 +496,169 @@ def move_file(req: MoveFileRequest):
 # ==============================
 # 🔨 3. Maven 빌드
 # ==============================
-@app.post("/run_maven")
-def run_maven(req: RunMavenRequest):
+async def _cached_maven_build(project_dir: Path, goal: str, job: Optional[Job] = None) -> dict:
+    goal_parts = goal.split() if goal else ["package"]
 
     try:
-        project_dir = WORKSPACE / req.project_name
-
-        if not project_dir.exists():
-            return {"status": "error", "message": "Project not found"}
-
-        # 🔥 Windows에서는 mvn.cmd 사용
-        mvn_executable = "mvn.cmd" if sys.platform.startswith("win") else "mvn"
-
-        if shutil.which(mvn_executable) is None:
+        if not (USE_BUILD_CACHE and BuildCache.cacheable(goal_parts)):
+            return await _maven_build(project_dir, goal, job)
+        return await _build_with_cache(project_dir, goal_parts, goal, job)
+    finally:
+        class_index.invalidate(project_dir / "target" / "classes")
+        # mvn/캐시 복원이 target/classes를 바꿨으므로 증분 컴파일 기록은 더 이상 믿을 수 없다
+        IncrementalCompiler(project_dir).invalidate()
+
+
+async def _build_with_cache(project_dir: Path, goal_parts: list[str], goal: str, job: Optional[Job]) -> dict:
+    key = await asyncio.to_thread(build_cache.key, project_dir, goal_parts)
+    cached = await asyncio.to_thread(build_cache.restore, key, project_dir)
+
+    if cached is not None:
+        if job:
+            for line in cached.get("stdout", "").splitlines(keepends=True):
+                job.emit("stdout", line)
+        return dict(cached, cache="hit")
+
+    result = await _maven_build(project_dir, goal, job)
+
+    # 실패한 빌드는 캐시하지 않는다
+    if result["status"] == "success":
+        await asyncio.to_thread(build_cache.store, key, project_dir, result)
+
+    return dict(result, cache="miss")
+
+
+async def _maven_build(project_dir: Path, goal: str, job: Optional[Job] = None) -> dict:
+    goal_parts = goal.split() if goal else ["package"]
+
+    # 1) warm 데몬 경로 (mvnd)
+    worker = await maven_pool.acquire(project_dir.name) if USE_MAVEN_DAEMON else None
+
+    if worker is not None:
+        try:
+            output = await run_command(
+                maven_pool.command(worker, goal_parts),
+                cwd=str(project_dir),
+                timeout=MAVEN_TIMEOUT,
+                on_line=job.emit if job else None,
+                retain_lines=OUTPUT_RETAIN_LINES
+            )
+        except asyncio.TimeoutError:
+            # 멈춘 데몬은 종료시킨다 (cold 재시도는 타임아웃을 두 배로 늘리므로 하지 않음).
+            # 다음 빌드는 실패 기록 없이 새 데몬으로 시작한다
+            maven_pool.release(worker, ok=False)
+            await maven_pool.evict(project_dir.name)
             return {
                 "status": "error",
-                "stderr": f"{mvn_executable} not found in PATH"
+                "stderr": "Maven execution timeout"
             }
+        except OSError:
+            # 데몬 실행 실패 → cold 경로로 재시도
+            maven_pool.release(worker, ok=False)
+        except BaseException:
+            # 취소 등: 빌드 중 표시만 푼다
+            maven_pool.release(worker, ok=None)
+            raise
+        else:
+            # 빌드 실패(returncode 1)는 데몬 탓이 아니다.
+            # 데몬이 죽었거나 연결되지 않았을 때만 실패로 세고 cold 경로로 재시도
+            if not maven_pool.daemon_failed(output):
+                maven_pool.release(worker, ok=True)
+                return _maven_result(output, "mvnd")
+            maven_pool.release(worker, ok=False)
+
+    # 2) cold 경로 (mvn)
+    # 🔥 Windows에서는 mvn.cmd 사용
+    mvn_executable = "mvn.cmd" if sys.platform.startswith("win") else "mvn"
+
+    if shutil.which(mvn_executable) is None:
+        return {
+            "status": "error",
+            "stderr": f"{mvn_executable} not found in PATH"
+        }
 
-        goal_parts = req.goal.split() if req.goal else ["package"]
-
-        process = subprocess.Popen(
+    try:
+        output = await run_command(
             [mvn_executable] + goal_parts,
             cwd=str(project_dir),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
+            timeout=MAVEN_TIMEOUT,
+            on_line=job.emit if job else None,
+            retain_lines=OUTPUT_RETAIN_LINES
         )
-
-        stdout, stderr = process.communicate(timeout=120)
-
-        return {
-            "status": "success" if process.returncode == 0 else "error",
-            "stdout": stdout,
-            "stderr": stderr
-        }
-
-    except subprocess.TimeoutExpired:
-        process.kill()
+    except asyncio.TimeoutError:
         return {
             "status": "error",
             "stderr": "Maven execution timeout"
         }
 
+    return _maven_result(output, "mvn")
+
+
+def _maven_result(output: dict, backend: str) -> dict:
+    return {
+        "status": "success" if output["returncode"] == 0 else "error",
+        "stdout": output["stdout"],
+        "stderr": output["stderr"],
+        "truncated": output["truncated"],
+        "backend": backend
+    }
+
+
+@app.post("/run_maven")
+async def run_maven(req: RunMavenRequest):
+
+    try:
+        runner, error = await _resolve_runner("run_maven", req.project_name, goal=req.goal)
+        if error:
+            return error
+
+        return await job_queue.run("run_maven", req.project_name, req.dict(), runner)
+
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
     except Exception as e:
         return {
             "status": "error",
             "stderr": str(e)
         }
+
+
+@app.get("/maven_pool")
+async def maven_pool_status():
+    return maven_pool.status()
+
+
+@app.get("/build_cache")
+async def build_cache_status():
+    return await asyncio.to_thread(build_cache.stats)
+
+
+# -----------------------------
+# 증분 컴파일 (Maven 우회)
+# -----------------------------
+@app.post("/compile")
+async def compile_incremental(req: CompileRequest):
+    try:
+        project_dir = WORKSPACE / req.project_name
+
+        if not project_dir.exists():
+            return {"status": "error", "message": "Project not found"}
+
+        compiler = IncrementalCompiler(project_dir, timeout=JAVA_TIMEOUT)
+        result = await job_queue.run(
+            "compile", req.project_name, req.dict(),
+            _locked(req.project_name, lambda job: compiler.compile(full=req.full))
+        )
+        class_index.invalidate(compiler.classes_dir)
+        return result
+
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except Exception as e:
+        return {"status": "error", "stderr": str(e)}
+
+
 # ==============================
 # ▶ 4. Java 실행
 # ==============================
@@ -193,59 +666,200 @@ def run_maven(req: RunMavenRequest):
 # -----------------------------
 # 유틸: main 클래스 자동 탐색
 # -----------------------------
+def _pom_main_class(project_dir: Path) -> Optional[str]:
+    pom = project_dir / "pom.xml"
+    if not pom.exists():
+        return None
+    match = re.search(r"<mainClass>\s*([\w.$]+)\s*</mainClass>", pom.read_text(encoding="utf-8", errors="replace"))
+    return match.group(1) if match else None
+
+
 def find_main_class(classes_dir: Path) -> Optional[str]:
-    for root, dirs, files in os.walk(classes_dir):
-        for file in files:
-            if file.endswith(".class"):
-                class_path = Path(root) / file
-                rel_path = class_path.relative_to(classes_dir)
-                class_name = ".".join(rel_path.with_suffix("").parts)
-                # 단순히 main 클래스 있는지 확인 없이 첫 클래스 반환
-                return class_name
-    return None
+    # public static void main(String[])이 있는 클래스 중 pom의 mainClass 우선
+    preferred = _pom_main_class(classes_dir.parent.parent)
+    return class_index.find_main_class(classes_dir, preferred)
+
+
+async def _java_run(
+    project_dir: Path,
+    classes_dir: Path,
+    main_class: str,
+    job: Optional[Job] = None
+) -> dict:
+    # Windows 경로 문제 해결
+    classes_dir_str = str(classes_dir.resolve())
+    project_dir_str = str(project_dir.resolve())
+
+    try:
+        output = await run_command(
+            ["java", "-cp", classes_dir_str, main_class],
+            cwd=project_dir_str,
+            timeout=JAVA_TIMEOUT,
+            on_line=job.emit if job else None,
+            retain_lines=OUTPUT_RETAIN_LINES
+        )
+    except asyncio.TimeoutError:
+        return {"status": "error", "stderr": "Execution timed out"}
+
+    return {
+        "status": "success" if output["returncode"] == 0 else "error",
+        "stdout": output["stdout"],
+        "stderr": output["stderr"],
+        "truncated": output["truncated"]
+    }
 
 # -----------------------------
 # 안정화된 run_java
 # -----------------------------
 @app.post("/run_java")
-def run_java(req: RunJavaRequest):
+async def run_java(req: RunJavaRequest):
     try:
-        project_dir = WORKSPACE / req.project_name
-        classes_dir = project_dir / "target" / "classes"
+        runner, error = await _resolve_runner("run_java", req.project_name, main_class=req.main_class)
+        if error:
+            return error
+
+        return await job_queue.run("run_java", req.project_name, req.dict(), runner)
 
-        if not classes_dir.exists():
-            return {"status": "error", "message": "Project not compiled"}
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except Exception as e:
+        return {"status": "error", "stderr": str(e)}
 
-        # main_class가 없으면 자동 탐색
-        main_class = req.main_class or find_main_class(classes_dir)
-        if not main_class:
-            return {"status": "error", "message": "No class found to run"}
 
-        # Windows 경로 문제 해결
-        classes_dir_str = str(classes_dir.resolve())
-        project_dir_str = str(project_dir.resolve())
+# ==============================
+# 📋 5. 비동기 작업 큐
+# ==============================
 
-        # Java 실행
-        process = subprocess.Popen(
-            ["java", "-cp", classes_dir_str, main_class],
-            cwd=project_dir_str,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
+# -----------------------------
+# 유틸: action → 작업 실행 함수
+# -----------------------------
+def _locked(project_name: str, runner, shared: bool = False):
+    """작업 실행 동안 프로젝트 잠금을 잡는 runner로 감싼다 (다른 워커의 쓰기/빌드와 직렬화)"""
+    async def locked_runner(job: Job) -> dict:
+        async with project_locks.hold_async(project_name, shared=shared):
+            return await runner(job)
+    return locked_runner
+
+
+async def _resolve_runner(
+    action: str,
+    project_name: str,
+    goal: str = "package",
+    main_class: Optional[str] = None
+):
+    """(runner, None) 또는 검증 실패 시 (None, error 응답)을 반환한다"""
+    project_dir = WORKSPACE / project_name
+
+    if action == "run_maven":
+        if not project_dir.exists():
+            return None, {"status": "error", "message": "Project not found"}
 
-        stdout, stderr = process.communicate(timeout=60)
+        return _locked(project_name, lambda job: _cached_maven_build(project_dir, goal, job)), None
+
+    classes_dir = project_dir / "target" / "classes"
+    if not classes_dir.exists():
+        return None, {"status": "error", "message": "Project not compiled"}
+
+    # main_class가 없으면 자동 탐색 (클래스 파일을 읽으므로 이벤트 루프 밖에서)
+    main_class = main_class or await asyncio.to_thread(find_main_class, classes_dir)
+    if not main_class:
+        return None, {"status": "error", "message": "No class found to run"}
+
+    # 실행은 target/classes를 읽기만 하므로 공유 잠금 (빌드와는 배타)
+    return _locked(project_name, lambda job: _java_run(project_dir, classes_dir, main_class, job), shared=True), None
+
+
+@app.post("/jobs")
+async def submit_job(req: JobRequest):
+    runner, error = await _resolve_runner(req.action, req.project_name, req.goal, req.main_class)
+    if error:
+        return error
+
+    try:
+        job = job_queue.submit(req.action, req.project_name, req.dict(), runner)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    return {"status": "success", "job_id": job.id, "job_status": job.status}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_queue.get(job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job.to_dict()
+
+
+# ==============================
+# 📡 6. 실시간 출력 스트리밍 (SSE)
+# ==============================
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _stream_job(job: Job):
+    """
+    출력 줄은 stdout/stderr 이벤트로, 최종 결과는 result 이벤트로 보낸다.
+    """
+    yield _sse("job", {"job_id": job.id})
+
+    async for stream, line in job.events():
+        yield _sse(stream, {"line": line})
+
+    await job.task
+    yield _sse("result", job.result)
+
+
+def _sse_response(job: Job) -> StreamingResponse:
+    return StreamingResponse(
+        _stream_job(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/run_maven/stream")
+async def run_maven_stream(req: RunMavenRequest):
+    runner, error = await _resolve_runner("run_maven", req.project_name, goal=req.goal)
+    if error:
+        return error
+
+    try:
+        job = job_queue.submit("run_maven", req.project_name, req.dict(), runner)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    return _sse_response(job)
+
+
+@app.post("/run_java/stream")
+async def run_java_stream(req: RunJavaRequest):
+    runner, error = await _resolve_runner("run_java", req.project_name, main_class=req.main_class)
+    if error:
+        return error
+
+    try:
+        job = job_queue.submit("run_java", req.project_name, req.dict(), runner)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    return _sse_response(job)
+
+
+@app.get("/jobs/{job_id}/stream")
+async def stream_job(job_id: str):
+    job = job_queue.get(job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return _sse_response(job)
 
-        return {
-            "status": "success" if process.returncode == 0 else "error",
-            "stdout": stdout,
-            "stderr": stderr
-        }
 
-    except subprocess.TimeoutExpired:
-        return {"status": "error", "stderr": "Execution timed out"}
-    except Exception as e:
-        return {"status": "error", "stderr": str(e)}
 # ==============================
 # 🚀 서버 실행 안내
 # ==============================
@@ -0,0 +1,40 @@
+# stream_upload.py
+
+import hashlib
+
+
+# /write_file_stream 본문 끝 표시. 뒤에 내용의 sha256(hex)이 붙는다
+STREAM_TRAILER = b"\0openviper-end:"
+TRAILER_LENGTH = len(STREAM_TRAILER) + 64
+
+
+def end_marker(hasher) -> bytes:
+    """보낸 내용의 해시로 만든 끝 표시"""
+    return STREAM_TRAILER + hasher.hexdigest().encode("ascii")
+
+
+class TrailerVerifier:
+    """
+    스트리밍 업로드 본문에서 끝 표시를 떼어내고 확인한다.
+    - feed(chunk): 지금 써도 되는 바이트 (끝 표시가 될 수 있는 마지막 TRAILER_LENGTH 바이트는 들고 있는다)
+    - verify(): 끝 표시가 없거나(연결 끊김, abort) 해시가 다르면 ValueError
+    """
+
+    def __init__(self):
+        self.hasher = hashlib.sha256()
+        self.tail = b""
+        self.size = 0
+
+    def feed(self, chunk: bytes) -> bytes:
+        self.tail += chunk
+        if len(self.tail) <= TRAILER_LENGTH:
+            return b""
+
+        data, self.tail = self.tail[:-TRAILER_LENGTH], self.tail[-TRAILER_LENGTH:]
+        self.hasher.update(data)
+        self.size += len(data)
+        return data
+
+    def verify(self):
+        if self.tail != end_marker(self.hasher):
+            raise ValueError("Incomplete upload: end marker missing or content hash mismatch")
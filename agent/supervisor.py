@@ -0,0 +1,275 @@
+# supervisor.py
+
+import asyncio
+import logging
+import os
+import signal
+import sys
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Optional
+
+
+# 서버 출력은 고정 크기로 읽는다 (긴 스택 트레이스/한 줄짜리 로그에도 막히지 않도록)
+DRAIN_CHUNK_SIZE = 64 * 1024
+# 줄바꿈 없는 출력은 이 길이마다 끊어서 기록
+LOG_LINE_LIMIT = 1024 * 1024
+# 서버가 끝난 뒤 남은 출력을 읽는 시간 (서버가 띄운 자식이 파이프를 쥐고 있으면 EOF가 오지 않는다)
+DRAIN_EXIT_TIMEOUT = 5.0
+# POSIX에서는 서버를 새 세션(프로세스 그룹)으로 띄워서 자식(uvicorn worker 등)까지 함께 종료한다
+USE_PROCESS_GROUP = not sys.platform.startswith("win")
+# 프로세스 종료 확인 간격 (Process.wait()는 파이프가 닫혀야 돌아오므로 returncode를 본다)
+EXIT_POLL_INTERVAL = 0.1
+
+def rotating_logger(name: str, path: Path, max_bytes: int, backup_count: int) -> logging.Logger:
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    logger = logging.getLogger(f"openviper.{name}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    if not logger.handlers:
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+    return logger
+
+
+async def http_probe(path: str, host: str = "127.0.0.1", port: int = 8000,
+                     socket_path: Optional[str] = None, timeout: float = 2.0) -> bool:
+    """GET path → 200이면 True. requests 없이 asyncio 소켓으로 보낸다 (TCP 또는 Unix 소켓)"""
+    try:
+        if socket_path:
+            connect = asyncio.open_unix_connection(socket_path)
+        else:
+            connect = asyncio.open_connection(host, port)
+        reader, writer = await asyncio.wait_for(connect, timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        parts = status_line.split()
+        return len(parts) >= 2 and parts[1] == b"200"
+    except (OSError, asyncio.TimeoutError):
+        return False
+    finally:
+        writer.close()
+
+
+class ServerSupervisor:
+    """
+    MCP 서버(uvicorn) 프로세스 감시.
+    - stdout/stderr를 계속 읽어서 회전 로그 파일에 쓴다 (파이프가 차서 서버가 멈추지 않도록)
+    - 시작 후 /health가 200을 줄 때까지 기다린다 (ready 이벤트)
+    - health_interval마다 /health 확인, max_failures번 연속 실패하면 강제 재시작
+    - 프로세스가 죽으면 지수 백오프로 재시작 (stable_after초 이상 살아 있었으면 백오프 초기화)
+    """
+
+    def __init__(
+        self,
+        args: list[str],
+        log_path: Path,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        socket_path: Optional[str] = None,
+        startup_timeout: float = 30.0,
+        health_interval: float = 10.0,
+        max_failures: int = 3,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        stable_after: float = 60.0,
+        log_max_bytes: int = 10 * 1024 * 1024,
+        log_backups: int = 5
+    ):
+        self.args = args
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.startup_timeout = startup_timeout
+        self.health_interval = health_interval
+        self.max_failures = max_failures
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+
+        self.logger = rotating_logger("server", log_path, log_max_bytes, log_backups)
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.ready = asyncio.Event()
+        self.restarts = 0
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def probe(self) -> bool:
+        return await http_probe("/health", self.host, self.port, self.socket_path)
+
+    # -----------------------------
+    # 시작 / 종료
+    # -----------------------------
+    def start(self):
+        self._task = asyncio.create_task(self._supervise())
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def stop(self):
+        self._stopping = True
+        await self._terminate()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        # 취소가 종료 처리 중간에 끼어들었을 수 있다
+        await self._terminate()
+
+    async def _terminate(self, grace: float = 10.0):
+        process = self.process
+        if process is None:
+            return
+        if process.returncode is not None:
+            # 서버는 이미 끝났고 남은 자식만 정리한다
+            self._signal(process, signal.SIGKILL if USE_PROCESS_GROUP else signal.SIGTERM)
+            return
+        self._signal(process, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(self._wait_exit(process), grace)
+        except asyncio.TimeoutError:
+            self._signal(process, signal.SIGKILL if USE_PROCESS_GROUP else signal.SIGTERM)
+            await self._wait_exit(process)
+
+    @staticmethod
+    async def _wait_exit(process: asyncio.subprocess.Process) -> int:
+        """
+        Process.wait()는 (3.11까지) stdout 파이프가 닫혀야 돌아오므로, 자식이 파이프를 물려받아
+        살아 있으면 서버가 죽어도 끝나지 않는다. 종료 자체는 returncode로 확인한다
+        """
+        while process.returncode is None:
+            await asyncio.sleep(EXIT_POLL_INTERVAL)
+        return process.returncode
+
+    @staticmethod
+    def _signal(process: asyncio.subprocess.Process, sig: int):
+        """서버와 같은 프로세스 그룹의 자식까지 시그널을 보낸다 (Windows는 서버 프로세스만)"""
+        try:
+            if USE_PROCESS_GROUP:
+                os.killpg(process.pid, sig)
+            elif sig == signal.SIGTERM and process.returncode is None:
+                process.terminate()
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    # -----------------------------
+    # 감시 루프
+    # -----------------------------
+    async def _supervise(self):
+        failures_in_a_row = 0
+
+        while not self._stopping:
+            started_at = time.monotonic()
+            self.process = await asyncio.create_subprocess_exec(
+                *self.args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                limit=DRAIN_CHUNK_SIZE * 4,
+                start_new_session=USE_PROCESS_GROUP
+            )
+            self.logger.info(f"[supervisor] started pid={self.process.pid}")
+
+            drain = asyncio.create_task(self._drain(self.process.stdout))
+            health = asyncio.create_task(self._health_loop())
+            returncode = await self._wait_exit(self.process)
+
+            health.cancel()
+            try:
+                await asyncio.wait_for(drain, DRAIN_EXIT_TIMEOUT)
+            except asyncio.TimeoutError:
+                # 서버는 끝났는데 남은 자식이 파이프를 쥐고 있다 → 그룹째 정리하고 다음으로
+                self.logger.info("[supervisor] output still open after exit, killing process group")
+            except Exception as e:
+                self.logger.info(f"[supervisor] log drain failed: {e}")
+            self._signal(self.process, signal.SIGKILL if USE_PROCESS_GROUP else signal.SIGTERM)
+            self.ready.clear()
+
+            if self._stopping:
+                break
+
+            # 오래 살아 있었으면 일시적 장애로 보고 백오프를 처음부터
+            if time.monotonic() - started_at >= self.stable_after:
+                failures_in_a_row = 0
+            delay = min(self.max_backoff, self.backoff * (2 ** failures_in_a_row))
+            failures_in_a_row += 1
+            self.restarts += 1
+
+            self.logger.info(f"[supervisor] exited with {returncode}, restarting in {delay:.1f}s")
+            print(f"[SUPERVISOR] server exited ({returncode}), restarting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _drain(self, stream: asyncio.StreamReader):
+        """
+        readline()은 한 줄이 limit를 넘으면 예외를 내므로 고정 크기로 읽어 직접 줄을 나눈다.
+        EOF 또는 읽기 오류(파이프가 망가짐)에서 끝난다. 그 뒤로는 읽을 수 없으므로 다시 시도하지 않는다
+        """
+        pending = b""
+        while True:
+            try:
+                chunk = await stream.read(DRAIN_CHUNK_SIZE)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.info(f"[supervisor] log read error: {e}")
+                chunk = b""
+
+            if not chunk:
+                if pending:
+                    self._log_output(pending)
+                return
+
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            # 줄바꿈 없이 계속 들어오는 출력은 잘라서 기록한다
+            while len(pending) > LOG_LINE_LIMIT:
+                lines.append(pending[:LOG_LINE_LIMIT])
+                pending = pending[LOG_LINE_LIMIT:]
+            for line in lines:
+                self._log_output(line)
+
+    def _log_output(self, line: bytes):
+        try:
+            self.logger.info(line.decode("utf-8", errors="replace").rstrip("\r"))
+        except Exception:
+            pass
+
+    async def _health_loop(self):
+        # 1) readiness: 처음 200을 받을 때까지 짧은 간격으로 확인
+        deadline = time.monotonic() + self.startup_timeout
+        while not await self.probe():
+            if time.monotonic() > deadline:
+                self.logger.info("[supervisor] not ready before startup timeout, killing")
+                await self._terminate(grace=5.0)
+                return
+            await asyncio.sleep(0.2)
+
+        self.ready.set()
+        self.logger.info("[supervisor] ready")
+
+        # 2) liveness: 연속 실패하면 재시작 (프로세스가 죽으면 _supervise가 다시 띄운다)
+        failures = 0
+        while True:
+            await asyncio.sleep(self.health_interval)
+            if await self.probe():
+                failures = 0
+                continue
+
+            failures += 1
+            self.logger.info(f"[supervisor] health check failed ({failures}/{self.max_failures})")
+            if failures >= self.max_failures:
+                await self._terminate(grace=5.0)
+                return
@@ -1,20 +1,24 @@
+from pathlib import Path
 from typing import Any
-from agent.core.state import AgentState
+from context.java_symbols import JavaSymbolIndex
 
 
 class ContextBuilder:
-    def __init__(self):
+    def __init__(self, symbol_index: JavaSymbolIndex | None = None):
         self.max_history_length = 10
+        self.symbol_index = symbol_index
+        self.max_file_chars = 1000
+        self.max_symbol_chars = 4000
 
     def build(
         self,
-        current_state: AgentState,
+        current_state: Any,
         task_history: list[Any],
         working_memory: list[dict[str, Any]],
         action_history: list[dict[str, Any]] | None = None
     ) -> dict[str, Any]:
         context = {
-            "current_state": current_state.value if isinstance(current_state, AgentState) else str(current_state),
+            "current_state": current_state.value if hasattr(current_state, "value") else str(current_state),
             "task_summary": self._summarize_tasks(task_history),
             "recent_actions": self._summarize_actions(action_history or []),
             "memory": self._format_memory(working_memory),
@@ -63,11 +67,52 @@ class ContextBuilder:
                 errors.append(task.error)
         return errors[-5:]
 
-    def add_file_context(self, context: dict[str, Any], file_path: str, content: str) -> dict[str, Any]:
+    def add_file_context(
+        self,
+        context: dict[str, Any],
+        file_path: str,
+        content: str,
+        query: str | None = None
+    ) -> dict[str, Any]:
         context["current_file"] = file_path
-        context["file_content"] = content[:1000]
+
+        rel_path = self._workspace_path(file_path)
+        if rel_path is None or len(content) <= self.max_file_chars:
+            context["file_content"] = content[:self.max_file_chars]
+            return context
+
+        # Long Java sources: outline + only the symbols relevant to the query, not the first N chars
+        snippets = self.symbol_index.retrieve(
+            query or "", file_path=rel_path, project=rel_path.split("/", 1)[0], max_chars=self.max_symbol_chars
+        )
+        context["file_outline"] = self.symbol_index.outline(rel_path)
+        context["relevant_symbols"] = snippets
+        if not context["file_outline"]:
+            context["file_content"] = content[:self.max_file_chars]
         return context
 
+    def add_code_context(self, context: dict[str, Any], project_name: str, query: str) -> dict[str, Any]:
+        """Symbols of the project relevant to the query (no current file needed)"""
+        if self.symbol_index is not None and project_name:
+            context["relevant_symbols"] = self.symbol_index.retrieve(
+                query, project=project_name, max_chars=self.max_symbol_chars
+            )
+        return context
+
+    def _workspace_path(self, file_path: str) -> str | None:
+        """Workspace-relative path if the file is covered by the symbol index"""
+        if self.symbol_index is None or not file_path.endswith(".java"):
+            return None
+        root = Path(self.symbol_index.root)
+        path = Path(file_path)
+        if path.is_absolute():
+            try:
+                path = path.resolve().relative_to(root.resolve())
+            except ValueError:
+                return None
+        rel_path = path.as_posix()
+        return rel_path if JavaSymbolIndex.is_source(rel_path) else None
+
     def add_web_context(self, context: dict[str, Any], search_results: list[dict[str, Any]]) -> dict[str, Any]:
         context["web_results"] = search_results[:3]
         return context
@@ -9,11 +9,20 @@ class ContextHandler:
     def build_context(tool_registry, memory, iteration: int) -> dict:
         """Build context from tool registry, memory, and iteration"""
         files = tool_registry.execute("list_directory", path=".")
-        return {
+        context = {
             "iteration": iteration,
             "memory": memory.get_all(),
             "files": files
         }
+
+        # Workspace changes since the previous iteration (compact diff, None on the first one)
+        index = getattr(tool_registry, "workspace_index", None)
+        if index is not None:
+            index.refresh()
+            index.mark_iteration(iteration)
+            context["changes"] = index.changes_since(iteration - 1)
+
+        return context
     
     @staticmethod
     def get_current_directory() -> str:
@@ -0,0 +1,412 @@
+import re
+import threading
+from pathlib import Path
+from typing import Any
+
+from tools.workspace_index import get_index, per_root
+
+
+# 기본 검색 결과에서 소스 대신 outline으로 대체할 심볼 크기 (줄)
+MAX_SYMBOL_LINES = 80
+
+PACKAGE_RE = re.compile(r"^\s*package\s+([\w.]+)\s*;", re.MULTILINE)
+TYPE_RE = re.compile(r"\b(class|interface|enum|record)\s+([A-Za-z_$][\w$]*)")
+ANNOTATION_RE = re.compile(r"@(?!interface\b)[\w$.]+(?:\s*\((?:[^()]|\([^()]*\))*\))?")
+METHOD_RE = re.compile(
+    r"^(?:[\w$<>\[\],.?&\s]*\s)?([A-Za-z_$][\w$]*)\s*\((.*)\)\s*(?:throws\s+[\w$.,\s<>]+)?(?:default\s+.*)?$",
+    re.DOTALL
+)
+IDENTIFIER_RE = re.compile(r"[A-Za-z_$][\w$]*")
+NOT_METHODS = {"if", "for", "while", "switch", "catch", "synchronized", "try", "return", "new", "else", "do"}
+
+
+# -----------------------------
+# 파싱
+# -----------------------------
+def _mask(text: str) -> str:
+    """주석과 문자열/문자 리터럴을 공백으로 바꾼다 (길이와 줄바꿈은 그대로)"""
+    out = list(text)
+    i, n = 0, len(text)
+
+    def blank(start: int, end: int):
+        for k in range(start, min(end, n)):
+            if out[k] != "\n":
+                out[k] = " "
+
+    while i < n:
+        c = text[i]
+        if text.startswith("//", i):
+            end = text.find("\n", i)
+            end = n if end < 0 else end
+            blank(i, end)
+            i = end
+        elif text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            end = n if end < 0 else end + 2
+            blank(i, end)
+            i = end
+        elif text.startswith('"""', i):
+            end = text.find('"""', i + 3)
+            end = n if end < 0 else end + 3
+            blank(i + 1, end - 1)
+            i = end
+        elif c in "\"'":
+            j = i + 1
+            while j < n and text[j] != c and text[j] != "\n":
+                j += 2 if text[j] == "\\" else 1
+            blank(i + 1, j)
+            i = j + 1
+        else:
+            i += 1
+
+    return "".join(out)
+
+
+def _clean_header(header: str) -> str:
+    return " ".join(ANNOTATION_RE.sub(" ", header).split())
+
+
+def _top_level_split(text: str, sep: str) -> list[str]:
+    parts, depth, start = [], 0, 0
+    for i, c in enumerate(text):
+        if c in "<([":
+            depth += 1
+        elif c in ">)]":
+            depth -= 1
+        elif c == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def parse_java(text: str) -> list[dict[str, Any]]:
+    """
+    클래스/인터페이스/enum/record, 메서드/생성자, 필드를 줄 범위와 함께 뽑는다.
+    메서드 본문 안(람다, 익명 클래스, 지역 클래스)은 들어가지 않는다.
+    줄 번호는 1부터, start는 앞의 javadoc/어노테이션을 포함한다.
+    """
+    code = _mask(text)
+    package_match = PACKAGE_RE.search(code)
+    package = package_match.group(1) if package_match else ""
+
+    line_starts = [0] + [i + 1 for i, c in enumerate(text) if c == "\n"]
+
+    def line_of(pos: int) -> int:
+        lo, hi = 0, len(line_starts) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if line_starts[mid] <= pos:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo + 1
+
+    def start_line(header_start: int, header_end: int) -> int:
+        # 앞 문장과 같은 줄에 붙은 주석은 건너뛰고, 그 다음의 첫 글자 (javadoc/어노테이션 포함)
+        pos = header_start
+        first_line = line_of(header_start)
+        while pos < header_end:
+            if text[pos].isspace():
+                pos += 1
+            elif text.startswith("//", pos) and line_of(pos) == first_line:
+                newline = text.find("\n", pos)
+                pos = header_end if newline < 0 else newline + 1
+            else:
+                break
+        return line_of(min(pos, header_end))
+
+    symbols: list[dict[str, Any]] = []
+    # scope: {"kind": file|type|member|block, "symbol", "type_kind", "name", "qualified", "first_statement"}
+    stack: list[dict[str, Any]] = [{"kind": "file", "qualified": package, "symbol": None}]
+    header_start = 0
+    paren_depth = 0
+    pending_field: dict[str, Any] | None = None
+
+    def add(kind: str, name: str, scope: dict, start: int, end: int, signature: str) -> dict:
+        container = scope.get("qualified", "")
+        if kind in ("class", "interface", "enum", "record"):
+            qualified = f"{container}.{name}" if container else name
+        else:
+            qualified = f"{container}#{name}"
+        symbol = {
+            "kind": kind,
+            "name": name,
+            "qualified": qualified,
+            "container": container if scope["kind"] == "type" else "",
+            "start": start,
+            "end": end,
+            "signature": signature[:200]
+        }
+        symbols.append(symbol)
+        return symbol
+
+    def add_fields(scope: dict, header: str, start: int, end: int) -> list[dict]:
+        declaration = _top_level_split(header, "=")[0]
+        segments = _top_level_split(declaration, ",") if "=" not in header else [declaration]
+        found = []
+        for index, segment in enumerate(segments):
+            names = IDENTIFIER_RE.findall(segment)
+            # 첫 선언자에는 타입이 있어야 한다 (enum 상수 목록 등 제외)
+            if not names or (index == 0 and len(names) < 2):
+                return found
+            found.append(add("field", names[-1], scope, start, end, header))
+        return found
+
+    for i, c in enumerate(code):
+        if c == "(":
+            paren_depth += 1
+            continue
+        if c == ")":
+            paren_depth = max(0, paren_depth - 1)
+            continue
+        if paren_depth and c in "{};":
+            # 어노테이션 인자, 람다 등 괄호 안의 중괄호/세미콜론은 구조가 아니다
+            continue
+
+        if c == "{":
+            scope = stack[-1]
+            raw_header = code[header_start:i]
+            header = _clean_header(raw_header)
+            start = start_line(header_start, i)
+            new_scope: dict[str, Any] = {"kind": "block", "symbol": None}
+
+            if scope["kind"] in ("file", "type"):
+                type_match = TYPE_RE.search(header)
+                method_match = METHOD_RE.match(header) if scope["kind"] == "type" else None
+
+                if type_match and "=" not in header.split(type_match.group(0))[0] and "new " not in header:
+                    kind, name = type_match.groups()
+                    symbol = add(kind, name, scope, start, start, header)
+                    new_scope = {
+                        "kind": "type", "symbol": symbol, "type_kind": kind, "name": name,
+                        "qualified": symbol["qualified"], "first_statement": kind == "enum"
+                    }
+                elif method_match and "=" not in header and method_match.group(1) not in NOT_METHODS:
+                    name = method_match.group(1)
+                    kind = "constructor" if name == scope.get("name") else "method"
+                    new_scope = {"kind": "member", "symbol": add(kind, name, scope, start, start, header)}
+                elif scope["kind"] == "type" and "=" in header:
+                    # 초기화식에 중괄호가 있는 필드 (배열 초기화, 익명 클래스) → 끝은 다음 ';'
+                    fields = add_fields(scope, header, start, start)
+                    pending_field = fields[-1] if fields else None
+
+                if scope.get("first_statement") and new_scope["kind"] == "block":
+                    pass  # 본문이 있는 enum 상수
+                elif scope.get("first_statement"):
+                    scope["first_statement"] = False
+
+            stack.append(new_scope)
+            header_start = i + 1
+
+        elif c == "}":
+            if len(stack) > 1:
+                scope = stack.pop()
+                if scope["symbol"] is not None:
+                    scope["symbol"]["end"] = line_of(i)
+            header_start = i + 1
+
+        elif c == ";":
+            scope = stack[-1]
+            if scope["kind"] == "type":
+                header = _clean_header(code[header_start:i])
+                end = line_of(i)
+                if pending_field is not None:
+                    pending_field["end"] = end
+                    pending_field = None
+                elif scope.get("first_statement"):
+                    # enum 상수 목록
+                    scope["first_statement"] = False
+                elif header:
+                    start = start_line(header_start, i)
+                    method_match = METHOD_RE.match(header)
+                    if method_match and "=" not in header and method_match.group(1) not in NOT_METHODS:
+                        add("method", method_match.group(1), scope, start, end, header)
+                    else:
+                        add_fields(scope, header, start, end)
+            header_start = i + 1
+
+    for symbol in symbols:
+        symbol["package"] = package
+    return symbols
+
+
+def _camel_words(name: str) -> set[str]:
+    return {word.lower() for word in re.findall(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+", name)}
+
+
+# -----------------------------
+# 인덱스
+# -----------------------------
+class JavaSymbolIndex:
+    """
+    WORKSPACE/<project>/src/main/java 아래 .java 파일의 심볼 인덱스.
+    - WorkspaceIndex의 sha256으로 바뀐 파일만 다시 파싱한다 (파일 쓰기 직후 refresh만 부르면 된다)
+    - retrieve(query)는 관련 심볼의 소스만 잘라서 돌려준다 (파일 앞부분을 통째로 넣는 대신)
+    """
+
+    def __init__(self, workspace_root: str):
+        self.workspace_index = get_index(workspace_root)
+        self.root = Path(self.workspace_index.root)
+        # rel_path → {"sha256", "symbols", "lines"}
+        self.files: dict[str, dict[str, Any]] = {}
+        # 마지막으로 맞춘 WorkspaceIndex 변경 번호 (None이면 아직 한 번도 읽지 않음)
+        self.generation: int | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_source(rel_path: str) -> bool:
+        parts = rel_path.split("/")
+        return rel_path.endswith(".java") and len(parts) > 4 and parts[1:4] == ["src", "main", "java"]
+
+    def refresh(self) -> list[str]:
+        """
+        바뀐 파일을 다시 파싱하고 그 목록을 돌려준다.
+        WorkspaceIndex에 새 변경이 없으면(inotify가 아무것도 알리지 않으면) 목록을 훑지도 않는다
+        """
+        self.workspace_index.refresh()
+        generation = self.workspace_index.generation
+        if generation == self.generation:
+            return []
+
+        entries = {
+            entry["path"]: entry for entry in self.workspace_index.listing("", recursive=True)
+            if entry["type"] == "file" and self.is_source(entry["path"])
+        }
+
+        updated = []
+        with self._lock:
+            for rel_path in set(self.files) - set(entries):
+                del self.files[rel_path]
+
+            for rel_path, entry in entries.items():
+                cached = self.files.get(rel_path)
+                if cached is not None and cached["sha256"] == entry["sha256"] and entry["sha256"] is not None:
+                    continue
+                self.update_file(rel_path, entry["sha256"])
+                updated.append(rel_path)
+            self.generation = generation
+
+        return updated
+
+    def update_file(self, rel_path: str, digest: str | None = None):
+        try:
+            text = (self.root / rel_path).read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            self.files.pop(rel_path, None)
+            return
+        symbols = parse_java(text)
+        for symbol in symbols:
+            symbol["file"] = rel_path
+        self.files[rel_path] = {"sha256": digest, "symbols": symbols, "lines": text.splitlines()}
+
+    # -----------------------------
+    # 조회
+    # -----------------------------
+    def symbols(self, project: str | None = None) -> list[dict[str, Any]]:
+        with self._lock:
+            return [
+                symbol for rel_path, info in self.files.items()
+                if project is None or rel_path.split("/", 1)[0] == project
+                for symbol in info["symbols"]
+            ]
+
+    def outline(self, rel_path: str) -> list[str]:
+        """파일의 심볼 시그니처 목록 ("12-30 method add(int a, int b)")"""
+        with self._lock:
+            info = self.files.get(rel_path)
+        if info is None:
+            return []
+        return [f"{s['start']}-{s['end']} {s['kind']} {s['signature']}" for s in info["symbols"]]
+
+    def source(self, symbol: dict[str, Any]) -> str:
+        with self._lock:
+            info = self.files.get(symbol["file"])
+        if info is None:
+            return ""
+        return "\n".join(info["lines"][symbol["start"] - 1:symbol["end"]])
+
+    def search(self, query: str, file_path: str | None = None, project: str | None = None, limit: int = 10) -> list[dict[str, Any]]:
+        """
+        질의의 식별자/단어와 심볼 이름을 비교해 점수순으로 돌려준다.
+        정확히 같은 이름 > 이름에 포함 > camelCase 단어 겹침, 일치한 심볼이 file_path에 있으면 가산점.
+        """
+        tokens = set(IDENTIFIER_RE.findall(query))
+        words = set().union(*(_camel_words(token) for token in tokens)) if tokens else set()
+        lowered = {token.lower() for token in tokens}
+
+        scored = []
+        for symbol in self.symbols(project):
+            name = symbol["name"]
+            score = 0.0
+            if name in tokens:
+                score += 10
+            elif name.lower() in lowered:
+                score += 8
+            elif any(len(token) > 2 and token.lower() in name.lower() for token in tokens):
+                score += 4
+            overlap = len(words & _camel_words(name))
+            score += 2 * overlap
+            # 현재 파일의 심볼은 가산점만 (관련 없는 심볼은 outline으로 충분하다)
+            if score and file_path is not None and symbol["file"] == file_path:
+                score += 1
+            if score:
+                # 같은 점수면 작은 심볼(메서드)을 먼저
+                scored.append((score, -(symbol["end"] - symbol["start"]), symbol))
+
+        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return [symbol for _, _, symbol in scored[:limit]]
+
+    def retrieve(
+        self,
+        query: str,
+        file_path: str | None = None,
+        project: str | None = None,
+        max_chars: int = 4000
+    ) -> list[dict[str, Any]]:
+        """
+        관련 심볼의 소스를 max_chars 안에서 점수순으로 담는다.
+        너무 큰 타입 심볼은 소스 대신 멤버 시그니처(outline)로 넣는다.
+        이미 담은 타입 안의 멤버는 중복으로 넣지 않는다.
+        """
+        self.refresh()
+
+        snippets = []
+        used = 0
+        covered: list[tuple[str, int, int]] = []
+
+        for symbol in self.search(query, file_path, project, limit=20):
+            if any(f == symbol["file"] and s <= symbol["start"] and symbol["end"] <= e for f, s, e in covered):
+                continue
+
+            if symbol["kind"] in ("class", "interface", "enum", "record") and symbol["end"] - symbol["start"] > MAX_SYMBOL_LINES:
+                members = [
+                    s["signature"] for s in self.symbols(project)
+                    if s["file"] == symbol["file"] and s["container"] == symbol["qualified"]
+                ]
+                text = symbol["signature"] + " {\n    " + ";\n    ".join(members) + ";\n}"
+                partial = True
+            else:
+                text = self.source(symbol)
+                partial = False
+
+            if used + len(text) > max_chars:
+                continue
+
+            snippets.append({
+                "symbol": symbol["qualified"],
+                "kind": symbol["kind"],
+                "file": symbol["file"],
+                "start": symbol["start"],
+                "end": symbol["end"],
+                "outline_only": partial,
+                "source": text
+            })
+            used += len(text)
+            if not partial:
+                covered.append((symbol["file"], symbol["start"], symbol["end"]))
+
+        return snippets
+
+
+get_symbol_index = per_root(JavaSymbolIndex)
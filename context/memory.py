@@ -1,87 +1,427 @@
+import atexit
 import json
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
+
+def _atomic_write_json(path, data):
+    """임시 파일에 쓰고 fsync 후 교체 → 중간에 죽어도 이전 파일이 남는다"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# -----------------------------
+# Storage Backends
+# -----------------------------
+def _history_project(entry):
+    plan = entry.get("plan")
+    if not isinstance(plan, dict):
+        return None
+    parameters = plan.get("parameters")
+    if not isinstance(parameters, dict):
+        return None
+    return parameters.get("project_name")
+
+
+def _history_action(entry):
+    plan = entry.get("plan")
+    return plan.get("action") if isinstance(plan, dict) else None
+
+
+class DictStorage:
+    """
+    전체 데이터를 메모리 dict로 들고 있는 저장소의 공통 부분.
+    조회는 리스트를 훑어서 처리한다 (SQLite 저장소는 인덱스로 처리).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.data = {}
+        self._batch = None
+
+    def open(self, defaults):
+        try:
+            loaded = self.load()
+        except Exception:
+            loaded = None
+        self.data = dict(defaults, **(loaded or {}))
+
+    def load(self):
+        raise NotImplementedError
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
+        self._record({"op": "set", "key": key, "value": value})
+
+    def append(self, key, entry):
+        self.data.setdefault(key, []).append(entry)
+        self._record({"op": "append", "key": key, "value": entry})
+
+    # -----------------------------
+    # 배치 (write-behind)
+    # -----------------------------
+    @property
+    def in_batch(self):
+        return self._batch is not None
+
+    def begin(self):
+        if self._batch is None:
+            self._batch = []
+
+    def commit(self):
+        batch, self._batch = self._batch, None
+        if batch:
+            self.record(self.data, batch)
+
+    def _record(self, record):
+        if self._batch is not None:
+            self._batch.append(record)
+        else:
+            self.record(self.data, [record])
+
+    def record(self, data, records):
+        """records를 디스크에 반영한다"""
+        raise NotImplementedError
+
+    def recent(self, key, limit):
+        return self.data.get(key, [])[-limit:]
+
+    def query_history(self, project=None, action=None, since=None, limit=None):
+        entries = [
+            entry for entry in self.data.get("history", [])
+            if (project is None or _history_project(entry) == project)
+            and (action is None or _history_action(entry) == action)
+            and (since is None or entry.get("timestamp", "") >= since)
+        ]
+        return entries[-limit:] if limit else entries
+
+    def query_errors(self, project=None, since=None, limit=None):
+        entries = [
+            entry for entry in self.data.get("errors", [])
+            if (project is None or entry.get("project") == project)
+            and (since is None or entry.get("timestamp", "") >= since)
+        ]
+        return entries[-limit:] if limit else entries
+
+    def snapshot(self, data=None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonStorage(DictStorage):
+    """변경할 때마다 JSON 파일 전체를 다시 쓰는 방식"""
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def record(self, data, records):
+        # 배치 안의 변경이 몇 개든 파일은 한 번만 쓴다
+        _atomic_write_json(self.path, data)
+
+    def snapshot(self, data=None):
+        _atomic_write_json(self.path, self.data if data is None else data)
+
+
+class JournalStorage(DictStorage):
+    """
+    append-only 저널 + 주기적 스냅샷.
+    - 스냅샷: memory_file (기존 agent_memory.json 형식 그대로 + _journal_seq)
+    - 저널: memory_file + ".journal" (한 줄에 변경 하나, JSONL)
+    - 변경은 저널에 한 줄 추가만 하므로 history 길이와 무관하게 O(1)
+    - 저널이 compact_every 줄을 넘으면 스냅샷을 새로 쓰고 저널을 비운다
+    - 로드 시 스냅샷의 seq 이후 저널만 재생 → 압축 도중 죽어도 중복 적용되지 않는다
+    """
+
+    SEQ_KEY = "_journal_seq"
+
+    def __init__(self, path, compact_every=500, durable=False):
+        super().__init__(path)
+        self.journal_path = f"{path}.journal"
+        self.compact_every = compact_every
+        self.durable = durable
+        self.seq = 0
+        self.pending = 0
+        self._journal = None
+
+    def load(self):
+        data = None
+        snapshot_seq = 0
+
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            snapshot_seq = data.pop(self.SEQ_KEY, 0)
+
+        self.seq = snapshot_seq
+
+        if os.path.exists(self.journal_path):
+            valid_size = 0
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line.decode("utf-8"))
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        # 마지막 줄이 쓰다 만 상태면 버린다
+                        break
+                    valid_size += len(line)
+
+                    if record["seq"] <= snapshot_seq:
+                        continue
+
+                    if data is None:
+                        data = {}
+                    self._apply(data, record)
+                    self.seq = record["seq"]
+                    self.pending += 1
+
+            # 깨진 꼬리를 잘라내야 이후 추가되는 줄이 온전하다
+            if valid_size < os.path.getsize(self.journal_path):
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(valid_size)
+
+        return data
+
+    @staticmethod
+    def _apply(data, record):
+        if record["op"] == "set":
+            data[record["key"]] = record["value"]
+        elif record["op"] == "append":
+            data.setdefault(record["key"], []).append(record["value"])
+
+    def record(self, data, records):
+        if self._journal is None:
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+        lines = []
+        for record in records:
+            self.seq += 1
+            lines.append(json.dumps(dict(record, seq=self.seq), ensure_ascii=False) + "\n")
+
+        # 배치 전체를 한 번의 write/flush로 기록한다
+        self._journal.write("".join(lines))
+        self._journal.flush()
+        if self.durable:
+            os.fsync(self._journal.fileno())
+
+        self.pending += len(records)
+        if self.pending >= self.compact_every:
+            self.snapshot(data)
+
+    def snapshot(self, data=None):
+        """스냅샷을 원자적으로 교체한 뒤 저널을 비운다"""
+        data = self.data if data is None else data
+        _atomic_write_json(self.path, dict(data, **{self.SEQ_KEY: self.seq}))
+
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        open(self.journal_path, "w", encoding="utf-8").close()
+        self.pending = 0
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+
 class Memory:
-    def __init__(self, memory_file="agent_memory.json"):
+    DEFAULTS = {
+        "current_project": None,
+        "last_action": None,
+        "last_file": None,
+        "history": [],
+        "errors": []
+    }
+
+    def __init__(
+        self,
+        memory_file="agent_memory.json",
+        storage="journal",
+        db_path=None,
+        flush_interval=None
+    ):
+        """
+        storage:
+        - "journal": append-only 저널 + 스냅샷 (기본)
+        - "json": 변경마다 전체 파일 재작성
+        - "sqlite": db_path(기본 memory_file의 .db)에 인덱스와 함께 저장,
+          처음 열 때 memory_file 내용을 옮겨온다
+
+        flush_interval:
+        - None: batch() 밖의 변경은 즉시 기록
+        - 초 단위 숫자: 변경을 모아 두었다가 flush_interval 뒤 한 번에 기록 (write-behind)
+        """
         self.memory_file = memory_file
-        self.data = {
-            "current_project": None,
-            "last_action": None,
-            "last_file": None,
-            "history": [],
-            "errors": []
-        }
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._timer = None
+
+        if storage == "sqlite":
+            from context.memory_sqlite import SqliteStorage
+            db_path = db_path or os.path.splitext(memory_file)[0] + ".db"
+            self.storage = SqliteStorage(db_path, migrate_from=memory_file)
+        elif storage == "journal":
+            self.storage = JournalStorage(memory_file)
+        else:
+            self.storage = JsonStorage(memory_file)
+
         self._load()
 
+        # 프로세스 종료 시 모아 둔 변경을 반드시 기록
+        atexit.register(self.flush)
+
     # -----------------------------
     # Persistence
     # -----------------------------
     def _load(self):
-        if os.path.exists(self.memory_file):
-            try:
-                with open(self.memory_file, "r", encoding="utf-8") as f:
-                    self.data = json.load(f)
-            except Exception:
-                pass
+        self.storage.open({
+            key: list(value) if isinstance(value, list) else value
+            for key, value in self.DEFAULTS.items()
+        })
 
     def _save(self):
-        with open(self.memory_file, "w", encoding="utf-8") as f:
-            json.dump(self.data, f, indent=2, ensure_ascii=False)
+        self.flush()
+        self.storage.snapshot()
+
+    def close(self):
+        self.flush()
+        self.storage.close()
+
+    # -----------------------------
+    # Write-behind
+    # -----------------------------
+    def _set(self, key, value):
+        with self._lock:
+            self._begin_if_deferred()
+            self.storage.set(key, value)
+
+    def _append(self, key, entry):
+        with self._lock:
+            self._begin_if_deferred()
+            self.storage.append(key, entry)
+
+    def _begin_if_deferred(self):
+        if self._batch_depth == 0 and self.flush_interval is None:
+            return
+
+        self.storage.begin()
+
+        if self._batch_depth == 0 and self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_from_timer(self):
+        with self._lock:
+            self._timer = None
+            # batch() 진행 중이면 batch가 끝날 때 기록된다
+            if self._batch_depth == 0 and self.storage.in_batch:
+                self.storage.commit()
+
+    @contextmanager
+    def batch(self):
+        """
+        블록 안의 변경을 모아서 블록이 끝날 때 한 번에 기록한다.
+        중첩 가능하며 가장 바깥 블록이 끝날 때 기록된다.
+        """
+        with self._lock:
+            self._batch_depth += 1
+            self.storage.begin()
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.flush()
+
+    def flush(self):
+        """모아 둔 변경을 즉시 기록한다"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self.storage.in_batch and self._batch_depth == 0:
+                self.storage.commit()
 
     # -----------------------------
     # Project Tracking
     # -----------------------------
     def set_project(self, project_name):
-        self.data["current_project"] = project_name
-        self._save()
+        self._set("current_project", project_name)
 
     def get_project(self):
-        return self.data["current_project"]
+        return self.storage.get("current_project")
 
     # -----------------------------
     # Action Tracking
     # -----------------------------
     def set_last_action(self, action):
-        self.data["last_action"] = action
-        self._save()
+        self._set("last_action", action)
 
     def get_last_action(self):
-        return self.data["last_action"]
+        return self.storage.get("last_action")
 
     # -----------------------------
     # File Tracking
     # -----------------------------
     def set_last_file(self, file_path):
-        self.data["last_file"] = file_path
-        self._save()
+        self._set("last_file", file_path)
 
     def get_last_file(self):
-        return self.data["last_file"]
+        return self.storage.get("last_file")
 
     # -----------------------------
     # History
     # -----------------------------
     def add_history(self, user_input, plan):
-        self.data["history"].append({
+        self._append("history", {
             "timestamp": datetime.now().isoformat(),
             "input": user_input,
             "plan": plan
         })
-        self._save()
 
     def get_recent_history(self, limit=5):
-        return self.data["history"][-limit:]
+        return self.storage.recent("history", limit)
+
+    def get_project_history(self, project_name, limit=None):
+        return self.storage.query_history(project=project_name, limit=limit)
+
+    def get_history_by_action(self, action, limit=None):
+        return self.storage.query_history(action=action, limit=limit)
+
+    def get_history_since(self, timestamp, limit=None):
+        """timestamp: ISO 8601 문자열"""
+        return self.storage.query_history(since=timestamp, limit=limit)
 
     # -----------------------------
     # Error Logging
     # -----------------------------
     def add_error(self, error_message):
-        self.data["errors"].append({
+        self._append("errors", {
             "timestamp": datetime.now().isoformat(),
-            "error": error_message
+            "error": error_message,
+            "project": self.get_project()
         })
-        self._save()
 
     def get_recent_errors(self, limit=3):
-        return self.data["errors"][-limit:]
\ No newline at end of file
+        return self.storage.recent("errors", limit)
+
+    def get_errors_since(self, timestamp, project_name=None, limit=None):
+        """timestamp: ISO 8601 문자열"""
+        return self.storage.query_errors(project=project_name, since=timestamp, limit=limit)
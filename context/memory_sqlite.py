@@ -0,0 +1,198 @@
+import json
+import os
+import sqlite3
+
+from context.memory import JournalStorage, _history_action, _history_project
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS history (
+    id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    project   TEXT,
+    action    TEXT,
+    entry     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history (timestamp);
+CREATE INDEX IF NOT EXISTS idx_history_project ON history (project, id);
+CREATE INDEX IF NOT EXISTS idx_history_action ON history (action, id);
+
+CREATE TABLE IF NOT EXISTS errors (
+    id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    project   TEXT,
+    entry     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_errors_timestamp ON errors (timestamp);
+CREATE INDEX IF NOT EXISTS idx_errors_project ON errors (project, id);
+"""
+
+# 리스트형 키 → 테이블
+LIST_TABLES = ("history", "errors")
+
+
+class SqliteStorage:
+    """
+    SQLite 저장소.
+    - 단일 값(current_project 등)은 kv 테이블, history/errors는 각각의 테이블
+    - history/errors 전체를 메모리에 올리지 않고 인덱스로 조회한다
+    - migrate_from(JSON/저널 파일)이 있고 DB가 비어 있으면 처음 열 때 옮겨온다
+    """
+
+    def __init__(self, path, migrate_from=None):
+        self.path = path
+        self.migrate_from = migrate_from
+        self.conn = None
+        self.values = {}
+        self.in_batch = False
+
+    def open(self, defaults):
+        # write-behind 모드에서는 타이머 스레드가 commit 하므로 스레드 검사를 끈다
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+        # 저널 저장소는 첫 압축 전까지 스냅샷 없이 저널 파일만 있다
+        if self.migrate_from and self._is_empty() and (
+            os.path.exists(self.migrate_from) or os.path.exists(f"{self.migrate_from}.journal")
+        ):
+            migrate_json_to_sqlite(self.migrate_from, self)
+
+        self.values = {
+            key: value for key, value in defaults.items() if key not in LIST_TABLES
+        }
+        for key, value in self.conn.execute("SELECT key, value FROM kv"):
+            self.values[key] = json.loads(value)
+
+    def _is_empty(self):
+        for table in ("kv",) + LIST_TABLES:
+            if self.conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                return False
+        return True
+
+    # -----------------------------
+    # 쓰기
+    # -----------------------------
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value):
+        self.values[key] = value
+        self._insert_value(key, value)
+        if not self.in_batch:
+            self.conn.commit()
+
+    def append(self, key, entry):
+        self._insert_entry(key, entry)
+        if not self.in_batch:
+            self.conn.commit()
+
+    # -----------------------------
+    # 배치 (write-behind)
+    # -----------------------------
+    def begin(self):
+        # 배치 동안은 열린 트랜잭션에 쌓기만 한다 (같은 연결의 조회에는 보인다)
+        self.in_batch = True
+
+    def commit(self):
+        self.in_batch = False
+        self.conn.commit()
+
+    def _insert_value(self, key, value):
+        self.conn.execute(
+            "INSERT INTO kv (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value, ensure_ascii=False))
+        )
+
+    def _insert_entry(self, key, entry):
+        payload = json.dumps(entry, ensure_ascii=False)
+        timestamp = entry.get("timestamp", "")
+
+        if key == "history":
+            self.conn.execute(
+                "INSERT INTO history (timestamp, project, action, entry) VALUES (?, ?, ?, ?)",
+                (timestamp, _history_project(entry), _history_action(entry), payload)
+            )
+        elif key == "errors":
+            self.conn.execute(
+                "INSERT INTO errors (timestamp, project, entry) VALUES (?, ?, ?)",
+                (timestamp, entry.get("project"), payload)
+            )
+        else:
+            raise KeyError(f"Unknown list key: {key}")
+
+    # -----------------------------
+    # 조회
+    # -----------------------------
+    def _select(self, table, filters, limit):
+        where = " AND ".join(clause for clause, _ in filters) or "1 = 1"
+        params = [value for _, value in filters]
+
+        # 최신 limit개를 id 역순으로 뽑은 뒤 시간순으로 되돌린다
+        sql = f"SELECT entry FROM {table} WHERE {where} ORDER BY id DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        rows = self.conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in reversed(rows)]
+
+    def recent(self, key, limit):
+        if key not in LIST_TABLES:
+            raise KeyError(f"Unknown list key: {key}")
+        return self._select(key, [], limit)
+
+    def query_history(self, project=None, action=None, since=None, limit=None):
+        filters = []
+        if project is not None:
+            filters.append(("project = ?", project))
+        if action is not None:
+            filters.append(("action = ?", action))
+        if since is not None:
+            filters.append(("timestamp >= ?", since))
+        return self._select("history", filters, limit)
+
+    def query_errors(self, project=None, since=None, limit=None):
+        filters = []
+        if project is not None:
+            filters.append(("project = ?", project))
+        if since is not None:
+            filters.append(("timestamp >= ?", since))
+        return self._select("errors", filters, limit)
+
+    def snapshot(self, data=None):
+        self.conn.commit()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+
+# -----------------------------
+# Migration
+# -----------------------------
+def migrate_json_to_sqlite(json_path, storage):
+    """
+    agent_memory.json (+ 저널이 있으면 재생한 결과)을 SQLite 저장소로 옮긴다.
+    한 트랜잭션으로 처리하므로 중간에 실패하면 아무것도 들어가지 않는다.
+    """
+    data = JournalStorage(json_path).load() or {}
+
+    with storage.conn:
+        for key, value in data.items():
+            if key in LIST_TABLES:
+                for entry in value:
+                    storage._insert_entry(key, entry)
+            else:
+                storage._insert_value(key, value)
+
+    return {key: len(data.get(key, [])) for key in LIST_TABLES}
@@ -1,10 +1,21 @@
-from typing import Any
-from agent.config import llm_call, llm_json_call
+from typing import Any, Callable
+
+
+def llm_call(prompt: str) -> str:
+    from agent.config import llm_call as _llm_call
+    return _llm_call(prompt)
+
+
+def llm_json_call(text: str) -> Any:
+    from agent.config import llm_json_call as _llm_json_call
+    return _llm_json_call(text)
 
 
 class Summarizer:
-    def __init__(self):
+    def __init__(self, llm: Callable[[str], str] | None = None):
         self.max_length = 2000
+        # LLM 호출 함수 주입 (없으면 agent.config.llm_call)
+        self.llm = llm or llm_call
 
     def summarize(self, text: str, max_tokens: int = 500) -> str:
         if len(text) <= self.max_length:
@@ -19,7 +30,7 @@ class Summarizer:
 """
         
         try:
-            return llm_call(prompt)
+            return self.llm(prompt)
         except:
             return text[:self.max_length] + "..."
 
@@ -34,7 +45,7 @@ class Summarizer:
 """
         
         try:
-            return llm_call(prompt)
+            return self.llm(prompt)
         except:
             return context_str[:500]
 
@@ -56,7 +67,7 @@ class Summarizer:
 """
         
         try:
-            return llm_call(prompt)
+            return self.llm(prompt)
         except:
             return history_str
 
@@ -75,7 +86,7 @@ class Summarizer:
 """
         
         try:
-            return llm_call(prompt)
+            return self.llm(prompt)
         except:
             return errors_str
 
@@ -95,11 +106,38 @@ JSON 형식으로:
 """
         
         try:
-            result = llm_call(prompt)
+            result = self.llm(prompt)
             return llm_json_call(result)
         except:
             return {}
 
+    def summarize_turns(self, turns: list[dict[str, Any]], previous_summary: str = "") -> str:
+        """
+        오래된 대화 턴을 이전 요약과 합쳐 하나의 요약으로 만든다.
+        """
+        turns_str = "\n".join([
+            f"- {t.get('role', 'unknown')}: {str(t.get('content', ''))[:500]}"
+            for t in turns
+        ])
+
+        prompt = f"""
+다음은 코딩 에이전트와 사용자의 이전 대화다.
+기존 요약과 새 대화를 합쳐, 이후 계획에 필요한 사실(프로젝트 이름, 작성한 파일, 실행 결과, 오류)만 간결하게 요약하라.
+
+기존 요약:
+{previous_summary or "없음"}
+
+새 대화:
+{turns_str}
+
+요약:
+"""
+
+        try:
+            return self.llm(prompt)
+        except:
+            return (previous_summary + "\n" + turns_str)[-self.max_length:]
+
     def _format_context(self, context: dict[str, Any]) -> str:
         lines = []
         for key, value in context.items():
@@ -126,6 +164,6 @@ JSON 형식으로:
 """
         
         try:
-            return llm_call(prompt)
+            return self.llm(prompt)
         except:
             return f"Previous: {str(previous_result)[:100]}"
@@ -0,0 +1,86 @@
+from functools import lru_cache
+from typing import Any
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+
+# 메시지 하나당 role/구분자 오버헤드 (OpenAI 호환 chat 포맷 기준 근사치)
+MESSAGE_OVERHEAD = 4
+SUMMARY_PREFIX = "Summary of earlier conversation:\n"
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """tiktoken이 있으면 정확히, 없으면 4글자 ≈ 1토큰으로 근사한다"""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return (len(text) + 3) // 4
+
+
+def message_tokens(message: dict[str, Any]) -> int:
+    return count_tokens(str(message.get("content", ""))) + MESSAGE_OVERHEAD
+
+
+class TokenBudget:
+    """
+    대화 이력을 토큰 예산 안으로 유지한다.
+    - 맨 앞의 system 메시지(시스템 프롬프트)는 항상 그대로 둔다
+    - 최근 keep_recent개의 메시지는 그대로 둔다
+    - 예산을 넘으면 가장 오래된 턴부터 잘라서 Summarizer로 기존 요약에 합친다
+      (요약은 system 메시지 하나로 유지)
+    """
+
+    def __init__(self, summarizer, max_tokens: int = 6000, keep_recent: int = 6):
+        self.summarizer = summarizer
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+
+    def total(self, messages: list[dict[str, Any]]) -> int:
+        return sum(message_tokens(m) for m in messages)
+
+    @staticmethod
+    def _is_summary(message: dict[str, Any]) -> bool:
+        return message.get("role") == "system" and str(message.get("content", "")).startswith(SUMMARY_PREFIX)
+
+    def compact(self, messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        if self.total(messages) <= self.max_tokens:
+            return messages
+
+        # 1) 고정 영역(시스템 프롬프트) / 기존 요약 / 나머지 대화로 나눈다
+        head = []
+        index = 0
+        while index < len(messages) and messages[index].get("role") == "system" and not self._is_summary(messages[index]):
+            head.append(messages[index])
+            index += 1
+
+        previous_summary = ""
+        if index < len(messages) and self._is_summary(messages[index]):
+            previous_summary = messages[index]["content"][len(SUMMARY_PREFIX):]
+            index += 1
+
+        turns = messages[index:]
+
+        # 2) 최근 메시지를 뒤에서부터 예산이 허용하는 만큼 남긴다 (최소 keep_recent개)
+        budget = self.max_tokens - self.total(head) - count_tokens(previous_summary) - MESSAGE_OVERHEAD
+        kept: list[dict[str, Any]] = []
+        used = 0
+        for message in reversed(turns):
+            cost = message_tokens(message)
+            if len(kept) >= self.keep_recent and used + cost > budget:
+                break
+            kept.append(message)
+            used += cost
+        kept.reverse()
+
+        evicted = turns[:len(turns) - len(kept)]
+        if not evicted:
+            return messages
+
+        # 3) 잘려 나간 턴을 기존 요약에 합친다
+        summary = self.summarizer.summarize_turns(evicted, previous_summary)
+
+        return head + [{"role": "system", "content": SUMMARY_PREFIX + summary}] + kept
@@ -0,0 +1,26 @@
+# gunicorn.conf.py
+#
+# 여러 워커로 MCP 서버 실행:
+#   OPENVIPER_WORKERS=4 gunicorn agent.server:app -c gunicorn.conf.py
+#
+# 워커끼리는 agent/project_lock.py의 프로젝트별 flock으로 쓰기/빌드를 직렬화한다.
+# preload_app은 쓰지 않는다 (작업 큐/데몬 풀/잠금은 워커마다 fork 이후에 만들어져야 한다).
+
+import os
+
+workers = int(os.getenv("OPENVIPER_WORKERS", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# main.py와 같은 주소 (OPENVIPER_MCP_SOCKET이 있으면 Unix 소켓)
+_socket_path = os.getenv("OPENVIPER_MCP_SOCKET")
+bind = f"unix:{_socket_path}" if _socket_path else "0.0.0.0:8000"
+
+# 빌드(run_maven)는 한 요청이 수 분까지 걸릴 수 있다
+timeout = 600
+graceful_timeout = 30
+keepalive = 5
+
+preload_app = False
+
+# 서버 코드의 워커 수 판단(mvnd 저장소 분리)과 맞춘다
+raw_env = [f"OPENVIPER_WORKERS={workers}"]
@@ -1,21 +1,69 @@
+import asyncio
 import subprocess
 import sys
 import os
+from pathlib import Path
 
-def main():
-    server_process = subprocess.Popen(
-        [sys.executable, "-m", "uvicorn", "agent.server:app", "--host", "0.0.0.0", "--port", "8000"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
-    )
-    print("Starting server on port 8000...")
+from agent.supervisor import ServerSupervisor
+
+LOG_DIR = Path(os.getenv("OPENVIPER_LOG_DIR", "logs"))
+
+
+async def run_supervised():
+    # OPENVIPER_MCP_SOCKET이 있으면 TCP 포트 대신 Unix 소켓으로 서버를 띄운다
+    # (클라이언트는 같은 환경 변수를 보고 소켓으로 접속한다)
+    socket_path = os.getenv("OPENVIPER_MCP_SOCKET")
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        bind_args = ["--uds", socket_path]
+        print(f"Starting server on {socket_path}...")
+    else:
+        bind_args = ["--host", "0.0.0.0", "--port", "8000"]
+        print("Starting server on port 8000...")
+
+    # OPENVIPER_WORKERS > 1이면 uvicorn 워커 여러 개 (프로젝트별 파일 잠금으로 직렬화)
+    workers = int(os.getenv("OPENVIPER_WORKERS", "1"))
+    if workers > 1:
+        bind_args += ["--workers", str(workers)]
 
-    client_process = subprocess.Popen(
-        [sys.executable, "agent/interactive_client.py"]
+    # 서버 출력은 logs/server.log (회전)로, 죽거나 응답이 없으면 백오프 후 재시작
+    supervisor = ServerSupervisor(
+        [sys.executable, "-m", "uvicorn", "agent.server:app", *bind_args],
+        log_path=LOG_DIR / "server.log",
+        port=8000,
+        socket_path=socket_path,
+        health_interval=float(os.getenv("OPENVIPER_HEALTH_INTERVAL", "10"))
     )
+    supervisor.start()
+
+    try:
+        if not await supervisor.wait_ready(timeout=60):
+            print(f"Server did not become ready, see {LOG_DIR / 'server.log'}")
+            return
+
+        # 클라이언트는 터미널 입출력을 그대로 쓴다
+        client_process = await asyncio.create_subprocess_exec(
+            sys.executable, "agent/interactive_client.py"
+        )
+        await client_process.wait()
+
+    finally:
+        await supervisor.stop()
+
+
+def main():
+    # local 모드: 클라이언트가 서버 핸들러를 직접 호출하므로 uvicorn을 띄우지 않는다
+    if os.getenv("OPENVIPER_MCP_TRANSPORT", "http") == "local":
+        print("Running in local (in-process) mode...")
+        client_process = subprocess.Popen(
+            [sys.executable, "agent/interactive_client.py"]
+        )
+        client_process.wait()
+        return
 
-    server_process.wait()
-    client_process.wait()
+    asyncio.run(run_supervised())
 
 if __name__ == "__main__":
     main()
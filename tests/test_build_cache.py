@@ -0,0 +1,91 @@
+import io
+import tarfile
+
+from agent.build_cache import BuildCache
+from agent.incremental import STATE_FILE
+
+
+def _project(tmp_path):
+    project = tmp_path / "demo"
+    (project / "src" / "main" / "java").mkdir(parents=True)
+    (project / "src" / "main" / "java" / "A.java").write_text("class A {}")
+    (project / "pom.xml").write_text("<project/>")
+    (project / "target" / "classes").mkdir(parents=True)
+    (project / "target" / "classes" / "A.class").write_bytes(b"compiled")
+    return project
+
+
+def test_store_and_restore_round_trip(tmp_path):
+    project = _project(tmp_path)
+    cache = BuildCache(tmp_path / "cache")
+    key = cache.key(project, ["package"])
+
+    assert cache.restore(key, project) is None
+    cache.store(key, project, {"status": "success", "stdout": "BUILD SUCCESS"})
+
+    (project / "target" / "classes" / "A.class").write_bytes(b"changed")
+    assert cache.restore(key, project) == {"status": "success", "stdout": "BUILD SUCCESS"}
+    assert (project / "target" / "classes" / "A.class").read_bytes() == b"compiled"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_changes_with_sources_and_goal(tmp_path):
+    project = _project(tmp_path)
+    cache = BuildCache(tmp_path / "cache")
+    key = cache.key(project, ["package"])
+
+    assert cache.key(project, ["compile"]) != key
+    (project / "src" / "main" / "java" / "A.java").write_text("class A { int x; }")
+    assert cache.key(project, ["package"]) != key
+
+
+def test_test_goal_is_not_cacheable():
+    assert BuildCache.cacheable(["clean", "package"])
+    assert not BuildCache.cacheable(["test"])
+    assert not BuildCache.cacheable(["install"])
+
+
+def test_incremental_state_is_not_stored(tmp_path):
+    project = _project(tmp_path)
+    (project / "target" / STATE_FILE).write_text("{}")
+    cache = BuildCache(tmp_path / "cache")
+    cache.store("k", project, {"status": "success"})
+
+    with tarfile.open(tmp_path / "cache" / "k" / "target.tar") as tar:
+        names = tar.getnames()
+    assert "target/classes/A.class" in names
+    assert f"target/{STATE_FILE}" not in names
+
+    cache.restore("k", project)
+    assert not (project / "target" / STATE_FILE).exists()
+
+
+def test_unsafe_entry_is_dropped(tmp_path):
+    project = _project(tmp_path)
+    entry = tmp_path / "cache" / "bad"
+    entry.mkdir(parents=True)
+    (entry / "result.json").write_text("{}")
+    with tarfile.open(entry / "target.tar", "w") as tar:
+        info = tarfile.TarInfo("../escape.txt")
+        info.size = 1
+        tar.addfile(info, io.BytesIO(b"x"))
+
+    cache = BuildCache(tmp_path / "cache")
+    assert cache.restore("bad", project) is None
+    assert not entry.exists()
+    assert not (tmp_path / "escape.txt").exists()
+    # 조작된 항목은 프로젝트의 target을 건드리지 않는다
+    assert (project / "target" / "classes" / "A.class").exists()
+
+
+def test_corrupt_archive_is_a_miss(tmp_path):
+    project = _project(tmp_path)
+    cache = BuildCache(tmp_path / "cache")
+    cache.store("k", project, {"status": "success"})
+
+    archive = tmp_path / "cache" / "k" / "target.tar"
+    archive.write_bytes(archive.read_bytes()[:100])
+
+    assert cache.restore("k", project) is None
+    assert not (tmp_path / "cache" / "k").exists()
+    assert cache.misses == 1
@@ -0,0 +1,72 @@
+import struct
+
+from agent.class_index import ClassIndex, has_main_method
+
+
+def _class_bytes(access=0x0009, name="main", descriptor="([Ljava/lang/String;)V"):
+    """main 후보 메서드 하나만 있는 최소 클래스 파일"""
+    def utf8(text):
+        data = text.encode("utf-8")
+        return b"\x01" + struct.pack(">H", len(data)) + data
+
+    return (
+        b"\xca\xfe\xba\xbe" + struct.pack(">HH", 0, 52)
+        + struct.pack(">H", 3) + utf8(name) + utf8(descriptor)
+        + struct.pack(">HHH", 0x0021, 0, 0)      # access, this_class, super_class
+        + struct.pack(">H", 0)                   # interfaces
+        + struct.pack(">H", 0)                   # fields
+        + struct.pack(">H", 1) + struct.pack(">HHHH", access, 1, 2, 0)
+    )
+
+
+def _write_class(classes_dir, rel_path, data):
+    path = classes_dir / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def test_has_main_method(tmp_path):
+    path = tmp_path / "A.class"
+    path.write_bytes(_class_bytes())
+    assert has_main_method(path)
+
+    path.write_bytes(_class_bytes(access=0x0001))   # static 아님
+    assert not has_main_method(path)
+    path.write_bytes(_class_bytes(descriptor="()V"))
+    assert not has_main_method(path)
+    path.write_bytes(b"not a class")
+    assert not has_main_method(path)
+
+
+def test_index_prefers_pom_main_and_skips_inner_classes(tmp_path):
+    classes = tmp_path / "target" / "classes"
+    _write_class(classes, "app/Main.class", _class_bytes())
+    _write_class(classes, "app/Tool.class", _class_bytes())
+    _write_class(classes, "app/Main$Inner.class", _class_bytes())
+    _write_class(classes, "app/Util.class", _class_bytes(access=0x0001))
+
+    index = ClassIndex()
+    assert index.main_classes(classes) == ["app.Main", "app.Tool"]
+    assert index.find_main_class(classes, "app.Tool") == "app.Tool"
+    assert index.find_main_class(classes, "app.Missing") == "app.Main"
+
+
+def test_invalidate_picks_up_overwritten_class(tmp_path):
+    classes = tmp_path / "target" / "classes"
+    _write_class(classes, "app/Main.class", _class_bytes())
+    index = ClassIndex()
+    assert index.main_classes(classes) == ["app.Main"]
+
+    # 같은 자리에 덮어쓰면 디렉토리 mtime이 바뀌지 않는다 → 빌드 스탬프로 알린다
+    _write_class(classes, "app/Main.class", _class_bytes(access=0x0001) + b"\0")
+    ClassIndex().invalidate(classes)
+    assert index.main_classes(classes) == []
+
+
+def test_vanished_class_file_is_skipped(tmp_path):
+    classes = tmp_path / "target" / "classes"
+    _write_class(classes, "app/Main.class", _class_bytes())
+    # 훑는 도중 지워진 파일처럼 stat이 실패하는 항목
+    (classes / "app" / "Gone.class").symlink_to(classes / "app" / "missing.class")
+
+    assert ClassIndex().main_classes(classes) == ["app.Main"]
@@ -0,0 +1,60 @@
+import asyncio
+import os
+import stat
+import sys
+
+import pytest
+
+from agent.incremental import IncrementalCompiler
+
+
+# javac 대신: 소스 내용을 그대로 <Type>.class에 쓴다 (어떤 버전의 소스로 만든 클래스인지 확인용)
+FAKE_JAVAC = """#!/bin/sh
+out=""
+prev=""
+for arg in "$@"; do
+    if [ "$prev" = "-d" ]; then out="$arg"; fi
+    prev="$arg"
+done
+for arg in "$@"; do
+    case "$arg" in
+        *.java) cp "$arg" "$out/$(basename "$arg" .java).class" ;;
+    esac
+done
+"""
+
+
+@pytest.fixture
+def fake_javac(tmp_path, monkeypatch):
+    if sys.platform.startswith("win"):
+        pytest.skip("fake javac is a shell script")
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    javac = bin_dir / "javac"
+    javac.write_text(FAKE_JAVAC)
+    javac.chmod(javac.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+
+def test_maven_build_between_compiles_does_not_leave_stale_classes(tmp_path, fake_javac):
+    project = tmp_path / "demo"
+    source = project / "src" / "main" / "java" / "X.java"
+    source.parent.mkdir(parents=True)
+    compiled = project / "target" / "classes" / "X.class"
+
+    compiler = IncrementalCompiler(project)
+
+    source.write_text("class X { int v = 1; }")
+    assert asyncio.run(compiler.compile())["status"] == "success"
+
+    # 소스를 고친 뒤 mvn package가 target/classes를 새로 씀 (server는 빌드 뒤 invalidate를 부른다)
+    source.write_text("class X { int v = 2; }")
+    compiled.write_text("class X { int v = 2; }")
+    compiler.invalidate()
+
+    # 원래 내용으로 되돌리고 compile → 해시는 처음 기록과 같지만 클래스는 다시 만들어야 한다
+    source.write_text("class X { int v = 1; }")
+    result = asyncio.run(compiler.compile())
+
+    assert result["compiled"] == ["X.java"]
+    assert compiled.read_text() == "class X { int v = 1; }"
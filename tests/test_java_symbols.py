@@ -0,0 +1,28 @@
+from context.java_symbols import get_symbol_index
+from tools.workspace_index import get_index
+
+
+def _write(root, rel_path, text):
+    path = root / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def test_same_root_shares_one_index(tmp_path):
+    index = get_symbol_index(str(tmp_path))
+    assert get_symbol_index(str(tmp_path / ".")) is index
+    assert index.workspace_index is get_index(str(tmp_path))
+
+
+def test_refresh_reparses_only_after_workspace_changes(tmp_path):
+    _write(tmp_path, "demo/src/main/java/app/Calc.java", "package app;\nclass Calc {\n  int add(int a, int b) { return a + b; }\n}\n")
+    index = get_symbol_index(str(tmp_path))
+
+    assert index.refresh() == ["demo/src/main/java/app/Calc.java"]
+    # 바뀐 것이 없으면 다시 파싱하지 않는다
+    assert index.refresh() == []
+    assert [s["name"] for s in index.symbols("demo")] == ["Calc", "add"]
+
+    _write(tmp_path, "demo/src/main/java/app/Calc.java", "package app;\nclass Calc {\n  int sub(int a, int b) { return a - b; }\n}\n")
+    assert index.refresh() == ["demo/src/main/java/app/Calc.java"]
+    assert [s["name"] for s in index.symbols("demo")] == ["Calc", "sub"]
@@ -0,0 +1,72 @@
+import asyncio
+import sys
+
+from agent import jobs
+from agent.jobs import Job, run_command
+
+
+def test_long_lines_are_split_instead_of_failing():
+    script = (
+        "import sys\n"
+        "sys.stdout.write('x' * (3 * 1024 * 1024 + 10))\n"
+        "sys.stdout.write('\\nafter\\n')\n"
+        "sys.stderr.write('no newline at end')\n"
+    )
+    lines = []
+    output = asyncio.run(run_command(
+        [sys.executable, "-c", script], cwd=".", timeout=30,
+        on_line=lambda stream, line: lines.append((stream, line))
+    ))
+
+    assert output["returncode"] == 0
+    stdout = [line for stream, line in lines if stream == "stdout"]
+    # 줄바꿈 없는 3MB는 STREAM_LINE_LIMIT마다 잘린다
+    assert [len(line) for line in stdout] == [jobs.STREAM_LINE_LIMIT] * 3 + [11, 6]
+    assert stdout[-1] == "after\n"
+    assert output["stdout"].endswith("x\nafter\n")
+    assert output["stderr"] == "no newline at end"
+
+
+def test_retain_lines_marks_truncated():
+    script = "for i in range(10): print(i)"
+    output = asyncio.run(run_command([sys.executable, "-c", script], cwd=".", timeout=30, retain_lines=3))
+    assert output["stdout"] == "7\n8\n9\n"
+    assert output["truncated"]
+
+
+def test_slow_subscriber_is_dropped(monkeypatch):
+    monkeypatch.setattr(jobs, "SUBSCRIBER_QUEUE_SIZE", 5)
+
+    async def scenario():
+        job = Job("run_maven", "demo", {})
+        job.status = "running"
+        events = job.events()
+        fast_lines = []
+
+        async def fast():
+            async for _, line in job.events():
+                fast_lines.append(line)
+
+        fast_task = asyncio.create_task(fast())
+        # 느린 구독자: 구독만 하고 읽지 않는다
+        first = asyncio.create_task(events.__anext__())
+        await asyncio.sleep(0)
+
+        for i in range(20):
+            job.emit("stdout", f"{i}\n")
+            await asyncio.sleep(0)
+        job.status = "success"
+        job._close_subscribers()
+        await fast_task
+
+        slow_lines = [(await first)[1]]
+        async for _, line in events:
+            slow_lines.append(line)
+        return fast_lines, slow_lines, job
+
+    fast_lines, slow_lines, job = asyncio.run(scenario())
+    assert fast_lines == [f"{i}\n" for i in range(20)]
+    assert slow_lines[0] == "0\n"
+    assert "live output stopped" in slow_lines[-1]
+    assert len(slow_lines) <= 7
+    assert job._subscribers == []
@@ -0,0 +1,41 @@
+from agent.maven_pool import MavenDaemonPool, MavenWorker
+
+
+def _output(returncode, stdout="", stderr=""):
+    return {"returncode": returncode, "stdout": stdout, "stderr": stderr, "truncated": False}
+
+
+def test_build_failure_is_not_a_daemon_failure():
+    assert not MavenDaemonPool.daemon_failed(_output(0, "[INFO] BUILD SUCCESS\n"))
+    assert not MavenDaemonPool.daemon_failed(_output(1, "[ERROR] COMPILATION ERROR\n[INFO] BUILD FAILURE\n"))
+
+
+def test_crash_and_connection_errors_are_daemon_failures():
+    assert MavenDaemonPool.daemon_failed(_output(-9))
+    assert MavenDaemonPool.daemon_failed(_output(1, stderr="Could not connect to daemon\n"))
+    assert MavenDaemonPool.daemon_failed(
+        _output(1, "org.mvndaemon.mvnd.common.DaemonException$StaleAddressException: ...\n")
+    )
+
+
+def test_repeated_daemon_failures_back_off_until_success(tmp_path):
+    pool = MavenDaemonPool(tmp_path, max_failures=2, failure_backoff=60)
+    worker = MavenWorker("demo", tmp_path / "demo")
+
+    for _ in range(2):
+        worker.in_use += 1
+        pool.release(worker, ok=False)
+    assert worker.failures == 2
+    assert worker.cold_until > 0
+
+    worker.in_use += 1
+    pool.release(worker, ok=True)
+    assert (worker.failures, worker.cold_until, worker.in_use) == (0, 0.0, 0)
+
+
+def test_cancelled_build_only_releases(tmp_path):
+    pool = MavenDaemonPool(tmp_path)
+    worker = MavenWorker("demo", tmp_path / "demo")
+    worker.in_use = 1
+    pool.release(worker, ok=None)
+    assert (worker.in_use, worker.builds, worker.failures) == (0, 0, 0)
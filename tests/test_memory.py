@@ -0,0 +1,157 @@
+import json
+import time
+
+import pytest
+
+from context.memory import Memory
+
+
+STORAGES = ["json", "journal", "sqlite"]
+
+
+def _plan(project, action="write_file"):
+    return {"action": action, "parameters": {"project_name": project, "file_path": "App.java"}}
+
+
+def _open(tmp_path, storage, **kwargs):
+    return Memory(str(tmp_path / "agent_memory.json"), storage=storage, **kwargs)
+
+
+@pytest.mark.parametrize("storage", STORAGES)
+def test_values_survive_reopen(tmp_path, storage):
+    memory = _open(tmp_path, storage)
+    memory.set_project("demo")
+    memory.set_last_file("src/App.java")
+    memory.set_last_action("write_file")
+    memory.add_history("make app", _plan("demo"))
+    memory.add_error("compile failed")
+    memory.close()
+
+    memory = _open(tmp_path, storage)
+    try:
+        assert memory.get_project() == "demo"
+        assert memory.get_last_file() == "src/App.java"
+        assert memory.get_last_action() == "write_file"
+        assert [entry["input"] for entry in memory.get_recent_history()] == ["make app"]
+        assert memory.get_recent_errors()[0]["error"] == "compile failed"
+        assert memory.get_recent_errors()[0]["project"] == "demo"
+    finally:
+        memory.close()
+
+
+@pytest.mark.parametrize("storage", STORAGES)
+def test_history_queries(tmp_path, storage):
+    memory = _open(tmp_path, storage)
+    try:
+        memory.add_history("a", _plan("alpha"))
+        memory.add_history("b", _plan("beta", "run_maven"))
+        time.sleep(0.01)
+        since = memory.get_recent_history(1)[0]["timestamp"]
+        memory.add_history("c", _plan("alpha", "run_maven"))
+
+        assert [e["input"] for e in memory.get_project_history("alpha")] == ["a", "c"]
+        assert [e["input"] for e in memory.get_history_by_action("run_maven")] == ["b", "c"]
+        assert [e["input"] for e in memory.get_history_by_action("run_maven", limit=1)] == ["c"]
+        assert [e["input"] for e in memory.get_history_since(since)] == ["b", "c"]
+        assert [e["input"] for e in memory.get_recent_history(2)] == ["b", "c"]
+    finally:
+        memory.close()
+
+
+@pytest.mark.parametrize("storage", STORAGES)
+def test_batch_writes_once_at_the_end(tmp_path, storage):
+    memory = _open(tmp_path, storage)
+    try:
+        with memory.batch():
+            memory.set_project("demo")
+            memory.add_history("x", _plan("demo"))
+            # 블록 안에서도 같은 인스턴스의 조회에는 보인다
+            assert memory.get_project() == "demo"
+
+            other = _open(tmp_path, storage)
+            assert other.get_project() is None
+            other.close()
+
+        other = _open(tmp_path, storage)
+        assert other.get_project() == "demo"
+        assert len(other.get_recent_history()) == 1
+        other.close()
+    finally:
+        memory.close()
+
+
+def test_journal_batch_is_one_append(tmp_path):
+    memory = _open(tmp_path, "journal")
+    try:
+        with memory.batch():
+            memory.set_project("demo")
+            memory.set_last_file("App.java")
+            memory.add_history("x", _plan("demo"))
+        lines = (tmp_path / "agent_memory.json.journal").read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["seq"] for line in lines] == [1, 2, 3]
+    finally:
+        memory.close()
+
+
+def test_journal_ignores_torn_last_line(tmp_path):
+    memory = _open(tmp_path, "journal")
+    memory.set_project("demo")
+    memory.close()
+
+    journal = tmp_path / "agent_memory.json.journal"
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write('{"op": "set", "key": "current_project", "val')
+
+    memory = _open(tmp_path, "journal")
+    try:
+        assert memory.get_project() == "demo"
+        # 잘린 꼬리는 잘라내서 이후 기록이 온전한 줄로 붙는다
+        memory.set_last_file("App.java")
+    finally:
+        memory.close()
+
+    memory = _open(tmp_path, "journal")
+    try:
+        assert memory.get_last_file() == "App.java"
+    finally:
+        memory.close()
+
+
+def test_journal_compaction_keeps_data(tmp_path):
+    memory = Memory(str(tmp_path / "agent_memory.json"), storage="journal")
+    memory.storage.compact_every = 3
+    for i in range(7):
+        memory.add_history(f"input {i}", _plan("demo"))
+    memory.close()
+
+    assert len((tmp_path / "agent_memory.json.journal").read_text(encoding="utf-8").splitlines()) < 3
+    memory = _open(tmp_path, "journal")
+    try:
+        assert [e["input"] for e in memory.get_recent_history(10)] == [f"input {i}" for i in range(7)]
+    finally:
+        memory.close()
+
+
+def test_sqlite_migrates_existing_json(tmp_path):
+    memory = _open(tmp_path, "journal")
+    memory.set_project("legacy")
+    memory.add_history("old", _plan("legacy"))
+    memory.close()
+
+    memory = _open(tmp_path, "sqlite")
+    try:
+        assert memory.get_project() == "legacy"
+        assert [e["input"] for e in memory.get_project_history("legacy")] == ["old"]
+    finally:
+        memory.close()
+
+
+def test_write_behind_flushes_after_interval(tmp_path):
+    memory = _open(tmp_path, "journal", flush_interval=0.05)
+    try:
+        memory.set_project("demo")
+        assert not (tmp_path / "agent_memory.json.journal").exists()
+        time.sleep(0.3)
+        assert "demo" in (tmp_path / "agent_memory.json.journal").read_text(encoding="utf-8")
+    finally:
+        memory.close()
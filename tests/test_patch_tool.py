@@ -0,0 +1,90 @@
+import pytest
+
+from tools.patch_tool import PatchConflict, apply_patch, apply_unified_diff, content_hash
+
+
+SOURCE = "".join(f"line {i}\n" for i in range(1, 11))
+
+
+def test_apply_replaces_lines():
+    diff = (
+        "--- a/f.txt\n"
+        "+++ b/f.txt\n"
+        "@@ -4,3 +4,3 @@\n"
+        " line 4\n"
+        "-line 5\n"
+        "+line five\n"
+        " line 6\n"
+    )
+    assert apply_unified_diff(SOURCE, diff) == SOURCE.replace("line 5\n", "line five\n")
+
+
+def test_shifted_hunk_is_found_nearby():
+    # 헤더의 줄 번호가 3줄 어긋나도 가장 가까운 일치 위치에 적용한다
+    diff = "@@ -1,2 +1,2 @@\n line 4\n-line 5\n+line five\n"
+    assert apply_unified_diff(SOURCE, diff) == SOURCE.replace("line 5\n", "line five\n")
+
+
+def test_conflict_when_context_does_not_match():
+    diff = "@@ -4,2 +4,2 @@\n line 4\n-line 50\n+line five\n"
+    with pytest.raises(PatchConflict, match="does not match"):
+        apply_unified_diff(SOURCE, diff)
+
+
+def test_lines_after_hunk_counts_are_ignored():
+    # 헤더의 줄 수를 다 채운 뒤의 줄은 헝크에 들어가지 않는다
+    diff = (
+        "@@ -5 +5 @@\n"
+        "-line 5\n"
+        "+line five\n"
+        "-line 6\n"
+        "diff --git a/other.txt b/other.txt\n"
+    )
+    assert apply_unified_diff(SOURCE, diff) == SOURCE.replace("line 5\n", "line five\n")
+
+
+def test_truncated_hunk_is_a_conflict():
+    diff = "@@ -4,3 +4,3 @@\n line 4\n-line 5\n+line five\n"
+    with pytest.raises(PatchConflict, match="truncated"):
+        apply_unified_diff(SOURCE, diff)
+
+
+def test_crlf_file_keeps_line_endings():
+    text = SOURCE.replace("\n", "\r\n")
+    diff = "@@ -5 +5 @@\n-line 5\n+line five\n"
+    assert apply_unified_diff(text, diff) == text.replace("line 5\r\n", "line five\r\n")
+    # diff 쪽이 CRLF여도 같다
+    assert apply_unified_diff(text, diff.replace("\n", "\r\n")) == text.replace("line 5\r\n", "line five\r\n")
+
+
+def test_no_newline_marker_controls_trailing_newline():
+    diff = "@@ -10 +10 @@\n-line 10\n+last\n\\ No newline at end of file\n"
+    assert apply_unified_diff(SOURCE, diff) == SOURCE.replace("line 10\n", "last")
+
+    text = SOURCE[:-1]
+    diff = "@@ -10 +10 @@\n-line 10\n\\ No newline at end of file\n+last\n"
+    assert apply_unified_diff(text, diff) == SOURCE.replace("line 10\n", "last\n")
+
+
+def test_file_without_trailing_newline_stays_that_way():
+    text = "a\nb"
+    assert apply_unified_diff(text, "@@ -1 +1 @@\n-a\n+A\n") == "A\nb"
+
+
+def test_insert_into_empty_range():
+    diff = "@@ -2,0 +3 @@\n+inserted\n"
+    assert apply_unified_diff("a\nb\nc\n", diff) == "a\nb\ninserted\nc\n"
+
+
+def test_expected_hash_guards_stale_reads():
+    with pytest.raises(PatchConflict, match="hash mismatch"):
+        apply_patch(SOURCE, edits=[{"search": "line 1\n", "replace": ""}], expected_hash=content_hash("other"))
+    assert apply_patch(
+        SOURCE, edits=[{"search": "line 1\n", "replace": ""}], expected_hash=content_hash(SOURCE)
+    ) == SOURCE[len("line 1\n"):]
+
+
+def test_ambiguous_search_is_a_conflict():
+    with pytest.raises(PatchConflict, match="matches 2 times"):
+        apply_patch("x\nx\n", edits=[{"search": "x", "replace": "y"}])
+    assert apply_patch("x\nx\n", edits=[{"search": "x", "replace": "y", "replace_all": True}]) == "y\ny\n"
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from agent.plan_stream import IncrementalJSONParser, PlanParseError
+
+
+CONTENT = ("parameters", "content")
+
+PLAN = {
+    "action": "write_file",
+    "parameters": {
+        "project_name": "demo",
+        "file_path": "src/main/java/App.java",
+        "content": "class App {\n  String s = \"\\\\ \\u00e9 😀\";\n}\n"
+    },
+    "retries": 2,
+    "ratio": -1.5e3,
+    "flags": [True, False, None, []]
+}
+
+
+def _parse(chunks, stream_paths=()):
+    parser = IncrementalJSONParser(stream_paths=stream_paths)
+    events = []
+    for chunk in chunks:
+        events.extend(parser.feed(chunk))
+    return parser, events
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_any_chunk_boundary_gives_the_same_result(size):
+    text = "Here is the plan:\n" + json.dumps(PLAN) + "\nthanks"
+    parser, events = _parse([text[i:i + size] for i in range(0, len(text), size)], {CONTENT})
+
+    assert parser.done
+    streamed = "".join(value for kind, path, value in events if kind == "chunk" and path == CONTENT)
+    assert streamed == PLAN["parameters"]["content"]
+
+    expected = json.loads(json.dumps(PLAN))
+    expected["parameters"]["content"] = None
+    assert parser.result == expected
+
+
+def test_escapes_and_surrogate_pairs_split_across_chunks():
+    text = '{"s": "a\\n\\t\\"\\/\\u00e9\\ud83d\\ude00"}'
+    parser, _ = _parse(list(text))
+    assert parser.result == {"s": 'a\n\t"/é😀'}
+
+
+def test_scalar_values_are_emitted_as_they_complete():
+    _, events = _parse(['{"action": "run_ma', 'ven", "n": 4', '2}'])
+    assert events[0] == ("value", ("action",), "run_maven")
+    assert events[1] == ("value", ("n",), 42)
+    assert events[2][0] == "done"
+
+
+@pytest.mark.parametrize("text, message", [
+    ('{"a": tru}', "Invalid literal"),
+    ('{"a": nope}', "Invalid literal"),
+    ('{"a": 01}', "Invalid number"),
+    ('{"a": 1.2.3}', "Invalid number"),
+    ('{"a": "\\x"}', "Invalid escape"),
+    ('{"a": "\\u12g4"}', "Invalid \\\\u escape"),
+    ('{"a": "\\ud83d"}', "Unpaired high surrogate"),
+    ('{"a": "\\ud83d\\n"}', "Unpaired high surrogate"),
+    ('{"a": "\\ude00"}', "Unpaired low surrogate"),
+    ('{"a": "line\nbreak"}', "control character"),
+    ('{"a" 1}', "Expected ':'"),
+    ('{"a": 1,}', "Expected object key"),
+    ('{"a": [1}', "Mismatched closing bracket"),
+    ('{"a": 1 "b": 2}', "Expected ','"),
+    ('{"a": @}', "Expected a value"),
+])
+def test_invalid_json_raises_parse_error(text, message):
+    parser = IncrementalJSONParser()
+    with pytest.raises(PlanParseError, match=message) as info:
+        parser.feed(text)
+    assert isinstance(info.value, ValueError)
+    assert not parser.done
+
+
+def test_error_offset_counts_across_feeds():
+    parser = IncrementalJSONParser()
+    parser.feed('{"a": ')
+    with pytest.raises(PlanParseError) as info:
+        parser.feed("?}")
+    assert info.value.offset == 6
+
+
+def test_text_after_the_object_is_ignored():
+    parser, _ = _parse(['{"a": 1}', " trailing } ] garbage"])
+    assert parser.done
+    assert parser.result == {"a": 1}
@@ -0,0 +1,22 @@
+import asyncio
+import sys
+
+from tools.registry import ToolRegistry
+
+
+def test_registry_runs_sync_and_async_tools(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registry = ToolRegistry(max_workers=2)
+    try:
+        assert {"read_file", "write_file", "patch_file", "list_directory", "run_test"} <= set(registry.tools)
+
+        written = registry.execute("write_file", file_path="hello.txt", content="hi")
+        assert written.get("success"), written
+        assert registry.execute("read_file", file_path="hello.txt")["content"] == "hi"
+
+        result = asyncio.run(registry.execute_async(
+            "run_test", command=f'"{sys.executable}" -c "print(1)"', working_dir=str(tmp_path), timeout=30
+        ))
+        assert result["success"], result
+    finally:
+        registry.shutdown()
@@ -0,0 +1,61 @@
+import hashlib
+
+import pytest
+
+from agent.stream_upload import STREAM_TRAILER, TrailerVerifier, end_marker
+
+
+def _body(content: bytes) -> bytes:
+    return content + end_marker(hashlib.sha256(content))
+
+
+def _receive(chunks):
+    verifier = TrailerVerifier()
+    written = b"".join(verifier.feed(chunk) for chunk in chunks)
+    return verifier, written
+
+
+@pytest.mark.parametrize("size", [1, 5, 64, 10000])
+def test_trailer_split_across_chunks(size):
+    content = "class App {}\n".encode("utf-8") * 50
+    body = _body(content)
+    verifier, written = _receive([body[i:i + size] for i in range(0, len(body), size)])
+
+    verifier.verify()
+    assert written == content
+    assert verifier.size == len(content)
+
+
+def test_empty_content():
+    verifier, written = _receive([_body(b"")])
+    verifier.verify()
+    assert written == b""
+
+
+def test_missing_trailer_is_rejected():
+    # 연결이 끊겨 본문만 온 경우
+    verifier, _ = _receive([b"partial content " * 20])
+    with pytest.raises(ValueError, match="Incomplete upload"):
+        verifier.verify()
+
+
+def test_hash_mismatch_is_rejected():
+    body = b"tampered" + end_marker(hashlib.sha256(b"original"))
+    verifier, _ = _receive([body])
+    with pytest.raises(ValueError, match="hash mismatch"):
+        verifier.verify()
+
+
+def test_truncated_trailer_is_rejected():
+    body = _body(b"content")
+    verifier, _ = _receive([body[:-1]])
+    with pytest.raises(ValueError):
+        verifier.verify()
+
+
+def test_content_that_looks_like_a_trailer_is_kept():
+    # 본문 중간에 같은 바이트가 있어도 마지막 끝 표시만 떼어낸다
+    content = STREAM_TRAILER + b"0" * 64 + b"\nmore"
+    verifier, written = _receive([_body(content)])
+    verifier.verify()
+    assert written == content
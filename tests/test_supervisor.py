@@ -0,0 +1,67 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+from agent import supervisor
+from agent.supervisor import ServerSupervisor
+
+
+# 자식을 남기고 먼저 끝나는 서버 (자식이 stdout 파이프를 계속 쥐고 있다)
+ORPHANING_SERVER = """
+import subprocess, sys
+child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+with open(sys.argv[1], "w") as f:
+    f.write(str(child.pid))
+"""
+
+
+class BrokenStream:
+    def __init__(self):
+        self.reads = 0
+
+    async def read(self, n):
+        self.reads += 1
+        raise OSError("broken pipe")
+
+
+def test_drain_stops_on_read_error(tmp_path):
+    sup = ServerSupervisor(["true"], tmp_path / "server.log")
+    stream = BrokenStream()
+    asyncio.run(asyncio.wait_for(sup._drain(stream), 1))
+    assert stream.reads == 1
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="프로세스 그룹은 POSIX 전용")
+def test_restart_does_not_wait_for_orphaned_children(tmp_path, monkeypatch):
+    monkeypatch.setattr(supervisor, "DRAIN_EXIT_TIMEOUT", 0.5)
+    pid_path = tmp_path / "child.pid"
+
+    async def scenario():
+        sup = ServerSupervisor(
+            [sys.executable, "-c", ORPHANING_SERVER, str(pid_path)], tmp_path / "server.log",
+            port=1, backoff=0.1, startup_timeout=30
+        )
+        sup.start()
+        try:
+            for _ in range(50):
+                if sup.restarts:
+                    break
+                await asyncio.sleep(0.1)
+        finally:
+            await sup.stop()
+
+        # 첫 서버가 남긴 자식은 그룹째 종료되어야 한다
+        child_pid = int(pid_path.read_text())
+        for _ in range(50):
+            try:
+                os.kill(child_pid, 0)
+            except ProcessLookupError:
+                break
+            await asyncio.sleep(0.1)
+        else:
+            pytest.fail("orphaned child still running")
+        return sup.restarts
+
+    assert asyncio.run(scenario()) >= 1
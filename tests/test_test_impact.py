@@ -0,0 +1,106 @@
+from tools.test_impact import TestImpact
+
+
+def _write(root, rel_path, text):
+    path = root / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def _project(tmp_path):
+    _write(tmp_path, "pkg/__init__.py", "")
+    _write(tmp_path, "pkg/core.py", "VALUE = 1\n")
+    _write(tmp_path, "pkg/util.py", "from .core import VALUE\n")
+    _write(tmp_path, "tests/test_core.py", "from pkg.core import VALUE\n")
+    _write(tmp_path, "tests/test_util.py", "import pkg.util\n")
+    _write(tmp_path, "tests/test_other.py", "import json\n")
+    _write(tmp_path, "tests/data/expected.json", "{}")
+    return ["tests/test_core.py", "tests/test_other.py", "tests/test_util.py"]
+
+
+def _green(tmp_path):
+    impact = TestImpact(str(tmp_path))
+    impact.scan()
+    impact.mark_green()
+    impact.save()
+    return TestImpact(str(tmp_path))
+
+
+def test_no_green_record_means_full_run(tmp_path):
+    _project(tmp_path)
+    impact = TestImpact(str(tmp_path))
+    impact.scan()
+    assert impact.changed_since_green() is None
+
+
+def test_selects_transitive_dependents(tmp_path):
+    tests = _project(tmp_path)
+    impact = _green(tmp_path)
+
+    _write(tmp_path, "pkg/core.py", "VALUE = 2\n")
+    impact.scan()
+    changed = impact.changed_since_green()
+    assert changed == ["pkg/core.py"]
+    assert impact.select(changed, tests) == ["tests/test_core.py", "tests/test_util.py"]
+
+
+def test_unchanged_tree_selects_nothing(tmp_path):
+    tests = _project(tmp_path)
+    impact = _green(tmp_path)
+    impact.scan()
+    assert impact.select(impact.changed_since_green(), tests) == []
+
+
+def test_data_file_change_forces_full_run(tmp_path):
+    tests = _project(tmp_path)
+    impact = _green(tmp_path)
+
+    # 테스트가 읽는 픽스처는 import로 이어지지 않으므로 전체 실행이어야 한다
+    _write(tmp_path, "tests/data/expected.json", '{"changed": true}')
+    impact.scan()
+    changed = impact.changed_since_green()
+    assert changed == ["tests/data/expected.json"]
+    assert impact.select(changed, tests) is None
+
+
+def test_new_non_python_file_forces_full_run(tmp_path):
+    tests = _project(tmp_path)
+    impact = _green(tmp_path)
+
+    _write(tmp_path, "pkg/schema.sql", "create table t (id int);")
+    impact.scan()
+    changed = impact.changed_since_green()
+    assert changed == ["pkg/schema.sql"]
+    assert impact.select(changed, tests) is None
+
+
+def test_config_change_forces_full_run(tmp_path):
+    tests = _project(tmp_path)
+    impact = _green(tmp_path)
+
+    _write(tmp_path, "tests/conftest.py", "import pytest\n")
+    impact.scan()
+    assert impact.select(impact.changed_since_green(), tests) is None
+
+
+def test_hidden_and_bytecode_files_are_ignored(tmp_path):
+    _project(tmp_path)
+    impact = _green(tmp_path)
+
+    _write(tmp_path, ".coverage", "data")
+    _write(tmp_path, "pkg/__pycache__/core.cpython-311.pyc", "bytecode")
+    _write(tmp_path, "pkg/core.pyc", "bytecode")
+    impact.scan()
+    assert impact.changed_since_green() == []
+
+
+def test_partial_green_keeps_other_changes(tmp_path):
+    tests = _project(tmp_path)
+    impact = _green(tmp_path)
+
+    _write(tmp_path, "pkg/core.py", "VALUE = 2\n")
+    _write(tmp_path, "tests/test_other.py", "import os\n")
+    impact.scan()
+    impact.mark_green(["tests/test_other.py"])
+    assert impact.changed_since_green() == ["pkg/core.py"]
+    assert impact.select(["pkg/core.py"], tests) == ["tests/test_core.py", "tests/test_util.py"]
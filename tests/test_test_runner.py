@@ -0,0 +1,39 @@
+import asyncio
+import shlex
+import sys
+
+from tools import test_runner
+from tools.test_runner import TestResultParser, run_test_async
+
+
+def test_long_output_line_does_not_break_the_run(tmp_path):
+    script = tmp_path / "noisy.py"
+    script.write_text(
+        "import sys\n"
+        "sys.stdout.write('x' * (2 * 1024 * 1024 + 5))\n"
+        "print()\n"
+        "print('PASSED tests/test_a.py::test_ok')\n"
+    )
+    lines = []
+    result = asyncio.run(run_test_async(
+        f"{shlex.quote(sys.executable)} {shlex.quote(str(script))}",
+        working_dir=str(tmp_path), timeout=30,
+        on_line=lambda stream, line: lines.append(line)
+    ))
+
+    assert result["success"], result
+    assert [len(line) for line in lines[:3]] == [test_runner.STREAM_LINE_LIMIT] * 2 + [6]
+    assert lines[-1] == "PASSED tests/test_a.py::test_ok\n"
+
+
+def test_parser_reads_pytest_summary_lines():
+    parser = TestResultParser()
+    records = []
+    for line in [
+        "tests/test_a.py::test_ok PASSED   [ 50%]\n",
+        "FAILED tests/test_a.py::test_bad - AssertionError: boom\n",
+    ]:
+        records.extend(parser.feed_line(line))
+
+    outcomes = {record["test"]: record["outcome"] for record in records}
+    assert outcomes == {"tests/test_a.py::test_ok": "passed", "tests/test_a.py::test_bad": "failed"}
@@ -0,0 +1,81 @@
+from context.summarizer import Summarizer
+from context.token_budget import SUMMARY_PREFIX, TokenBudget, count_tokens
+
+
+class RecordingLLM:
+    def __init__(self, reply="project demo, wrote App.java"):
+        self.reply = reply
+        self.prompts = []
+
+    def __call__(self, prompt):
+        self.prompts.append(prompt)
+        return self.reply
+
+
+def _history(turns, size=200):
+    messages = [{"role": "system", "content": "SYSTEM PROMPT"}]
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"question {i} " + "x" * size})
+        messages.append({"role": "assistant", "content": f"answer {i} " + "y" * size})
+    return messages
+
+
+def test_under_budget_is_unchanged():
+    llm = RecordingLLM()
+    budget = TokenBudget(Summarizer(llm=llm), max_tokens=100000)
+    messages = _history(3)
+    assert budget.compact(messages) is messages
+    assert llm.prompts == []
+
+
+def test_over_budget_folds_old_turns_into_one_summary():
+    llm = RecordingLLM()
+    budget = TokenBudget(Summarizer(llm=llm), max_tokens=600, keep_recent=4)
+    messages = _history(10)
+
+    compacted = budget.compact(messages)
+
+    assert compacted[0] == messages[0]
+    assert compacted[1] == {"role": "system", "content": SUMMARY_PREFIX + llm.reply}
+    assert compacted[-4:] == messages[-4:]
+    assert budget.total(compacted) <= 600
+    # 가장 오래된 턴이 요약 프롬프트에 들어간다
+    assert "question 0" in llm.prompts[0]
+
+
+def test_previous_summary_is_merged_not_stacked():
+    llm = RecordingLLM("first summary")
+    budget = TokenBudget(Summarizer(llm=llm), max_tokens=600, keep_recent=4)
+
+    compacted = budget.compact(_history(10))
+    llm.reply = "second summary"
+    compacted = budget.compact(compacted + _history(10)[1:])
+
+    summaries = [m for m in compacted if m["content"].startswith(SUMMARY_PREFIX)]
+    assert summaries == [{"role": "system", "content": SUMMARY_PREFIX + "second summary"}]
+    # 기존 요약은 새 요약 프롬프트에 들어간다
+    assert "first summary" in llm.prompts[-1]
+
+
+def test_keep_recent_wins_over_budget():
+    budget = TokenBudget(Summarizer(llm=RecordingLLM()), max_tokens=50, keep_recent=4)
+    compacted = budget.compact(_history(5, size=400))
+    assert compacted[-4:] == _history(5, size=400)[-4:]
+
+
+def test_summarizer_failure_falls_back_to_truncated_text():
+    def broken(prompt):
+        raise RuntimeError("LLM down")
+
+    budget = TokenBudget(Summarizer(llm=broken), max_tokens=600, keep_recent=2)
+    compacted = budget.compact(_history(10))
+    summary = compacted[1]["content"]
+    assert summary.startswith(SUMMARY_PREFIX)
+    # 요약 없이 잘린 턴의 뒷부분을 그대로 남긴다 (max_length까지)
+    assert len(summary) <= len(SUMMARY_PREFIX) + Summarizer().max_length
+    assert "answer" in summary
+
+
+def test_count_tokens_is_positive_for_text():
+    assert count_tokens("") == 0
+    assert count_tokens("hello world") > 0
@@ -0,0 +1,35 @@
+from tools.workspace_index import WorkspaceIndex
+
+
+def test_refresh_sees_write_made_just_before(tmp_path):
+    path = tmp_path / "src" / "App.java"
+    path.parent.mkdir()
+    path.write_text("class App {}")
+    index = WorkspaceIndex(str(tmp_path))
+    try:
+        index.refresh()
+        # 감시 스레드가 이벤트를 읽기 전에 refresh해도 변경이 보여야 한다
+        for i in range(20):
+            path.write_text(f"class App {{ int v = {i}; }}")
+            assert index.refresh() == 1
+    finally:
+        index.close()
+
+
+def test_changes_since_iteration(tmp_path):
+    (tmp_path / "a.txt").write_text("a")
+    index = WorkspaceIndex(str(tmp_path))
+    try:
+        index.refresh()
+        index.mark_iteration(1)
+        (tmp_path / "b.txt").write_text("b")
+        (tmp_path / "a.txt").unlink()
+        index.refresh()
+        index.mark_iteration(2)
+
+        changes = index.changes_since(1)
+        assert changes["added"] == ["b.txt"]
+        assert changes["deleted"] == ["a.txt"]
+        assert index.changes_since(2) == {}
+    finally:
+        index.close()
@@ -1,5 +1,8 @@
 import os
 
+from tools.patch_tool import PatchConflict, apply_patch, content_hash
+from tools.workspace_index import get_index
+
 
 def _safe_path(workspace_root: str, file_path: str) -> str:
     """
@@ -59,22 +62,85 @@ def read_file(file_path: str, workspace_root: str):
         }
 
 
-def list_directory(path: str = "", workspace_root: str = ""):
+def list_directory(path: str = "", workspace_root: str = "", recursive: bool = False, details: bool = False):
+    """
+    workspace 인덱스에서 목록을 돌려준다 (디스크는 바뀐 부분만 다시 읽는다).
+    recursive면 하위 전체 (path 기준 상대 경로), details면 크기/mtime/sha256이 담긴 entries도 함께.
+    """
     try:
         full_path = _safe_path(workspace_root, path)
 
         if not os.path.exists(full_path):
             return {"error": "Directory not found", "success": False}
 
-        files = os.listdir(full_path)
+        index = get_index(workspace_root)
+        index.refresh()
+        entries = index.listing(os.path.relpath(full_path, index.root), recursive=recursive)
+
+        if entries is None:
+            # 인덱스에서 제외된 디렉토리 (target/ 등)
+            return {"success": True, "files": os.listdir(full_path)}
+
+        prefix = os.path.relpath(full_path, index.root).replace(os.sep, "/")
+        prefix = "" if prefix == "." else prefix + "/"
+        result = {
+            "success": True,
+            "files": [entry["path"][len(prefix):] for entry in entries]
+        }
+        if details:
+            result["entries"] = entries
+        return result
+
+    except Exception as e:
+        return {
+            "error": str(e),
+            "success": False
+        }
+
+
+def patch_file(
+    file_path: str,
+    workspace_root: str,
+    diff: str | None = None,
+    edits: list | None = None,
+    expected_hash: str | None = None
+):
+    """
+    unified diff 또는 search/replace 편집을 적용한다.
+    내용이 맞지 않으면 파일을 건드리지 않고 conflict를 돌려준다.
+    """
+    try:
+        full_path = _safe_path(workspace_root, file_path)
+
+        if not os.path.exists(full_path):
+            return {"error": "File not found", "success": False}
+
+        with open(full_path, "r", encoding="utf-8") as f:
+            content = f.read()
+
+        try:
+            new_content = apply_patch(content, diff=diff, edits=edits, expected_hash=expected_hash)
+        except PatchConflict as e:
+            return {
+                "error": str(e),
+                "conflict": True,
+                "sha256": content_hash(content),
+                "success": False
+            }
+
+        tmp_path = f"{full_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(new_content)
+        os.replace(tmp_path, full_path)
 
         return {
             "success": True,
-            "files": files
+            "file_path": full_path,
+            "sha256": content_hash(new_content)
         }
 
     except Exception as e:
         return {
             "error": str(e),
             "success": False
-        }
\ No newline at end of file
+        }
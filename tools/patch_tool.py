@@ -0,0 +1,201 @@
+import hashlib
+import re
+from typing import Any
+
+
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class PatchConflict(Exception):
+    pass
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# -----------------------------
+# search / replace
+# -----------------------------
+def apply_search_replace(text: str, edits: list[dict[str, Any]]) -> str:
+    """
+    edits: [{"search": str, "replace": str, "replace_all": bool}]
+    search 문자열이 없거나 (replace_all이 아닌데) 여러 번 나오면 충돌로 본다.
+    """
+    for index, edit in enumerate(edits, 1):
+        search = edit.get("search", "")
+        replace = edit.get("replace", "")
+
+        if not search:
+            raise PatchConflict(f"Edit #{index}: empty search string")
+
+        count = text.count(search)
+        if count == 0:
+            raise PatchConflict(f"Edit #{index}: search text not found")
+        if count > 1 and not edit.get("replace_all"):
+            raise PatchConflict(f"Edit #{index}: search text matches {count} times, make it unique or set replace_all")
+
+        text = text.replace(search, replace) if edit.get("replace_all") else text.replace(search, replace, 1)
+
+    return text
+
+
+# -----------------------------
+# unified diff
+# -----------------------------
+def _parse_hunks(diff: str) -> list[dict[str, Any]]:
+    """
+    헤더의 줄 수(-a,b +c,d)만큼만 헝크 본문으로 읽는다.
+    다 읽은 뒤의 줄은 다음 헤더까지 무시하고, 줄 수를 채우기 전에 끝나면 충돌로 본다.
+    """
+    hunks = []
+    current = None
+    old_left = new_left = 0
+
+    lines = diff.replace("\r\n", "\n").split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+
+    def close():
+        if current is not None and (old_left or new_left):
+            raise PatchConflict(
+                f"Hunk #{len(hunks)} (line {current['old_start']}) is truncated: "
+                f"{old_left} old / {new_left} new lines missing"
+            )
+
+    for line in lines:
+        match = HUNK_HEADER.match(line)
+        if match:
+            close()
+            old_start = int(match.group(1))
+            old_left = int(match.group(2)) if match.group(2) is not None else 1
+            new_left = int(match.group(4)) if match.group(4) is not None else 1
+            # 삭제 범위가 0줄이면 old_start는 "그 줄 다음"에 삽입한다는 뜻
+            current = {
+                "old_start": old_start,
+                "base": old_start if old_left == 0 else old_start - 1,
+                "lines": [],
+                "old_eof": False,
+                "new_eof": False
+            }
+            hunks.append(current)
+        elif current is None:
+            # 첫 헝크 이전의 파일 헤더 (---/+++, diff --git 등)
+            continue
+        elif line.startswith("\\"):
+            # "\ No newline at end of file": 바로 앞 줄이 속한 쪽의 파일 끝에 줄바꿈이 없다
+            if current["lines"]:
+                tag = current["lines"][-1][0]
+                current["old_eof"] |= tag in (" ", "-")
+                current["new_eof"] |= tag in (" ", "+")
+        elif not old_left and not new_left:
+            # 헤더의 줄 수를 다 채운 뒤의 줄 (다음 파일 헤더, 설명 등)
+            continue
+        else:
+            # 일부 도구는 빈 context 줄의 공백을 지운다
+            tag, body = (line[0], line[1:]) if line else (" ", "")
+            if tag not in (" ", "-", "+"):
+                raise PatchConflict(f"Hunk #{len(hunks)}: unexpected line {line[:40]!r}")
+            if tag in (" ", "-"):
+                old_left -= 1
+            if tag in (" ", "+"):
+                new_left -= 1
+            if old_left < 0 or new_left < 0:
+                raise PatchConflict(f"Hunk #{len(hunks)} (line {current['old_start']}) has more lines than its header")
+            current["lines"].append((tag, body))
+
+    close()
+    if not hunks:
+        raise PatchConflict("No hunks found in diff")
+
+    return hunks
+
+
+def _locate(lines: list[str], block: list[str], expected: int, min_pos: int) -> int | None:
+    """block이 lines에 나타나는 위치 중 expected에 가장 가까운 곳 (min_pos 이후)"""
+    size = len(block)
+    last = len(lines) - size
+
+    def matches(start: int) -> bool:
+        return lines[start:start + size] == block
+
+    expected = max(min_pos, min(expected, last))
+    if expected >= min_pos and matches(expected):
+        return expected
+
+    for distance in range(1, len(lines) + 1):
+        for start in (expected - distance, expected + distance):
+            if min_pos <= start <= last and matches(start):
+                return start
+        if expected - distance < min_pos and expected + distance > last:
+            break
+
+    return None
+
+
+def apply_unified_diff(text: str, diff: str) -> str:
+    """
+    unified diff를 적용한다. 헝크 위치가 밀려 있으면 가장 가까운 일치 위치를 찾고,
+    context/삭제 줄이 현재 내용과 맞지 않으면 충돌로 본다.
+    CRLF 파일은 LF로 맞춰서 비교하고 결과를 다시 CRLF로 돌려준다.
+    """
+    crlf = "\r\n" in text
+    if crlf:
+        text = text.replace("\r\n", "\n")
+
+    trailing_newline = text.endswith("\n")
+    lines = text.split("\n")
+    if trailing_newline:
+        lines.pop()
+
+    result: list[str] = []
+    pos = 0
+    drift = 0
+
+    for index, hunk in enumerate(_parse_hunks(diff), 1):
+        old_block = [line for tag, line in hunk["lines"] if tag in (" ", "-")]
+        new_block = [line for tag, line in hunk["lines"] if tag in (" ", "+")]
+
+        expected = hunk["base"] + drift
+        start = _locate(lines, old_block, expected, pos)
+        if start is None:
+            raise PatchConflict(f"Hunk #{index} (line {hunk['old_start']}) does not match current content")
+
+        drift = start - hunk["base"]
+        result.extend(lines[pos:start])
+        result.extend(new_block)
+        pos = start + len(old_block)
+
+        # 파일 끝을 건드린 헝크는 끝 줄바꿈 여부도 바꾼다
+        if hunk["new_eof"]:
+            trailing_newline = False
+        elif hunk["old_eof"]:
+            trailing_newline = True
+
+    result.extend(lines[pos:])
+
+    new_text = "\n".join(result)
+    if trailing_newline and result:
+        new_text += "\n"
+    return new_text.replace("\n", "\r\n") if crlf else new_text
+
+
+def apply_patch(
+    text: str,
+    diff: str | None = None,
+    edits: list[dict[str, Any]] | None = None,
+    expected_hash: str | None = None
+) -> str:
+    """
+    diff 또는 edits 중 하나를 적용한다.
+    expected_hash(수정 전 내용의 sha256)가 주어지면 그 사이 파일이 바뀌었는지 먼저 확인한다.
+    """
+    if expected_hash and content_hash(text) != expected_hash:
+        raise PatchConflict("File changed since it was read (hash mismatch)")
+
+    if diff:
+        return apply_unified_diff(text, diff)
+    if edits:
+        return apply_search_replace(text, edits)
+
+    raise PatchConflict("Either diff or edits is required")
@@ -1,21 +1,38 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Callable
+import asyncio
+import functools
+import inspect
 import os
 
 
 class ToolRegistry:
-    def __init__(self):
+    """
+    이름 → 툴 함수. 툴은 일반 함수 또는 코루틴 함수.
+    - execute: 동기 호출 (기존 방식)
+    - execute_async: 코루틴 툴은 그대로 await, 동기 툴은 제한된 스레드 풀에서 실행
+    - execute_many: 여러 툴 호출을 동시에 실행하고 요청 순서대로 결과를 돌려준다
+    """
+
+    def __init__(self, max_workers: int = 8):
         self.tools: dict[str, Callable] = {}
+        self.max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
 
         # ✅ 안정화: 작업 루트 강제 지정
         self.workspace_root = os.path.abspath("workspace")
         os.makedirs(self.workspace_root, exist_ok=True)
 
+        # 파일 트리 인덱스 (list_directory와 같은 인스턴스를 공유)
+        from tools.workspace_index import get_index
+        self.workspace_index = get_index(self.workspace_root)
+
         self._register_default_tools()
 
     def _register_default_tools(self):
-        from agent.tools.web_search import web_search
-        from agent.tools.file_tool import read_file, write_file, list_directory
-        from agent.tools.test_runner import run_test, run_tests
+        from tools.web_search import web_search
+        from tools.file_tool import read_file, write_file, list_directory, patch_file
+        from tools.test_runner import run_test_async, run_tests_async, run_tests_sharded, run_affected_tests
 
         # 🔥 파일 툴에 workspace 강제 바인딩
         def read_file_safe(**kwargs):
@@ -26,6 +43,10 @@ class ToolRegistry:
             kwargs["workspace_root"] = self.workspace_root
             return write_file(**kwargs)
 
+        def patch_file_safe(**kwargs):
+            kwargs["workspace_root"] = self.workspace_root
+            return patch_file(**kwargs)
+
         def list_directory_safe(**kwargs):
             kwargs["workspace_root"] = self.workspace_root
             return list_directory(**kwargs)
@@ -33,9 +54,12 @@ class ToolRegistry:
         self.register("web_search", web_search)
         self.register("read_file", read_file_safe)
         self.register("write_file", write_file_safe)
+        self.register("patch_file", patch_file_safe)
         self.register("list_directory", list_directory_safe)
-        self.register("run_test", run_test)
-        self.register("run_tests", run_tests)
+        self.register("run_test", run_test_async)
+        self.register("run_tests", run_tests_async)
+        self.register("run_tests_sharded", run_tests_sharded)
+        self.register("run_affected_tests", run_affected_tests)
 
     def register(self, name: str, tool: Callable):
         self.tools[name] = tool
@@ -46,12 +70,99 @@ class ToolRegistry:
 
         try:
             tool = self.tools[name]
+            if inspect.iscoroutinefunction(tool):
+                # 이벤트 루프 안에서는 execute_async를 써야 한다
+                return asyncio.run(tool(**kwargs))
             return tool(**kwargs)
         except Exception as e:
             return {"error": str(e)}
 
+    # -----------------------------
+    # 비동기 실행
+    # -----------------------------
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tool")
+        return self._executor
+
+    async def execute_async(self, name: str, timeout: float | None = None, **kwargs) -> Any:
+        """
+        timeout초 안에 끝나지 않으면 {"error": ...}를 돌려준다.
+        코루틴 툴은 취소되고, 스레드에서 도는 동기 툴은 결과만 버린다 (스레드는 강제로 멈출 수 없다).
+        """
+        if name not in self.tools:
+            return {"error": f"Tool '{name}' not found"}
+
+        tool = self.tools[name]
+
+        if inspect.iscoroutinefunction(tool):
+            call = tool(**kwargs)
+        else:
+            loop = asyncio.get_running_loop()
+            call = loop.run_in_executor(self._pool(), functools.partial(tool, **kwargs))
+
+        try:
+            return await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            return {"error": f"Tool '{name}' timed out after {timeout}s"}
+        except Exception as e:
+            return {"error": str(e)}
+
+    async def execute_many(
+        self,
+        calls: list[dict[str, Any]],
+        timeout: float | None = None,
+        fail_fast: bool = False
+    ) -> list[Any]:
+        """
+        calls: [{"name": str, "args": dict, "timeout": float (선택, 없으면 timeout)}]
+        결과는 calls 순서대로. fail_fast면 첫 에러에서 나머지를 취소하고
+        취소된 호출은 {"error": "cancelled", "cancelled": True}로 채운다.
+        execute_many 자체가 취소되면 진행 중인 호출도 모두 취소된다.
+        """
+        tasks = [
+            asyncio.create_task(
+                self.execute_async(call["name"], timeout=call.get("timeout", timeout), **call.get("args", {}))
+            )
+            for call in calls
+        ]
+
+        try:
+            if fail_fast:
+                pending = set(tasks)
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    if any(_is_error(task.result()) for task in done):
+                        for task in pending:
+                            task.cancel()
+                        await asyncio.gather(*pending, return_exceptions=True)
+                        break
+            else:
+                await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        return [
+            {"error": "cancelled", "cancelled": True} if task.cancelled() else task.result()
+            for task in tasks
+        ]
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
     def list_tools(self) -> list[str]:
         return list(self.tools.keys())
 
     def get_tool(self, name: str) -> Callable | None:
-        return self.tools.get(name)
\ No newline at end of file
+        return self.tools.get(name)
+
+
+def _is_error(result: Any) -> bool:
+    return isinstance(result, dict) and (
+        "error" in result or result.get("success") is False or result.get("status") == "error"
+    )
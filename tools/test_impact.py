@@ -0,0 +1,207 @@
+import ast
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+
+IMPACT_FILE = ".openviper-test-impact.json"
+
+# 바뀌면 어떤 테스트가 영향을 받는지 알 수 없으므로 전체 실행
+FULL_RUN_TRIGGERS = {"conftest.py", "pytest.ini", "pyproject.toml", "setup.cfg", "setup.py", "tox.ini", "requirements.txt"}
+SKIP_DIRS = {".git", "__pycache__", ".venv", "venv", "node_modules", ".tox", ".pytest_cache", "build", "dist"}
+# 실행할 때마다 생기는 파일은 소스 변경이 아니다
+SKIP_SUFFIXES = (".pyc", ".pyo")
+
+
+def _module_name(rel_path: str) -> str:
+    parts = rel_path[:-3].split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+def _imported_names(source: str, module: str, is_package: bool) -> set[str]:
+    """import 문에서 가능한 모듈 이름 후보를 모두 뽑는다 (프로젝트 밖 모듈은 나중에 걸러진다)"""
+    names: set[str] = set()
+    package = module if is_package else module.rpartition(".")[0]
+
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                names.add(alias.name)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                parent = package.split(".") if package else []
+                parent = parent[:len(parent) - (node.level - 1)] if node.level > 1 else parent
+                base = ".".join(filter(None, [".".join(parent), base]))
+            names.add(base)
+            # from pkg import module 형태
+            for alias in node.names:
+                names.add(f"{base}.{alias.name}" if base else alias.name)
+
+    # import a.b.c는 a, a.b도 실행한다
+    expanded = set()
+    for name in names:
+        parts = name.split(".")
+        expanded.update(".".join(parts[:i]) for i in range(1, len(parts) + 1))
+    return expanded
+
+
+class TestImpact:
+    """
+    프로젝트의 import 그래프로 바뀐 파일에 영향받는 테스트 파일을 고른다.
+    - 그래프(파일 → import한 프로젝트 모듈)는 <root>/.openviper-test-impact.json에 캐시,
+      mtime/크기가 바뀐 파일만 다시 파싱한다
+    - 마지막으로 전체 통과(green)한 시점의 파일 해시를 같이 저장해 두고
+      그 이후 바뀐 파일을 기준으로 고른다
+    """
+
+    # tests/에서 import하면 pytest가 테스트 클래스로 오인해 수집하려 한다
+    __test__ = False
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.path = self.root / IMPACT_FILE
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        self.files: dict[str, dict[str, Any]] = state.get("files", {})
+        self.green: dict[str, str] | None = state.get("green")
+
+    # -----------------------------
+    # 스캔
+    # -----------------------------
+    def _walk(self) -> list[str]:
+        """
+        숨김 파일을 뺀 모든 파일. 테스트가 읽는 데이터/픽스처 파일(.json, .txt 등)이 바뀌어도
+        알아차려야 하므로 .py만 보지 않는다 (비 파이썬 파일 변경은 select에서 전체 실행이 된다)
+        """
+        found = []
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+            for name in filenames:
+                if name.startswith(".") or name.endswith(SKIP_SUFFIXES):
+                    continue
+                found.append((Path(dirpath) / name).relative_to(self.root).as_posix())
+        return found
+
+    def scan(self):
+        """바뀐 파일만 해시/import를 다시 계산한다"""
+        current = {}
+        for rel_path in self._walk():
+            stat = (self.root / rel_path).stat()
+            cached = self.files.get(rel_path)
+            if cached and cached["mtime"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+                current[rel_path] = cached
+                continue
+
+            data = (self.root / rel_path).read_bytes()
+            entry = {"mtime": stat.st_mtime_ns, "size": stat.st_size, "sha1": hashlib.sha1(data).hexdigest()}
+            if rel_path.endswith(".py"):
+                module = _module_name(rel_path)
+                try:
+                    entry["imports"] = sorted(_imported_names(
+                        data.decode("utf-8", errors="replace"), module, rel_path.endswith("__init__.py")
+                    ))
+                except SyntaxError:
+                    entry["imports"] = None
+            current[rel_path] = entry
+
+        self.files = current
+
+    def changed_since_green(self) -> list[str] | None:
+        """마지막 green 이후 추가/수정/삭제된 파일. green 기록이 없으면 None"""
+        if self.green is None:
+            return None
+        current = {path: entry["sha1"] for path, entry in self.files.items()}
+        return sorted(
+            path for path in set(current) | set(self.green)
+            if current.get(path) != self.green.get(path)
+        )
+
+    # -----------------------------
+    # 선택
+    # -----------------------------
+    def _module_index(self, extra: list[str]) -> dict[str, set[str]]:
+        """
+        모듈 이름 → 파일 후보 (extra: 삭제된 파일도 이름은 남겨서 그걸 import하던 테스트를 찾는다).
+        src/ 레이아웃 등을 위해 앞쪽 디렉토리를 떼어낸 이름도 등록하되, 전체 이름이 우선한다.
+        떼어낸 이름이 여러 파일에 해당하면 모두 남긴다 (어느 쪽인지 모르므로 모두 의존으로 본다).
+        """
+        paths = [path for path in list(self.files) + extra if path.endswith(".py")]
+        index: dict[str, set[str]] = {}
+        for path in paths:
+            index.setdefault(_module_name(path), set()).add(path)
+        full_names = set(index)
+
+        for path in paths:
+            parts = _module_name(path).split(".")
+            for i in range(1, len(parts)):
+                name = ".".join(parts[i:])
+                if name not in full_names:
+                    index.setdefault(name, set()).add(path)
+        return index
+
+    def select(self, changed: list[str], test_files: list[str]) -> list[str] | None:
+        """
+        changed 파일에 (import를 따라 전이적으로) 의존하는 테스트 파일.
+        판단할 수 없으면(설정/비 파이썬 파일 변경, 파싱 실패) None → 전체 실행
+        """
+        # 설정/데이터 파일은 어떤 테스트가 쓰는지 import로 알 수 없다
+        if any(not path.endswith(".py") or Path(path).name in FULL_RUN_TRIGGERS for path in changed):
+            return None
+
+        index = self._module_index(changed)
+        dependents: dict[str, set[str]] = {}
+        for rel_path, entry in self.files.items():
+            imports = entry.get("imports")
+            if imports is None and rel_path.endswith(".py"):
+                if rel_path in changed:
+                    return None
+                continue
+            for name in imports or ():
+                for target in index.get(name, ()):
+                    if target != rel_path:
+                        dependents.setdefault(target, set()).add(rel_path)
+
+        affected = set(changed)
+        frontier = list(changed)
+        while frontier:
+            for dependent in dependents.get(frontier.pop(), ()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    frontier.append(dependent)
+
+        return [test_file for test_file in test_files if test_file in affected]
+
+    # -----------------------------
+    # 저장
+    # -----------------------------
+    def mark_green(self, paths: list[str] | None = None):
+        """
+        현재 상태를 green 기준으로 기록한다.
+        paths를 주면 그 파일들만 갱신한다 (나머지 파일은 이전 기준과 계속 비교된다)
+        """
+        current = {path: entry["sha1"] for path, entry in self.files.items()}
+        if paths is None:
+            self.green = current
+            return
+
+        green = dict(self.green or {})
+        for path in paths:
+            if path in current:
+                green[path] = current[path]
+            else:
+                green.pop(path, None)
+        self.green = green
+
+    def save(self):
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": self.files, "green": self.green}, f)
+        os.replace(tmp_path, self.path)
@@ -1,31 +1,519 @@
 import subprocess
 import os
-from typing import Any
+import re
+import signal
+import sys
+import asyncio
+import heapq
+import importlib.util
+import json
+import shlex
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
 
+from tools.test_impact import TestImpact
 
-def run_test(command: str = "pytest", working_dir: str = ".") -> dict[str, Any]:
+
+# 출력은 고정 크기로 읽는다
+STREAM_CHUNK_SIZE = 64 * 1024
+# 줄바꿈 없이 이보다 길어진 출력은 잘라서 한 줄로 다룬다
+STREAM_LINE_LIMIT = 1024 * 1024
+# 타임아웃/취소 시 SIGTERM 후 SIGKILL까지 기다리는 시간
+KILL_GRACE = 5.0
+# pytest-cov 확인(_has_pytest_cov)과 같은 인터프리터로 pytest/coverage를 실행한다
+PYTHON = shlex.quote(sys.executable)
+
+
+# -----------------------------
+# 결과 파싱 (pytest / JUnit)
+# -----------------------------
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+# pytest -v: "tests/test_a.py::test_x PASSED   [ 50%]"
+PYTEST_VERBOSE = re.compile(r"^(\S+::\S+)\s+(PASSED|FAILED|ERROR|SKIPPED|XFAIL|XPASS)\b")
+# pytest -rA 요약: "FAILED tests/test_a.py::test_x - AssertionError"
+#                  "ERROR tests/test_a.py" (수집 단계 에러는 파일 단위)
+PYTEST_SUMMARY = re.compile(r"^(PASSED|FAILED|ERROR|SKIPPED|XFAIL|XPASS) (\S+\.py(?:::\S+)?)(?: - (.*))?$")
+# pytest --durations: "0.52s call     tests/test_a.py::test_x"
+PYTEST_DURATION = re.compile(r"^([\d.]+)s (?:call|setup|teardown)\s+(\S+::\S+)")
+# Maven surefire (JUnit 4/5): "[ERROR] testFoo(com.x.FooTest)  Time elapsed: 0.01 s  <<< FAILURE!"
+#                             "[ERROR] com.x.FooTest.testFoo  Time elapsed: 0.01 s  <<< ERROR!"
+JUNIT_FAILURE = re.compile(
+    r"^\[ERROR\]\s+(?:(\w+)\(([\w.$]+)\)|([\w.$]+)\.(\w+))\s+Time elapsed: ([\d.]+) s\s+<<< (FAILURE|ERROR)!"
+)
+# "Tests run: 3, Failures: 1, Errors: 0, Skipped: 0, Time elapsed: 0.05 s <<< FAILURE! - in com.x.FooTest"
+JUNIT_CLASS = re.compile(
+    r"Tests run: (\d+), Failures: (\d+), Errors: (\d+), Skipped: (\d+)(?:, Time elapsed: ([\d.]+) s)?.*? (?:- )?in ([\w.$]+)"
+)
+
+OUTCOMES = {
+    "PASSED": "passed", "XPASS": "passed",
+    "FAILED": "failed", "ERROR": "error",
+    "SKIPPED": "skipped", "XFAIL": "skipped",
+    "FAILURE": "failed",
+}
+
+
+class TestResultParser:
+    """
+    출력 줄을 받는 대로 테스트별 결과 레코드로 바꾼다.
+    레코드: {"test": id, "outcome": passed|failed|error|skipped, "message"?, "duration"?}
+    - pytest: -v 진행 줄, -rA 요약 줄 (같은 테스트는 한 번만 기록, 요약의 메시지는 덧붙인다)
+    - JUnit(Maven surefire): 실패 테스트는 개별 레코드, 클래스 요약 줄은 classes에 집계
+    """
+
+    # 이름이 Test로 시작해도 pytest가 테스트 클래스로 수집하지 않게
+    __test__ = False
+
+    def __init__(self):
+        self.records: dict[str, dict[str, Any]] = {}
+        self.classes: dict[str, dict[str, Any]] = {}
+
+    def feed_line(self, line: str) -> list[dict[str, Any]]:
+        """새로 확정된(또는 갱신된) 레코드 목록을 돌려준다"""
+        line = ANSI_ESCAPE.sub("", line).strip()
+        if not line:
+            return []
+
+        match = PYTEST_VERBOSE.match(line)
+        if match:
+            return self._record(match.group(1), OUTCOMES[match.group(2)])
+
+        match = PYTEST_SUMMARY.match(line)
+        if match:
+            return self._record(match.group(2), OUTCOMES[match.group(1)], message=match.group(3))
+
+        match = PYTEST_DURATION.match(line)
+        if match and match.group(2) in self.records:
+            record = self.records[match.group(2)]
+            record["duration"] = record.get("duration", 0.0) + float(match.group(1))
+            return []
+
+        match = JUNIT_FAILURE.match(line)
+        if match:
+            method, cls = (match.group(1), match.group(2)) if match.group(1) else (match.group(4), match.group(3))
+            return self._record(f"{cls}#{method}", OUTCOMES[match.group(6)], duration=float(match.group(5)))
+
+        match = JUNIT_CLASS.search(line)
+        if match:
+            run, failures, errors, skipped = (int(match.group(i)) for i in range(1, 5))
+            self.classes[match.group(6)] = {
+                "tests": run,
+                "failures": failures,
+                "errors": errors,
+                "skipped": skipped,
+                "duration": float(match.group(5)) if match.group(5) else None
+            }
+
+        return []
+
+    def _record(self, test: str, outcome: str, **extra) -> list[dict[str, Any]]:
+        record = self.records.setdefault(test, {"test": test})
+        record["outcome"] = outcome
+        record.update({key: value for key, value in extra.items() if value is not None})
+        return [record]
+
+    def summary(self) -> dict[str, int]:
+        counts = {"passed": 0, "failed": 0, "error": 0, "skipped": 0}
+        for record in self.records.values():
+            counts[record["outcome"]] += 1
+
+        # JUnit은 통과한 테스트를 개별로 찍지 않으므로 클래스 요약으로 채운다
+        if self.classes:
+            totals = {
+                key: sum(c[key] for c in self.classes.values())
+                for key in ("tests", "failures", "errors", "skipped")
+            }
+            counts["failed"] = max(counts["failed"], totals["failures"])
+            counts["error"] = max(counts["error"], totals["errors"])
+            counts["skipped"] = max(counts["skipped"], totals["skipped"])
+            counts["passed"] = max(
+                counts["passed"],
+                totals["tests"] - totals["failures"] - totals["errors"] - totals["skipped"]
+            )
+
+        counts["total"] = sum(counts.values())
+        return counts
+
+
+# -----------------------------
+# 비동기 실행 (프로세스 그룹 단위 정리)
+# -----------------------------
+def _spawn_kwargs() -> dict[str, Any]:
+    # 테스트가 띄운 자식 프로세스까지 한 번에 죽일 수 있도록 새 프로세스 그룹으로 시작
+    if sys.platform.startswith("win"):
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def _signal_group(process: asyncio.subprocess.Process, sig: int):
+    try:
+        os.killpg(process.pid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def _kill_tree(process: asyncio.subprocess.Process, grace: float = KILL_GRACE):
+    """SIGTERM → grace초 대기 → SIGKILL (Windows는 taskkill /T)"""
+    if sys.platform.startswith("win"):
+        if process.returncode is None:
+            killer = await asyncio.create_subprocess_exec(
+                "taskkill", "/F", "/T", "/PID", str(process.pid),
+                stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+            )
+            await killer.wait()
+        await process.wait()
+        return
+
+    if process.returncode is None:
+        _signal_group(process, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(process.wait(), grace)
+        except asyncio.TimeoutError:
+            pass
+    # 셸이 먼저 끝나도 그룹에 남은 테스트 프로세스는 정리한다
+    _signal_group(process, signal.SIGKILL)
+    await process.wait()
+
+
+async def _read_lines(stream: asyncio.StreamReader):
+    """readline()은 limit를 넘는 줄에서 ValueError를 내므로 고정 크기로 읽어 직접 줄을 나눈다"""
+    pending = b""
+    while True:
+        chunk = await stream.read(STREAM_CHUNK_SIZE)
+        if not chunk:
+            if pending:
+                yield pending
+            return
+
+        pending += chunk
+        start = 0
+        while (end := pending.find(b"\n", start)) >= 0:
+            yield pending[start:end + 1]
+            start = end + 1
+        pending = pending[start:]
+
+        while len(pending) >= STREAM_LINE_LIMIT:
+            yield pending[:STREAM_LINE_LIMIT]
+            pending = pending[STREAM_LINE_LIMIT:]
+
+
+async def _pump_lines(
+    stream: asyncio.StreamReader,
+    name: str,
+    lines: list[str],
+    parser: TestResultParser,
+    on_line: Optional[Callable[[str, str], None]],
+    on_result: Optional[Callable[[dict[str, Any]], None]]
+):
+    async for line in _read_lines(stream):
+        text = line.decode("utf-8", errors="replace")
+        lines.append(text)
+        if on_line:
+            on_line(name, text)
+        for record in parser.feed_line(text):
+            if on_result:
+                on_result(dict(record))
+
+
+async def run_test_async(
+    command: str = "pytest",
+    working_dir: str = ".",
+    timeout: float = 300,
+    on_line: Optional[Callable[[str, str], None]] = None,
+    on_result: Optional[Callable[[dict[str, Any]], None]] = None,
+    env: Optional[dict[str, str]] = None
+) -> dict[str, Any]:
     """
-    테스트를 실행합니다.
+    테스트를 비동기로 실행합니다.
+    출력은 on_line(stream, line)으로, 테스트별 결과는 확정되는 즉시 on_result(record)로 전달합니다.
+    타임아웃이나 취소 시 프로세스 그룹 전체를 종료합니다.
     """
+    started = time.monotonic()
     try:
-        result = subprocess.run(
+        process = await asyncio.create_subprocess_shell(
             command,
-            shell=True,
             cwd=working_dir,
-            capture_output=True,
-            text=True,
-            timeout=300
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LINE_LIMIT,
+            env={**os.environ, **env} if env else None,
+            **_spawn_kwargs()
         )
-        
+    except Exception as e:
+        return {"command": command, "error": str(e), "success": False}
+
+    parser = TestResultParser()
+    stdout_lines: list[str] = []
+    stderr_lines: list[str] = []
+
+    def result(**extra) -> dict[str, Any]:
         return {
             "command": command,
-            "returncode": result.returncode,
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-            "success": result.returncode == 0
+            "returncode": process.returncode,
+            "stdout": "".join(stdout_lines),
+            "stderr": "".join(stderr_lines),
+            "results": list(parser.records.values()),
+            "summary": parser.summary(),
+            "duration": time.monotonic() - started,
+            **extra
+        }
+
+    pumps = asyncio.gather(
+        _pump_lines(process.stdout, "stdout", stdout_lines, parser, on_line, on_result),
+        _pump_lines(process.stderr, "stderr", stderr_lines, parser, on_line, on_result)
+    )
+
+    try:
+        await asyncio.wait_for(process.wait(), timeout)
+    except asyncio.TimeoutError:
+        await _kill_tree(process)
+        await pumps
+        return result(error="Test timeout", success=False)
+    except asyncio.CancelledError:
+        await asyncio.shield(_kill_tree(process))
+        pumps.cancel()
+        raise
+
+    # 남은 자식 프로세스가 파이프를 잡고 있으면 EOF가 오지 않으므로 그룹을 먼저 정리한다
+    await _kill_tree(process)
+    await pumps
+    return result(success=process.returncode == 0)
+
+
+async def run_tests_async(test_path: str = "tests/", verbose: bool = True, **kwargs) -> dict[str, Any]:
+    """
+    테스트 디렉토리의 모든 테스트를 비동기로 실행합니다.
+    """
+    verbose_flag = "-v -rA" if verbose else "-rA"
+    return await run_test_async(f"pytest {test_path} {verbose_flag}", **kwargs)
+
+
+# -----------------------------
+# 샤딩 (파일 단위 병렬 실행)
+# -----------------------------
+DURATIONS_FILE = ".openviper-test-durations.json"
+# 새 측정값 반영 비율 (지수 이동 평균)
+DURATION_WEIGHT = 0.5
+
+
+def discover_test_files(test_path: str, working_dir: str = ".") -> list[str]:
+    """test_*.py / *_test.py (working_dir 기준 상대 경로, 정렬)"""
+    root = Path(working_dir)
+    target = root / test_path
+
+    if target.is_file():
+        return [test_path]
+
+    files = {p for pattern in ("test_*.py", "*_test.py") for p in target.rglob(pattern)}
+    return sorted(p.relative_to(root).as_posix() for p in files)
+
+
+class TestDurations:
+    """
+    테스트 파일별 실행 시간 기록 (working_dir/.openviper-test-durations.json).
+    샤드 분배에 쓰고, 실행이 끝날 때마다 이동 평균으로 갱신한다.
+    """
+
+    __test__ = False
+
+    def __init__(self, path: Path):
+        self.path = path
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.durations: dict[str, float] = json.load(f)
+        except (OSError, ValueError):
+            self.durations = {}
+
+    def estimate(self, test_file: str) -> float:
+        if test_file in self.durations:
+            return self.durations[test_file]
+        # 처음 보는 파일은 기존 파일들의 중앙값으로 본다
+        known = sorted(self.durations.values())
+        return known[len(known) // 2] if known else 1.0
+
+    def update(self, measured: dict[str, float]):
+        for test_file, seconds in measured.items():
+            previous = self.durations.get(test_file)
+            self.durations[test_file] = seconds if previous is None else (
+                DURATION_WEIGHT * seconds + (1 - DURATION_WEIGHT) * previous
+            )
+
+    def save(self):
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.durations, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def plan_shards(test_files: list[str], shard_count: int, durations: TestDurations) -> list[list[str]]:
+    """오래 걸리는 파일부터 현재 가장 가벼운 샤드에 넣는다 (LPT)"""
+    shard_count = max(1, min(shard_count, len(test_files)))
+    heap = [(0.0, index) for index in range(shard_count)]
+    shards: list[list[str]] = [[] for _ in range(shard_count)]
+
+    for test_file in sorted(test_files, key=durations.estimate, reverse=True):
+        load, index = heapq.heappop(heap)
+        shards[index].append(test_file)
+        heapq.heappush(heap, (load + durations.estimate(test_file), index))
+
+    return [shard for shard in shards if shard]
+
+
+def _file_durations(results: list[dict[str, Any]]) -> dict[str, float]:
+    measured: dict[str, float] = {}
+    for record in results:
+        test_file = record["test"].split("::", 1)[0]
+        measured[test_file] = measured.get(test_file, 0.0) + record.get("duration", 0.0)
+    return measured
+
+
+async def run_tests_sharded(
+    test_path: str = "tests/",
+    shards: Optional[int] = None,
+    working_dir: str = ".",
+    timeout: float = 300,
+    coverage: bool = False,
+    test_files: Optional[list[str]] = None,
+    on_line: Optional[Callable[[str, str], None]] = None,
+    on_result: Optional[Callable[[dict[str, Any]], None]] = None
+) -> dict[str, Any]:
+    """
+    테스트 파일을 shards개(기본: CPU 수)의 pytest 프로세스로 나눠 동시에 실행하고 결과를 합칩니다.
+    coverage=True면 샤드별 .coverage 파일을 합쳐 하나의 리포트로 만듭니다.
+    """
+    test_files = test_files if test_files is not None else discover_test_files(test_path, working_dir)
+    if not test_files:
+        return {"command": f"pytest {test_path}", "error": "No test files found", "success": False}
+
+    durations = TestDurations(Path(working_dir) / DURATIONS_FILE)
+    plan = plan_shards(test_files, shards or os.cpu_count() or 1, durations)
+    with_coverage = coverage and _has_pytest_cov()
+
+    async def run_shard(index: int, files: list[str]) -> dict[str, Any]:
+        # --durations-min=0: 기본값(0.005s)보다 빠른 테스트도 기록해야 샤드 균형이 맞는다
+        command = f"{PYTHON} -m pytest {' '.join(shlex.quote(f) for f in files)} -v -rA --durations=0 --durations-min=0 -p no:cacheprovider"
+        env = None
+        if with_coverage:
+            command += " --cov --cov-report="
+            env = {"COVERAGE_FILE": f".coverage.shard{index}"}
+        return await run_test_async(command, working_dir, timeout, on_line, on_result, env)
+
+    shard_results = await asyncio.gather(*(run_shard(i, files) for i, files in enumerate(plan)))
+
+    results = [record for shard in shard_results for record in shard.get("results", [])]
+    durations.update(_file_durations(results))
+    durations.save()
+
+    summary = {"passed": 0, "failed": 0, "error": 0, "skipped": 0, "total": 0}
+    for shard in shard_results:
+        for key, count in shard.get("summary", {}).items():
+            summary[key] += count
+
+    merged = {
+        "command": f"pytest {test_path} (sharded x{len(plan)})",
+        "returncode": max((shard.get("returncode") or 0) for shard in shard_results),
+        "stdout": "".join(
+            f"===== shard {index}: {' '.join(files)} =====\n{shard.get('stdout', '')}"
+            for index, (files, shard) in enumerate(zip(plan, shard_results))
+        ),
+        "stderr": "".join(shard.get("stderr", "") for shard in shard_results),
+        "results": results,
+        "summary": summary,
+        "shards": [
+            {"files": files, "success": shard["success"], "duration": shard.get("duration"), "error": shard.get("error")}
+            for files, shard in zip(plan, shard_results)
+        ],
+        "duration": max(shard.get("duration", 0.0) for shard in shard_results),
+        "success": all(shard["success"] for shard in shard_results)
+    }
+
+    if with_coverage:
+        merged["coverage"] = await _combine_coverage(working_dir, len(plan), timeout)
+    elif coverage:
+        merged["coverage"] = {"success": False, "error": "pytest-cov is not installed"}
+
+    return merged
+
+
+def _has_pytest_cov() -> bool:
+    return importlib.util.find_spec("pytest_cov") is not None
+
+
+async def _combine_coverage(working_dir: str, shard_count: int, timeout: float) -> dict[str, Any]:
+    data_files = " ".join(f".coverage.shard{index}" for index in range(shard_count))
+    combined = await run_test_async(f"{PYTHON} -m coverage combine {data_files}", working_dir, timeout)
+    if not combined["success"]:
+        return {"success": False, "error": combined.get("error") or combined["stderr"]}
+
+    report = await run_test_async(f"{PYTHON} -m coverage report", working_dir, timeout)
+    return {"success": report["success"], "report": report["stdout"]}
+
+
+# -----------------------------
+# 영향받는 테스트만 실행
+# -----------------------------
+async def run_affected_tests(
+    test_path: str = "tests/",
+    working_dir: str = ".",
+    changed_files: Optional[list[str]] = None,
+    shards: Optional[int] = None,
+    timeout: float = 300,
+    on_line: Optional[Callable[[str, str], None]] = None,
+    on_result: Optional[Callable[[dict[str, Any]], None]] = None
+) -> dict[str, Any]:
+    """
+    마지막 green 실행 이후 바뀐 파일(또는 changed_files)에 import로 연결된 테스트만 실행합니다.
+    green 기록이 없거나 설정 파일이 바뀌는 등 판단할 수 없으면 전체를 실행합니다.
+    모두 통과하면 현재 상태를 새 green 기준으로 기록합니다.
+    changed_files를 직접 준 선택 실행이면 그 파일들만 기준을 갱신합니다
+    (그 밖의 변경은 관련 테스트가 돌지 않았으므로 다음 실행에서 다시 고른다).
+    """
+    impact = TestImpact(working_dir)
+    await asyncio.to_thread(impact.scan)
+
+    all_tests = discover_test_files(test_path, working_dir)
+    changed = changed_files if changed_files is not None else impact.changed_since_green()
+    selected = impact.select(changed, all_tests) if changed is not None else None
+
+    if selected is None:
+        mode, test_files = "full", all_tests
+    else:
+        mode, test_files = "affected", selected
+
+    # 전체 실행이거나 green 이후의 모든 변경으로 골랐을 때만 트리 전체를 green으로 본다
+    green_paths = changed if mode == "affected" and changed_files is not None else None
+
+    if not test_files:
+        impact.mark_green(green_paths)
+        impact.save()
+        return {
+            "command": f"pytest {test_path}",
+            "success": True,
+            "selection": {"mode": mode, "changed": changed, "tests": []},
+            "results": [],
+            "summary": {"passed": 0, "failed": 0, "error": 0, "skipped": 0, "total": 0}
         }
-    except subprocess.TimeoutExpired:
-        return {"command": command, "error": "Test timeout", "success": False}
+
+    result = await run_tests_sharded(
+        test_path, shards=shards, working_dir=working_dir, timeout=timeout,
+        test_files=test_files, on_line=on_line, on_result=on_result
+    )
+    result["selection"] = {"mode": mode, "changed": changed, "tests": test_files}
+
+    if result["success"]:
+        impact.mark_green(green_paths)
+    impact.save()
+    return result
+
+
+def run_test(command: str = "pytest", working_dir: str = ".") -> dict[str, Any]:
+    """
+    테스트를 실행합니다. (동기 호출용, 이벤트 루프 안에서는 run_test_async 사용)
+    """
+    try:
+        return asyncio.run(run_test_async(command, working_dir))
     except Exception as e:
         return {"command": command, "error": str(e), "success": False}
 
@@ -54,7 +542,9 @@ def check_test_coverage(test_path: str = "tests/") -> dict[str, Any]:
     """
     테스트 커버리지를 확인합니다.
     """
-    command = f"pytest {test_path} --cov --cov-report=term-missing"
+    if not _has_pytest_cov():
+        return {"command": f"pytest {test_path} --cov", "error": "pytest-cov is not installed", "success": False}
+    command = f"{PYTHON} -m pytest {test_path} --cov --cov-report=term-missing"
     return run_test(command)
 
 
@@ -0,0 +1,394 @@
+import ctypes
+import ctypes.util
+import hashlib
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, TypeVar
+
+
+# 인덱스에서 제외 (빌드 산출물, VCS, 캐시)
+IGNORE_DIRS = {".git", "__pycache__", "target", "node_modules", ".idea", ".pytest_cache", ".venv"}
+# 이보다 큰 파일은 해시를 계산하지 않는다
+MAX_HASH_BYTES = 16 * 1024 * 1024
+# 변경 로그 보관 개수
+MAX_CHANGES = 10000
+# compact diff에서 종류별로 보여줄 최대 경로 수
+MAX_DIFF_PATHS = 50
+# 확인 시각과 mtime이 이보다 가까우면 같은 시각 단위 안에서 또 바뀌었을 수 있으므로 다시 해시한다
+RACY_WINDOW_NS = 1_000_000_000
+
+T = TypeVar("T")
+
+
+def _ignored(name: str, is_dir: bool) -> bool:
+    if is_dir:
+        return name in IGNORE_DIRS
+    # write_file_stream / patch_file의 임시 파일
+    return name.startswith(".") and name.endswith(".tmp")
+
+
+def _file_hash(path: str, size: int) -> str | None:
+    if size > MAX_HASH_BYTES:
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _join(rel_dir: str, name: str) -> str:
+    return f"{rel_dir}/{name}" if rel_dir else name
+
+
+# -----------------------------
+# inotify (Linux, ctypes)
+# -----------------------------
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """
+    디렉토리별 inotify watch. 이벤트가 난 디렉토리를 dirty로 모아 두기만 한다
+    (실제 재스캔은 WorkspaceIndex.refresh에서 그 디렉토리만).
+    큐가 넘치면(IN_Q_OVERFLOW) overflow를 세워서 다음 refresh가 전체를 훑게 한다.
+    """
+
+    def __init__(self, root: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.root = root
+        self.watches: dict[int, str] = {}
+        self.dirty: set[str] = set()
+        self.overflow = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="workspace-inotify", daemon=True)
+        self._thread.start()
+
+    def watch(self, rel_dir: str):
+        path = os.path.join(self.root, rel_dir) if rel_dir else self.root
+        wd = self._add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            # max_user_watches 초과 등 → 이후에는 폴링으로
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        with self._lock:
+            self.watches[wd] = rel_dir
+
+    def drain(self) -> tuple[set[str], bool]:
+        # 방금 쓴 파일의 이벤트는 커널 큐에는 있지만 스레드가 아직 못 읽었을 수 있다 → 여기서 마저 읽는다
+        self._read_pending()
+        with self._lock:
+            dirty, overflow = self.dirty, self.overflow
+            self.dirty, self.overflow = set(), False
+        return dirty, overflow
+
+    def _read_pending(self) -> bool:
+        """큐에 쌓인 이벤트를 비울 때까지 읽는다 (fd가 닫혔으면 False)"""
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return True
+            except OSError:
+                return False
+            self._parse(data)
+
+    def _run(self):
+        while not self._stop.is_set():
+            readable, _, _ = select.select([self.fd], [], [], 1.0)
+            if readable and not self._read_pending():
+                return
+
+    def _parse(self, data: bytes):
+        offset = 0
+        with self._lock:
+            while offset + EVENT_HEADER.size <= len(data):
+                wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size + length
+
+                if mask & IN_Q_OVERFLOW:
+                    self.overflow = True
+                    continue
+                rel_dir = self.watches.get(wd)
+                if rel_dir is None:
+                    continue
+                if mask & IN_IGNORED:
+                    del self.watches[wd]
+                    continue
+                self.dirty.add(rel_dir)
+                if mask & IN_DELETE_SELF and rel_dir:
+                    # 부모 디렉토리에서 하위 트리를 정리한다
+                    self.dirty.add(rel_dir.rpartition("/")[0])
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=2)
+        os.close(self.fd)
+
+
+# -----------------------------
+# WorkspaceIndex
+# -----------------------------
+class WorkspaceIndex:
+    """
+    작업 폴더의 파일 트리를 메모리에 유지한다 (경로, 크기, mtime, sha256).
+    - Linux에서는 inotify로 바뀐 디렉토리만 다시 훑고, 그 외에는 폴링(전체 walk, mtime/크기가 같으면 해시 생략)
+    - 변경은 세대 번호와 함께 로그에 남기고, mark_iteration(n)으로 반복 번호와 세대를 묶어서
+      changes_since(n)이 "n번째 반복 이후 바뀐 것"을 바로 돌려준다
+    """
+
+    def __init__(self, root: str, use_inotify: bool = True):
+        self.root = os.path.abspath(root)
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.children: dict[str, set[str]] = {"": set()}
+        self.generation = 0
+        self.changes: deque = deque(maxlen=MAX_CHANGES)
+        self.iterations: dict[int, int] = {}
+        self._lock = threading.RLock()
+        self._scanned = False
+
+        self.watcher: InotifyWatcher | None = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self.watcher = InotifyWatcher(self.root)
+            except OSError:
+                self.watcher = None
+
+    # -----------------------------
+    # 갱신
+    # -----------------------------
+    def refresh(self) -> int:
+        """디스크와 맞추고 새로 기록된 변경 수를 돌려준다"""
+        with self._lock:
+            before = self.generation
+
+            if self.watcher is not None and self._scanned:
+                dirty, overflow = self.watcher.drain()
+                if overflow:
+                    self._rescan("", recursive=True)
+                else:
+                    # 상위 디렉토리부터 (하위가 이미 지워졌을 수 있다)
+                    for rel_dir in sorted(dirty, key=lambda d: d.count("/") if d else -1):
+                        if rel_dir == "" or rel_dir in self.entries:
+                            self._rescan(rel_dir, recursive=False)
+            else:
+                self._rescan("", recursive=True)
+                self._scanned = True
+
+            return self.generation - before
+
+    def _watch(self, rel_dir: str):
+        if self.watcher is None:
+            return
+        try:
+            self.watcher.watch(rel_dir)
+        except OSError:
+            self.watcher.close()
+            self.watcher = None
+
+    def _record(self, kind: str, rel_path: str, is_dir: bool = False):
+        self.generation += 1
+        self.changes.append((self.generation, kind, rel_path, is_dir))
+
+    def _rescan(self, rel_dir: str, recursive: bool):
+        if rel_dir == "" and not self._scanned:
+            self._watch("")
+
+        abs_dir = os.path.join(self.root, rel_dir) if rel_dir else self.root
+        try:
+            with os.scandir(abs_dir) as it:
+                items = list(it)
+        except (FileNotFoundError, NotADirectoryError):
+            if rel_dir:
+                self._remove(rel_dir)
+            return
+
+        seen: set[str] = set()
+        for item in items:
+            is_dir = item.is_dir(follow_symlinks=False)
+            if _ignored(item.name, is_dir) or not (is_dir or item.is_file(follow_symlinks=False)):
+                continue
+            rel_path = _join(rel_dir, item.name)
+            seen.add(item.name)
+
+            existing = self.entries.get(rel_path)
+            if is_dir:
+                if existing is not None and existing["type"] != "directory":
+                    self._remove(rel_path)
+                    existing = None
+                if existing is None:
+                    self.entries[rel_path] = {"type": "directory"}
+                    self.children[rel_path] = set()
+                    self._record("added", rel_path, is_dir=True)
+                    # watch를 먼저 걸고 훑어야 그 사이에 생긴 파일을 놓치지 않는다
+                    self._watch(rel_path)
+                    self._rescan(rel_path, recursive=True)
+                elif recursive:
+                    self._rescan(rel_path, recursive=True)
+                continue
+
+            if existing is not None and existing["type"] == "directory":
+                self._remove(rel_path)
+                existing = None
+            try:
+                stat = item.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                seen.discard(item.name)
+                continue
+            if (
+                existing is not None
+                and existing["mtime"] == stat.st_mtime_ns
+                and existing["size"] == stat.st_size
+                and existing["checked"] - stat.st_mtime_ns > RACY_WINDOW_NS
+            ):
+                continue
+
+            try:
+                digest = _file_hash(item.path, stat.st_size)
+            except OSError:
+                digest = None
+            self.entries[rel_path] = {
+                "type": "file", "size": stat.st_size, "mtime": stat.st_mtime_ns, "sha256": digest,
+                "checked": time.time_ns()
+            }
+            if existing is None:
+                self._record("added", rel_path)
+            elif existing.get("sha256") != digest or digest is None:
+                self._record("modified", rel_path)
+
+        for name in self.children.get(rel_dir, set()) - seen:
+            self._remove(_join(rel_dir, name))
+        self.children[rel_dir] = seen
+
+    def _remove(self, rel_path: str):
+        entry = self.entries.pop(rel_path, None)
+        if entry is None:
+            return
+        if entry["type"] == "directory":
+            for name in self.children.pop(rel_path, set()):
+                self._remove(_join(rel_path, name))
+        parent, _, name = rel_path.rpartition("/")
+        self.children.get(parent, set()).discard(name)
+        self._record("deleted", rel_path, is_dir=entry["type"] == "directory")
+
+    # -----------------------------
+    # 조회
+    # -----------------------------
+    def listing(self, rel_dir: str = "", recursive: bool = False) -> list[dict[str, Any]] | None:
+        """rel_dir 아래 항목 (없는 디렉토리면 None)"""
+        rel_dir = rel_dir.strip("/").replace(os.sep, "/")
+        if rel_dir in (".", ""):
+            rel_dir = ""
+
+        with self._lock:
+            if rel_dir not in self.children:
+                return None
+
+            result = []
+            stack = [rel_dir]
+            while stack:
+                current = stack.pop()
+                for name in sorted(self.children.get(current, ())):
+                    rel_path = _join(current, name)
+                    result.append({"path": rel_path, **self.entries[rel_path]})
+                    if recursive and self.entries[rel_path]["type"] == "directory":
+                        stack.append(rel_path)
+            return result
+
+    def mark_iteration(self, iteration: int):
+        with self._lock:
+            self.iterations[iteration] = self.generation
+
+    def changes_since(self, iteration: int) -> dict[str, Any] | None:
+        """
+        iteration 이후의 변경을 경로별로 합친 compact diff.
+        해당 반복이 기록돼 있지 않거나 로그가 이미 밀려났으면 None
+        """
+        with self._lock:
+            generation = self.iterations.get(iteration)
+            if generation is None:
+                return None
+            if self.changes and self.changes[0][0] > generation + 1:
+                return None
+
+            first_kind: dict[str, str] = {}
+            last_kind: dict[str, str] = {}
+            for change_generation, kind, rel_path, is_dir in self.changes:
+                # 디렉토리는 그 안의 파일 변경으로 드러나므로 diff에는 파일만
+                if change_generation <= generation or is_dir:
+                    continue
+                first_kind.setdefault(rel_path, kind)
+                last_kind[rel_path] = kind
+
+        diff: dict[str, list[str]] = {"added": [], "modified": [], "deleted": []}
+        for rel_path, last in last_kind.items():
+            first = first_kind[rel_path]
+            if first == "added" and last == "deleted":
+                continue  # 생겼다가 사라진 파일
+            if first == "added":
+                diff["added"].append(rel_path)
+            elif last == "deleted":
+                diff["deleted"].append(rel_path)
+            else:
+                diff["modified"].append(rel_path)
+
+        compact: dict[str, Any] = {}
+        for kind, paths in diff.items():
+            if paths:
+                paths.sort()
+                compact[kind] = paths[:MAX_DIFF_PATHS]
+                if len(paths) > MAX_DIFF_PATHS:
+                    compact[f"{kind}_truncated"] = len(paths) - MAX_DIFF_PATHS
+        return compact
+
+    def close(self):
+        if self.watcher is not None:
+            self.watcher.close()
+            self.watcher = None
+
+
+def per_root(factory: Callable[[str], T]) -> Callable[[str], T]:
+    """같은 작업 폴더(절대 경로 기준)에는 factory로 만든 인스턴스 하나를 공유하는 조회 함수"""
+    instances: dict[str, T] = {}
+    lock = threading.Lock()
+
+    def get(workspace_root: str) -> T:
+        root = os.path.abspath(workspace_root)
+        with lock:
+            if root not in instances:
+                instances[root] = factory(root)
+            return instances[root]
+
+    return get
+
+
+get_index = per_root(WorkspaceIndex)